@@ -0,0 +1,213 @@
+import os
+import math
+import time
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Optional
+
+from loguru import logger
+
+from loop_monitor import LoopMonitor
+from node_router import NodeRouter
+
+
+# Retry hint when the process is overloaded rather than full; load clears faster than calls end
+OVERLOAD_RETRY_SECONDS = 5
+
+
+class AdmissionRejected(Exception):
+    """No call slot is available; ``retry_after`` is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: int, queue_length: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+        self.queue_length = queue_length
+
+
+class _Waiter:
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.event = asyncio.Event()
+
+
+class AdmissionController:
+    """Decides whether this process takes another call.
+
+    A call needs a slot: live calls (counted by the node router) plus slots
+    reserved by /connect for callers that have not opened their WebSocket yet
+    must stay under ``max_calls``. New calls are also refused while recent
+    event-loop lag or CPU is over its limit, so calls already in progress
+    keep the headroom instead of every call degrading together. Callers that
+    do not get a slot can wait in a short FIFO queue; whoever is at its head
+    is woken when a call ends or a reservation expires.
+    """
+
+    def __init__(
+        self,
+        router: NodeRouter,
+        monitor: LoopMonitor,
+        max_calls: int,
+        max_lag_ms: float = 250.0,
+        max_cpu_percent: float = 0.0,
+        queue_size: int = 0,
+        queue_timeout: float = 10.0,
+        reservation_ttl: float = 30.0,
+        avg_call_seconds: float = 120.0,
+    ):
+        self.router = router
+        self.monitor = monitor
+        self.max_calls = max_calls
+        self.max_lag_ms = max_lag_ms
+        self.max_cpu_percent = max_cpu_percent
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.reservation_ttl = reservation_ttl
+        self.avg_call_seconds = avg_call_seconds
+        self._reserved: Dict[str, float] = {}
+        self._queue: Deque[_Waiter] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    @property
+    def live_calls(self) -> int:
+        return self.router.local.live_calls
+
+    def _expire_reservations(self):
+        now = time.monotonic()
+        expired = [session_id for session_id, deadline in self._reserved.items() if deadline <= now]
+        for session_id in expired:
+            del self._reserved[session_id]
+        if expired:
+            logger.info(f"⌛ {len(expired)} call reservation(s) expired without a WebSocket")
+            self._wake()
+
+    def _refusal(self) -> Optional[str]:
+        """Why a new call cannot start right now, or None if it can."""
+        self._expire_reservations()
+        if self.live_calls + len(self._reserved) >= self.max_calls:
+            return "at capacity"
+        # Load limits only protect calls already running; an idle process always admits
+        if self.live_calls:
+            if self.max_lag_ms and self.monitor.lag_percentile(0.9, window=3.0) * 1000 > self.max_lag_ms:
+                return "event loop overloaded"
+            if self.max_cpu_percent and self.monitor.cpu_percent > self.max_cpu_percent:
+                return "CPU overloaded"
+        return None
+
+    def _retry_after(self, reason: str, position: int) -> int:
+        if reason != "at capacity":
+            return OVERLOAD_RETRY_SECONDS
+        # With calls ending uniformly, one slot frees every avg_call_seconds / occupied slots
+        per_slot = self.avg_call_seconds / max(self.live_calls + len(self._reserved), 1)
+        return max(1, min(300, math.ceil(per_slot * (position + 1))))
+
+    def _wake(self):
+        if self._queue:
+            self._queue[0].event.set()
+
+    def _reserve(self, session_id: str):
+        self._reserved[session_id] = time.monotonic() + self.reservation_ttl
+        self.admitted += 1
+
+    async def reserve(self, session_id: str):
+        """Hold a call slot for ``session_id`` until its WebSocket opens, waiting in the queue if allowed.
+
+        Raises AdmissionRejected when no slot frees up in time.
+        """
+        if session_id in self._reserved:
+            # A retried /connect keeps its slot
+            self._reserved[session_id] = time.monotonic() + self.reservation_ttl
+            return
+        if self._queue:
+            # Others are already waiting for the next slot
+            reason = "at capacity"
+        else:
+            reason = self._refusal()
+            if reason is None:
+                self._reserve(session_id)
+                return
+        if len(self._queue) >= self.queue_size:
+            self.rejected += 1
+            raise AdmissionRejected(reason, self._retry_after(reason, len(self._queue)), len(self._queue))
+
+        waiter = _Waiter(session_id)
+        self._queue.append(waiter)
+        self.queued += 1
+        logger.info(f"⏳ Queued call {session_id} ({reason}, position {len(self._queue)})")
+        deadline = time.monotonic() + self.queue_timeout
+        try:
+            while True:
+                if self._queue[0] is waiter:
+                    reason = self._refusal()
+                    if reason is None:
+                        self._reserve(session_id)
+                        return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                waiter.event.clear()
+                try:
+                    # Load limits clear without an event, so re-check at least once a second
+                    await asyncio.wait_for(waiter.event.wait(), min(remaining, 1.0))
+                except asyncio.TimeoutError:
+                    pass
+            position = self._queue.index(waiter)
+            self.rejected += 1
+            raise AdmissionRejected(reason, self._retry_after(reason, position), len(self._queue))
+        finally:
+            self._queue.remove(waiter)
+            self._wake()
+
+    def admit(self, session_id: str):
+        """Take the slot /connect reserved for ``session_id``, or a free one for callers that skipped /connect.
+
+        Raises AdmissionRejected if neither is available.
+        """
+        if self._reserved.pop(session_id, None) is not None:
+            return
+        reason = "at capacity" if self._queue else self._refusal()
+        if reason is not None:
+            self.rejected += 1
+            raise AdmissionRejected(reason, self._retry_after(reason, len(self._queue)), len(self._queue))
+        self.admitted += 1
+
+    @contextmanager
+    def call(self):
+        """Count an admitted call as live for as long as the block runs."""
+        started = time.monotonic()
+        try:
+            with self.router.track_call():
+                yield
+        finally:
+            # Moving average of call length feeds the retry-after estimate
+            self.avg_call_seconds = 0.9 * self.avg_call_seconds + 0.1 * (time.monotonic() - started)
+            self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "live_calls": self.live_calls,
+            "reserved": len(self._reserved),
+            "max_calls": self.max_calls,
+            "queue_length": len(self._queue),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "avg_call_seconds": round(self.avg_call_seconds, 1),
+        }
+
+
+def admission_from_env(router: NodeRouter, monitor: LoopMonitor) -> AdmissionController:
+    """ADMISSION_MAX_CALLS defaults to this node's routing capacity (NODE_CAPACITY)."""
+    return AdmissionController(
+        router,
+        monitor,
+        max_calls=int(os.getenv("ADMISSION_MAX_CALLS") or router.local.capacity),
+        max_lag_ms=float(os.getenv("ADMISSION_MAX_LAG_MS", "250")),
+        max_cpu_percent=float(os.getenv("ADMISSION_MAX_CPU_PERCENT", "0")),
+        queue_size=int(os.getenv("ADMISSION_QUEUE_SIZE", "0")),
+        queue_timeout=float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10")),
+        reservation_ttl=float(os.getenv("ADMISSION_RESERVATION_TTL", "30")),
+    )
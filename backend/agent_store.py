@@ -0,0 +1,153 @@
+import os
+import copy
+import json
+import time
+import uuid
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from site_crawler import canonical_website
+
+
+def config_hash(agent_config: Optional[Dict[str, Any]]) -> str:
+    """Content hash of an agent config, independent of dict ordering."""
+    canonical = json.dumps(agent_config or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _website_key(agent_config: Dict[str, Any]) -> str:
+    """The same site key the research cache and bulk research use."""
+    return canonical_website(agent_config.get("websiteUrl") or "").lower()
+
+
+class AgentConfigStore:
+    """Versioned agent configs in SQLite, keyed by brand and website.
+
+    Saving a config for a brand/website that already has an agent adds a new
+    version under the same agent id, unless it is identical to the latest
+    version, which is returned instead. Saving an older config again makes it
+    the latest as a new version. Versions never change once
+    written, so they are served from an in-memory LRU after the first read;
+    only "which version is latest" goes to the database.
+    """
+
+    def __init__(self, path: str, cache_size: int = 512):
+        self.path = path
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS agent_configs ("
+            " agent_id TEXT NOT NULL,"
+            " version INTEGER NOT NULL,"
+            " brand TEXT NOT NULL,"
+            " website TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " config TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (agent_id, version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS agent_configs_brand_website ON agent_configs (brand, website)")
+
+    def save(self, agent_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Store ``agent_config`` and return its record (without creating a duplicate version)."""
+        brand = (agent_config.get("brandName") or "").strip()
+        website = _website_key(agent_config)
+        digest = config_hash(agent_config)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                latest = self._db.execute(
+                    "SELECT agent_id, version, hash FROM agent_configs WHERE brand = ? AND website = ? ORDER BY version DESC LIMIT 1",
+                    (brand, website),
+                ).fetchone()
+                agent_id, version = (latest[0], latest[1] + 1) if latest else (str(uuid.uuid4()), 1)
+                unchanged = latest is not None and latest[2] == digest
+                if not unchanged:
+                    self._db.execute(
+                        "INSERT INTO agent_configs (agent_id, version, brand, website, hash, config, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (agent_id, version, brand, website, digest, json.dumps(agent_config, default=str), time.time()),
+                    )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if unchanged:
+            return self._get(agent_id, latest[1])
+        logger.info(f"🗂️ Stored agent {agent_id} v{version} for {brand or 'unknown brand'} ({website or 'no website'})")
+        return self._get(agent_id, version)
+
+    def get(self, agent_id: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """A stored config record, the latest version unless ``version`` is given."""
+        if version is None:
+            with self._lock:
+                row = self._db.execute("SELECT MAX(version) FROM agent_configs WHERE agent_id = ?", (agent_id,)).fetchone()
+            if row[0] is None:
+                return None
+            version = row[0]
+        return self._get(agent_id, version)
+
+    def _get(self, agent_id: str, version: int) -> Optional[Dict[str, Any]]:
+        key = (agent_id, version)
+        with self._lock:
+            record = self._cache.get(key)
+            if record is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(record)
+            self.misses += 1
+            row = self._db.execute(
+                "SELECT brand, website, hash, config, created_at FROM agent_configs WHERE agent_id = ? AND version = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            brand, website, digest, config, created_at = row
+            record = {
+                "agent_id": agent_id,
+                "version": version,
+                "brand": brand,
+                "website": website,
+                "hash": digest,
+                "created_at": created_at,
+                "config": json.loads(config),
+            }
+            self._cache[key] = record
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return copy.deepcopy(record)
+
+    def versions(self, agent_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT version, hash, created_at FROM agent_configs WHERE agent_id = ? ORDER BY version", (agent_id,)
+            ).fetchall()
+        return [{"version": version, "hash": digest, "created_at": created_at} for version, digest, created_at in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agents, versions = self._db.execute("SELECT COUNT(DISTINCT agent_id), COUNT(*) FROM agent_configs").fetchone()
+        return {
+            "agents": agents,
+            "versions": versions,
+            "cached": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses,
+        }
+
+
+def agent_store_from_env() -> AgentConfigStore:
+    return AgentConfigStore(
+        os.getenv("AGENT_STORE_PATH", "agent_configs.db"),
+        cache_size=int(os.getenv("AGENT_STORE_CACHE_SIZE", "512")),
+    )
@@ -0,0 +1,170 @@
+import os
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import numpy as np
+import soxr
+from loguru import logger
+
+from pipecat.frames.frames import Frame, InputAudioRawFrame, OutputAudioRawFrame, StartFrame
+from pipecat.serializers.protobuf import ProtobufFrameSerializer
+
+
+# Codecs this server can put on the WebSocket. "pcm" is raw 16-bit samples, "ulaw" is G.711 µ-law (8 bits per sample)
+SUPPORTED_AUDIO_CODECS = ("ulaw", "pcm")
+WIRE_SAMPLE_RATES = (8000, 16000, 24000)
+# G.711 is defined at 8 kHz; telephony-style clients expect it unless they ask otherwise
+DEFAULT_ULAW_SAMPLE_RATE = 8000
+
+
+# G.711 µ-law constants, as in the ITU reference and Python's old audioop module
+MULAW_BIAS = 0x84
+MULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+
+
+def _ulaw_tables():
+    """Lookup tables for every 14-bit linear input and every µ-law byte; bit-exact with audioop."""
+    value = np.arange(-8192, 8192)
+    mask = np.where(value < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(value), 8159) + (MULAW_BIAS >> 2)
+    segment = np.searchsorted(MULAW_SEGMENT_ENDS, magnitude)
+    code = np.where(segment < 8, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F), 0x7F)
+    encode = (code ^ mask).astype(np.uint8)
+
+    byte = ~np.arange(256) & 0xFF
+    t = (((byte & 0x0F) << 3) + MULAW_BIAS) << ((byte >> 4) & 0x07)
+    decode = np.where(byte & 0x80, MULAW_BIAS - t, t - MULAW_BIAS).astype(np.int16)
+    return encode, decode
+
+
+# audioop is deprecated and gone in Python 3.13, so the codec is table lookups in numpy
+_ULAW_ENCODE, _ULAW_DECODE = _ulaw_tables()
+
+
+def ulaw_encode(audio: bytes) -> bytes:
+    """16-bit PCM to G.711 µ-law, one byte per sample."""
+    samples = np.frombuffer(audio, dtype=np.int16)
+    return _ULAW_ENCODE[(samples >> 2).astype(np.int32) + 8192].tobytes()
+
+
+def ulaw_decode(audio: bytes) -> bytes:
+    """G.711 µ-law to 16-bit PCM."""
+    return _ULAW_DECODE[np.frombuffer(audio, dtype=np.uint8)].tobytes()
+
+
+def enabled_audio_codecs():
+    return [codec for codec in os.getenv("AUDIO_CODECS", "ulaw,pcm").split(",") if codec in SUPPORTED_AUDIO_CODECS] or ["pcm"]
+
+
+def negotiate_audio(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Pick the WebSocket audio format from a /connect request.
+
+    ``audio_codec`` is a codec name or a list in order of preference; the first
+    one this server has enabled wins, falling back to "pcm". ``sample_rate``
+    applies to both directions; unsupported or missing rates keep the
+    pipeline's own (16 kHz in, 24 kHz out), except that µ-law defaults to 8 kHz.
+    """
+    requested = data.get("audio_codec") or "pcm"
+    preferences = requested if isinstance(requested, list) else [requested]
+    enabled = enabled_audio_codecs()
+    codec = next((codec for codec in preferences if codec in enabled), "pcm")
+    try:
+        sample_rate = int(data.get("sample_rate") or 0)
+    except (TypeError, ValueError):
+        sample_rate = 0
+    if sample_rate not in WIRE_SAMPLE_RATES:
+        sample_rate = DEFAULT_ULAW_SAMPLE_RATE if codec == "ulaw" else None
+    return {"codec": codec, "sample_rate": sample_rate}
+
+
+def resample(audio: bytes, in_rate: int, out_rate: int) -> bytes:
+    """pipecat's SOXRAudioResampler, synchronously, for use on the codec thread."""
+    samples = np.frombuffer(audio, dtype=np.int16)
+    return soxr.resample(samples, in_rate, out_rate, quality="VHQ").astype(np.int16).tobytes()
+
+
+class CodecFrameSerializer(ProtobufFrameSerializer):
+    """Protobuf frames whose audio travels in the codec and sample rate negotiated at /connect.
+
+    Incoming audio is decoded and resampled to the pipeline's input rate, and
+    outgoing audio resampled from the pipeline's output rate and encoded,
+    on a per-call thread rather than the event loop. Chunks are resampled one
+    at a time like pipecat's own resampler does, since a streaming resampler
+    would hold back tens of milliseconds of audio in each direction.
+    """
+
+    def __init__(self, codec: str, sample_rate: int):
+        super().__init__()
+        self.codec = codec
+        self.wire_rate = sample_rate
+        self._in_rate = 0
+        # µ-law output is one byte per sample; an odd trailing byte waits for the next chunk
+        # so every frame holds whole 16-bit words for clients that read audio as int16
+        self._pending = b""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-codec")
+        self._started = time.monotonic()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.codec_seconds = 0.0
+
+    async def setup(self, frame: StartFrame):
+        await super().setup(frame)
+        self._in_rate = self._in_rate or frame.audio_in_sample_rate
+
+    def _decode(self, audio: bytes) -> bytes:
+        started = time.perf_counter()
+        if self.codec == "ulaw":
+            audio = ulaw_decode(audio)
+        if self.wire_rate != self._in_rate:
+            audio = resample(audio, self.wire_rate, self._in_rate)
+        self.codec_seconds += time.perf_counter() - started
+        return audio
+
+    def _encode(self, audio: bytes, sample_rate: int) -> bytes:
+        started = time.perf_counter()
+        if sample_rate != self.wire_rate:
+            audio = resample(audio, sample_rate, self.wire_rate)
+        if self.codec == "ulaw":
+            audio = self._pending + ulaw_encode(audio)
+            split = len(audio) - len(audio) % 2
+            audio, self._pending = audio[:split], audio[split:]
+        self.codec_seconds += time.perf_counter() - started
+        return audio
+
+    async def serialize(self, frame: Frame) -> str | bytes | None:
+        if type(frame) is OutputAudioRawFrame:
+            audio = await asyncio.get_running_loop().run_in_executor(self._executor, self._encode, frame.audio, frame.sample_rate)
+            if not audio:
+                return None
+            frame = OutputAudioRawFrame(audio=audio, sample_rate=self.wire_rate, num_channels=frame.num_channels)
+        payload = await super().serialize(frame)
+        if payload:
+            self.bytes_out += len(payload)
+        return payload
+
+    async def deserialize(self, data: str | bytes) -> Frame | None:
+        self.bytes_in += len(data)
+        frame = await super().deserialize(data)
+        if isinstance(frame, InputAudioRawFrame):
+            audio = await asyncio.get_running_loop().run_in_executor(self._executor, self._decode, frame.audio)
+            frame = InputAudioRawFrame(audio=audio, sample_rate=self._in_rate, num_channels=frame.num_channels)
+        return frame
+
+    def close(self):
+        """Stop the codec thread and log this call's wire bandwidth."""
+        self._executor.shutdown(wait=False)
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        logger.info(
+            f"📦 Audio transport {self.codec}@{self.wire_rate}: "
+            f"in {self.bytes_in / elapsed / 1024:.1f} KB/s, out {self.bytes_out / elapsed / 1024:.1f} KB/s, "
+            f"codec CPU {self.codec_seconds * 1000:.0f}ms"
+        )
+
+
+def frame_serializer_for(audio: Optional[Dict[str, Any]]) -> ProtobufFrameSerializer:
+    """The WebSocket serializer for a negotiated audio format; plain protobuf PCM when nothing was negotiated."""
+    if not audio or (audio.get("codec", "pcm") == "pcm" and not audio.get("sample_rate")):
+        return ProtobufFrameSerializer()
+    return CodecFrameSerializer(audio["codec"], audio["sample_rate"] or 16000)
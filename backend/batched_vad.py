@@ -0,0 +1,345 @@
+import os
+import time
+import asyncio
+import multiprocessing
+from multiprocessing import shared_memory
+from contextlib import asynccontextmanager
+from importlib import resources
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.utils import exp_smoothing
+from pipecat.audio.vad.silero import SileroOnnxModel, SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADAnalyzer, VADParams
+
+from vad_pool import VADPool, vad_pool_from_env
+
+
+# Frames a call can have in flight; analyze_audio waits on each one, so more than one is rare
+RING_FRAMES = 4
+MAX_FRAME_SAMPLES = 512
+# Per-slot header: producer counter, consumer counter, sample rate, call generation
+HEAD, TAIL, SAMPLE_RATE, GENERATION = range(4)
+# Worker counters: batches run, frames inferred, CPU microseconds, stop flag
+BATCHES, FRAMES, CPU_MICROS, STOP = range(4)
+# pipecat's SileroVADAnalyzer resets model state this often; the worker does the same per call
+MODEL_RESET_SECONDS = 5.0
+# How often a call waiting on the worker checks that it is still alive
+LIVENESS_CHECK_SECONDS = 0.05
+
+
+class SharedRings:
+    """Numpy views over one shared-memory block holding every call slot's frame ring."""
+
+    def __init__(self, buffer, slots: int):
+        offset = 0
+        self.header = np.ndarray((slots, 4), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += self.header.nbytes
+        self.counters = np.ndarray((4,), dtype=np.int64, buffer=buffer, offset=offset)
+        offset += self.counters.nbytes
+        self.frames = np.ndarray((slots, RING_FRAMES, MAX_FRAME_SAMPLES), dtype=np.int16, buffer=buffer, offset=offset)
+        offset += self.frames.nbytes
+        # Per frame: speech confidence and volume
+        self.results = np.ndarray((slots, RING_FRAMES, 2), dtype=np.float32, buffer=buffer, offset=offset)
+
+    @staticmethod
+    def size(slots: int) -> int:
+        return slots * 4 * 8 + 4 * 8 + slots * RING_FRAMES * MAX_FRAME_SAMPLES * 2 + slots * RING_FRAMES * 2 * 4
+
+
+def _volume_filters(sample_rate: int) -> List[Tuple[np.ndarray, np.ndarray, float]]:
+    import pyloudnorm
+
+    meter = pyloudnorm.Meter(sample_rate, block_size=MAX_FRAME_SAMPLES / sample_rate)
+    return [(stage.b, stage.a, stage.passband_gain) for stage in meter._filters.values()]
+
+
+def batch_volume(frames: np.ndarray, filters: List[Tuple[np.ndarray, np.ndarray, float]]) -> np.ndarray:
+    """pipecat's calculate_audio_volume for a batch of int16 frames.
+
+    With the gating block as long as the frame, BS.1770 loudness reduces to the
+    mean square of the K-weighted signal, so one lfilter per stage covers the batch.
+    """
+    from scipy.signal import lfilter
+
+    weighted = frames.astype(np.float64)
+    for b, a, gain in filters:
+        weighted = gain * lfilter(b, a, weighted, axis=1)
+    with np.errstate(divide="ignore"):
+        loudness = -0.691 + 10.0 * np.log10(np.mean(np.square(weighted), axis=1))
+    return np.clip((loudness + 20) / 100, 0, 1)
+
+
+def _worker_main(shm_name: str, slots: int, work, done: list, ready, batch_window: float):
+    """Worker process: run Silero and volume for every call with a pending frame in one batch per sample rate."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    rings = SharedRings(shm.buf, slots)
+    header, frames, results, counters = rings.header, rings.frames, rings.results, rings.counters
+
+    model_path = str(resources.files("pipecat.audio.vad.data").joinpath("silero_vad.onnx"))
+    session = SileroOnnxModel(model_path, force_onnx_cpu=True).session
+    filters = {rate: _volume_filters(rate) for rate in (8000, 16000)}
+    state = np.zeros((2, slots, 128), dtype=np.float32)
+    context = np.zeros((slots, 64), dtype=np.float32)
+    generations = np.zeros(slots, dtype=np.int64)
+    last_reset = np.zeros(slots)
+    ready.set()
+
+    while not counters[STOP]:
+        work.acquire()
+        if batch_window:
+            # Let frames from other calls arrive so they share this inference
+            time.sleep(batch_window)
+        while work.acquire(block=False):
+            pass
+        started = time.process_time()
+        while True:
+            pending = np.nonzero(header[:, HEAD] > header[:, TAIL])[0]
+            if not len(pending):
+                break
+            for sample_rate in (16000, 8000):
+                group = pending[header[pending, SAMPLE_RATE] == sample_rate]
+                if not len(group):
+                    continue
+                num_samples, context_size = (512, 64) if sample_rate == 16000 else (256, 32)
+                now = time.monotonic()
+                stale = (header[group, GENERATION] != generations[group]) | (now - last_reset[group] >= MODEL_RESET_SECONDS)
+                if stale.any():
+                    reset = group[stale]
+                    state[:, reset] = 0
+                    context[reset] = 0
+                    generations[reset] = header[reset, GENERATION]
+                    last_reset[reset] = now
+
+                positions = header[group, TAIL] % RING_FRAMES
+                audio = frames[group, positions, :num_samples]
+                x = np.concatenate((context[group, :context_size], audio.astype(np.float32) / 32768.0), axis=1)
+                out, new_state = session.run(None, {"input": x, "state": state[:, group], "sr": np.array(sample_rate, dtype=np.int64)})
+                state[:, group] = new_state
+                context[group, :context_size] = x[:, -context_size:]
+                results[group, positions, 0] = out[:, 0]
+                results[group, positions, 1] = batch_volume(audio, filters[sample_rate])
+                header[group, TAIL] += 1
+                for slot in group:
+                    done[slot].release()
+                counters[BATCHES] += 1
+                counters[FRAMES] += len(group)
+        counters[CPU_MICROS] += int((time.process_time() - started) * 1e6)
+
+    del header, frames, results, counters, rings
+    shm.close()
+
+
+class BatchedVADAnalyzer(VADAnalyzer):
+    """Silero VAD whose model and volume run in the shared worker process.
+
+    pipecat's speech/silence state machine still runs here, per call; only
+    ``voice_confidence`` and the frame volume cross to the worker. If the
+    worker stops answering, the call switches to an in-process Silero model
+    for the rest of its life.
+    """
+
+    def __init__(self, engine: "BatchedVADEngine", slot: int, *, params: Optional[VADParams] = None):
+        super().__init__(params=params)
+        self._engine = engine
+        self._slot = slot
+        self._volume = 0.0
+        self._local: Optional[SileroVADAnalyzer] = None
+
+    def set_sample_rate(self, sample_rate: int):
+        if sample_rate != 16000 and sample_rate != 8000:
+            raise ValueError(f"Silero VAD sample rate needs to be 16000 or 8000 (sample rate: {sample_rate})")
+        super().set_sample_rate(sample_rate)
+        self._engine.rings.header[self._slot, SAMPLE_RATE] = self.sample_rate
+
+    def num_frames_required(self) -> int:
+        return 512 if self.sample_rate == 16000 else 256
+
+    def voice_confidence(self, buffer) -> float:
+        if self._local is None:
+            result = self._engine.infer(self._slot, buffer)
+            if result is not None:
+                confidence, self._volume = result
+                return confidence
+            self._local = self._engine.local_analyzer(self.sample_rate)
+        return self._local.voice_confidence(buffer)
+
+    def _get_smoothed_volume(self, audio: bytes) -> float:
+        if self._local is not None:
+            return super()._get_smoothed_volume(audio)
+        return exp_smoothing(self._volume, self._prev_volume, self._smoothing_factor)
+
+
+class BatchedVADEngine:
+    """Runs VAD for every call in one worker process, batched across calls.
+
+    Each call gets a slot in a shared-memory block holding a small ring of
+    audio frames. A call's analyzer writes a frame into its ring and rings a
+    shared doorbell; the worker wakes, gathers the pending frame of every
+    call, runs one Silero inference and one volume computation for the whole
+    batch, and wakes each call with its result. Batches grow with load, so
+    per-frame overhead falls as calls are added and none of the model work
+    competes with the event loop for the GIL.
+
+    Has the same ``start``/``checkout``/``stats`` interface as VADPool; when
+    every slot is taken or the worker is down, new calls fall back to the
+    in-process pool, and calls already on the worker switch to a local
+    model when it dies or stops draining their ring. The worker is spawned, so the main module must be safe
+    to import (server.py keeps its startup under ``__main__``).
+    """
+
+    def __init__(self, slots: int = 64, batch_window: float = 0.002, timeout: float = 0.5, fallback: Optional[VADPool] = None):
+        self.slots = slots
+        self.batch_window = batch_window
+        self.timeout = timeout
+        self.fallback = fallback or VADPool(size=0)
+        self.rings: Optional[SharedRings] = None
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._process = None
+        self._work = None
+        self._done: list = []
+        self._free: List[int] = []
+        self._in_use = 0
+        self._overflow = 0
+        self.timeouts = 0
+        self.switched_calls = 0
+        self._worker_lost = False
+
+    async def start(self):
+        """Start the worker process and wait for its model to load; on failure every call uses the in-process pool."""
+        await self.fallback.start()
+        started = time.perf_counter()
+        context = multiprocessing.get_context("spawn")
+        self._shm = shared_memory.SharedMemory(create=True, size=SharedRings.size(self.slots))
+        self.rings = SharedRings(self._shm.buf, self.slots)
+        self.rings.header[:] = 0
+        self.rings.counters[:] = 0
+        self._work = context.Semaphore(0)
+        self._done = [context.Semaphore(0) for _ in range(self.slots)]
+        ready = context.Event()
+        # Spawned, not forked, so the worker does not inherit the event loop's threads and locks
+        self._process = context.Process(
+            target=_worker_main,
+            args=(self._shm.name, self.slots, self._work, self._done, ready, self.batch_window),
+            name="vad-worker",
+            daemon=True,
+        )
+        self._process.start()
+        while not await asyncio.to_thread(ready.wait, 0.5):
+            if not self._process.is_alive():
+                logger.error(f"❌ VAD worker exited during startup (code {self._process.exitcode}); using in-process VAD")
+                await self.aclose()
+                return
+        self._free = list(range(self.slots))
+        logger.info(f"🎙️ Batched VAD worker ready: {self.slots} slots in {time.perf_counter() - started:.2f}s (pid {self._process.pid})")
+
+    async def aclose(self):
+        if self._process is not None:
+            self.rings.counters[STOP] = 1
+            self._work.release()
+            await asyncio.to_thread(self._process.join, 2)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self._shm is not None:
+            self._free = []
+            self.rings = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def infer(self, slot: int, buffer: bytes) -> Optional[Tuple[float, float]]:
+        """Send one frame to the worker and wait for its (confidence, volume). Runs in pipecat's VAD thread.
+
+        Returns None when the worker is gone or this slot's ring is full of
+        unanswered frames; the caller should run VAD locally from then on.
+        """
+        process = self._process
+        if self._worker_lost or process is None:
+            return None
+        rings = self.rings
+        header = rings.header
+        head = int(header[slot, HEAD])
+        if head - int(header[slot, TAIL]) >= RING_FRAMES:
+            # Every frame in the ring timed out and is still queued; writing would overwrite one the worker has not read
+            return None
+        position = head % RING_FRAMES
+        samples = np.frombuffer(buffer, dtype=np.int16)
+        rings.frames[slot, position, :len(samples)] = samples
+        header[slot, HEAD] = head + 1
+        self._work.release()
+
+        deadline = time.monotonic() + self.timeout
+        # Results left over from a timed-out frame release the semaphore too; wait for this frame's
+        while header[slot, TAIL] <= head:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.timeouts += 1
+                if self.timeouts % 100 == 1:
+                    logger.warning(f"⚠️ VAD worker did not answer within {self.timeout * 1000:.0f}ms ({self.timeouts} timeouts)")
+                return 0.0, 0.0
+            if not self._done[slot].acquire(timeout=min(remaining, LIVENESS_CHECK_SECONDS)) and not process.is_alive():
+                if not self._worker_lost:
+                    self._worker_lost = True
+                    logger.error(f"❌ VAD worker exited (code {process.exitcode}); moving its calls to in-process VAD")
+                return None
+        confidence, volume = rings.results[slot, position]
+        return float(confidence), float(volume)
+
+    def local_analyzer(self, sample_rate: int) -> SileroVADAnalyzer:
+        """An in-process Silero model for a call moving off the worker."""
+        self.switched_calls += 1
+        analyzer = SileroVADAnalyzer()
+        analyzer.set_sample_rate(sample_rate)
+        return analyzer
+
+    @asynccontextmanager
+    async def checkout(self):
+        """A VAD analyzer for the lifetime of one call."""
+        if not self._free or self._worker_lost or self._process is None or not self._process.is_alive():
+            self._overflow += 1
+            async with self.fallback.checkout() as analyzer:
+                yield analyzer
+            return
+        slot = self._free.pop()
+        # A new generation tells the worker to start this slot from fresh model state
+        self.rings.header[slot, GENERATION] += 1
+        self._in_use += 1
+        try:
+            yield BatchedVADAnalyzer(self, slot)
+        finally:
+            self._in_use -= 1
+            self._free.append(slot)
+
+    def stats(self) -> Dict[str, Any]:
+        counters = self.rings.counters if self.rings is not None else np.zeros(4, dtype=np.int64)
+        batches, frames = int(counters[BATCHES]), int(counters[FRAMES])
+        return {
+            "engine": "batched",
+            "slots": self.slots,
+            "in_use": self._in_use,
+            "overflow_calls": self._overflow,
+            "worker_alive": bool(self._process is not None and self._process.is_alive()),
+            "batches": batches,
+            "frames": frames,
+            "avg_batch_size": round(frames / batches, 2) if batches else 0.0,
+            "worker_cpu_seconds": round(int(counters[CPU_MICROS]) / 1e6, 3),
+            "timeouts": self.timeouts,
+            "switched_calls": self.switched_calls,
+            "fallback": self.fallback.stats(),
+        }
+
+
+def vad_engine_from_env():
+    """VAD_ENGINE=batched runs VAD for all calls in a worker process; the default, "local", uses the in-process pool."""
+    pool = vad_pool_from_env()
+    if os.getenv("VAD_ENGINE", "local") != "batched":
+        return pool
+    return BatchedVADEngine(
+        slots=int(os.getenv("VAD_WORKER_SLOTS", "64")),
+        batch_window=float(os.getenv("VAD_WORKER_BATCH_MS", "2")) / 1000,
+        timeout=float(os.getenv("VAD_WORKER_TIMEOUT", "0.5")),
+        fallback=pool,
+    )
@@ -0,0 +1,115 @@
+"""Benchmark for WebSocket audio codecs: wire bytes per second per call and added latency.
+
+Runs 20 ms caller frames and 40 ms bot frames (pipecat's default output chunk)
+through the serializer each negotiated format uses, and reports:
+
+- wire KB/s per call in each direction (protobuf frames as sent on the socket)
+- codec time per frame, including the hop to the codec thread; this is all
+  the latency the codec adds, since chunks are resampled without holding audio back
+
+"pcm" with no rate is today's format: 16 kHz PCM in, 24 kHz PCM out.
+
+    python bench_codec.py --seconds 20
+"""
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import soxr
+from loguru import logger
+
+import pipecat.frames.protobufs.frames_pb2 as frame_protos
+from pipecat.frames.frames import OutputAudioRawFrame, StartFrame
+
+from audio_codec import CodecFrameSerializer, frame_serializer_for, negotiate_audio, ulaw_encode
+from loadtest import synthetic_utterance
+
+PIPELINE_IN_RATE = 16000
+PIPELINE_OUT_RATE = 24000
+IN_FRAME_SECONDS = 0.02
+OUT_FRAME_SECONDS = 0.04
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def client_frame(pcm: np.ndarray, codec: str, rate: int) -> bytes:
+    """What the browser sends: one protobuf audio frame at the wire rate."""
+    audio = pcm.tobytes()
+    if codec == "ulaw":
+        audio = ulaw_encode(audio)
+    proto = frame_protos.Frame()
+    proto.audio.audio = audio
+    proto.audio.sample_rate = rate
+    proto.audio.num_channels = 1
+    return proto.SerializeToString()
+
+
+async def run_mode(codec: str, sample_rate: Optional[int], seconds: float, speech: np.ndarray) -> Dict[str, Any]:
+    audio = negotiate_audio({"audio_codec": codec, "sample_rate": sample_rate})
+    serializer = frame_serializer_for(audio)
+    await serializer.setup(StartFrame(audio_in_sample_rate=PIPELINE_IN_RATE, audio_out_sample_rate=PIPELINE_OUT_RATE))
+    in_rate = audio["sample_rate"] or PIPELINE_IN_RATE
+
+    # Caller audio as the client would capture it at the wire rate
+    caller = soxr.resample(speech, PIPELINE_IN_RATE, in_rate).astype(np.int16) if in_rate != PIPELINE_IN_RATE else speech
+    bot = soxr.resample(speech, PIPELINE_IN_RATE, PIPELINE_OUT_RATE).astype(np.int16)
+    in_chunk, out_chunk = int(in_rate * IN_FRAME_SECONDS), int(PIPELINE_OUT_RATE * OUT_FRAME_SECONDS)
+
+    bytes_in = bytes_out = 0
+    in_times: List[float] = []
+    out_times: List[float] = []
+    for n in range(int(seconds / IN_FRAME_SECONDS)):
+        start = (n * in_chunk) % (len(caller) - in_chunk)
+        data = client_frame(caller[start:start + in_chunk], audio["codec"], in_rate)
+        bytes_in += len(data)
+        started = time.perf_counter()
+        await serializer.deserialize(data)
+        in_times.append(time.perf_counter() - started)
+    for n in range(int(seconds / OUT_FRAME_SECONDS)):
+        start = (n * out_chunk) % (len(bot) - out_chunk)
+        frame = OutputAudioRawFrame(audio=bot[start:start + out_chunk].tobytes(), sample_rate=PIPELINE_OUT_RATE, num_channels=1)
+        started = time.perf_counter()
+        payload = await serializer.serialize(frame)
+        out_times.append(time.perf_counter() - started)
+        bytes_out += len(payload or b"")
+    if isinstance(serializer, CodecFrameSerializer):
+        serializer._executor.shutdown()
+
+    return {
+        "format": f"{audio['codec']}@{audio['sample_rate'] or 'default'}",
+        "in_kbps": bytes_in / seconds / 1024,
+        "out_kbps": bytes_out / seconds / 1024,
+        "in_p50_us": percentile(in_times, 50) * 1e6,
+        "in_p99_us": percentile(in_times, 99) * 1e6,
+        "out_p50_us": percentile(out_times, 50) * 1e6,
+        "out_p99_us": percentile(out_times, 99) * 1e6,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=20.0, help="Seconds of audio per direction")
+    args = parser.parse_args()
+
+    logger.remove()
+    speech = np.frombuffer(b"".join(synthetic_utterance(2.0)), dtype=np.int16)
+    modes = [("pcm", None), ("pcm", 16000), ("pcm", 8000), ("ulaw", 16000), ("ulaw", 8000)]
+
+    print(f"{'format':<16} {'in KB/s':>8} {'out KB/s':>9} {'total':>7} {'in p50/p99 us':>15} {'out p50/p99 us':>16}")
+    baseline = None
+    for codec, rate in modes:
+        r = await run_mode(codec, rate, args.seconds, speech)
+        total = r["in_kbps"] + r["out_kbps"]
+        baseline = baseline or total
+        print(f"{r['format']:<16} {r['in_kbps']:>8.1f} {r['out_kbps']:>9.1f} {total:>7.1f} "
+              f"{r['in_p50_us']:>7.0f}/{r['in_p99_us']:<7.0f} {r['out_p50_us']:>8.0f}/{r['out_p99_us']:<7.0f} "
+              f"({total / baseline:.0%} of pcm)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,129 @@
+"""Benchmark for connect-to-first-greeting latency: pooled VAD analyzers vs per-call construction.
+
+For each mode this starts fake_services.py and a backend (uvicorn server:app)
+as subprocesses, then places ``--calls`` calls one after another with
+loadtest.py's synthetic caller and reports the time from the WebSocket
+connecting to the first greeting audio arriving, plus the pool's checkout
+wait from /stats. The first ``--warmup`` calls of each mode are placed but
+not counted, since they also pay the backend's own first-call costs.
+
+"per_call" is VAD_POOL_SIZE=0: every call builds and warms its own Silero
+analyzer, as before the pool. "pool" checks out a pre-warmed one.
+
+    python bench_greeting.py --calls 10
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from typing import Any, Dict, List
+
+import httpx
+from loguru import logger
+
+from loadtest import SyntheticCaller, percentile, synthetic_utterance
+
+MODES = {
+    "per_call": {"VAD_POOL_SIZE": "0"},
+    "pool": {"VAD_POOL_SIZE": "4"},
+}
+
+
+async def wait_until_up(url: str, timeout: float = 60.0):
+    async with httpx.AsyncClient(timeout=2) as http:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                await http.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.25)
+    raise RuntimeError(f"{url} did not come up within {timeout:.0f}s")
+
+
+async def run_mode(mode: str, calls: int, warmup: int, backend_port: int, fake_port: int, state_dir: str) -> Dict[str, Any]:
+    backend = f"http://127.0.0.1:{backend_port}"
+    env = {
+        **os.environ,
+        **MODES[mode],
+        "DEEPGRAM_BASE_URL": f"http://127.0.0.1:{fake_port}",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{fake_port}/v1",
+        "DEEPGRAM_API_KEY": "fake",
+        "OPENAI_API_KEY": "fake",
+        "PUBLIC_WS_URL": f"ws://127.0.0.1:{backend_port}",
+        "VAD_ENGINE": "local",
+        "LOG_LEVEL": "WARNING",
+        "LOG_LEVELS": "pipecat=WARNING",
+        # Keep the backend's journals and agent store out of the working tree
+        "AGENT_STORE_PATH": os.path.join(state_dir, f"{mode}-agents.db"),
+        "POST_CALL_JOURNAL_DIR": os.path.join(state_dir, f"{mode}-post_call"),
+        "TRANSCRIPT_JOURNAL_DIR": os.path.join(state_dir, f"{mode}-transcripts"),
+    }
+    processes = [
+        subprocess.Popen([sys.executable, "fake_services.py", "--port", str(fake_port)], env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+        subprocess.Popen([sys.executable, "-m", "uvicorn", "server:app", "--port", str(backend_port)], env=env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+    ]
+    try:
+        await wait_until_up(f"http://127.0.0.1:{fake_port}/")
+        await wait_until_up(f"{backend}/stats")
+        utterance = synthetic_utterance()
+        latencies: List[float] = []
+        errors = []
+        async with httpx.AsyncClient(timeout=30) as http:
+            for n in range(warmup + calls):
+                caller = SyntheticCaller(backend, None, utterance, turns=0)
+                await caller.run(http)
+                if n < warmup:
+                    continue
+                if caller.error:
+                    errors.append(caller.error)
+                elif caller.greeting_latency is not None:
+                    latencies.append(caller.greeting_latency)
+            vad = (await http.get(f"{backend}/stats")).json()["vad_pool"]
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    return {
+        "mode": mode,
+        "calls": len(latencies),
+        "errors": errors,
+        "greeting_p50": percentile(latencies, 0.5),
+        "greeting_p90": percentile(latencies, 0.9),
+        "greeting_max": max(latencies, default=None),
+        "checkout_wait_avg_ms": vad.get("checkout_wait_avg_ms"),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=10, help="Calls per mode, placed one after another")
+    parser.add_argument("--warmup", type=int, default=1, help="Uncounted calls per mode before measuring")
+    parser.add_argument("--modes", default="per_call,pool")
+    parser.add_argument("--backend-port", type=int, default=7871)
+    parser.add_argument("--fake-port", type=int, default=8771)
+    args = parser.parse_args()
+
+    logger.remove()
+    print(f"{'mode':<10} {'calls':>5} {'greet p50':>10} {'greet p90':>10} {'greet max':>10} {'checkout avg':>13}")
+    for mode in args.modes.split(","):
+        with tempfile.TemporaryDirectory() as state_dir:
+            r = await run_mode(mode, args.calls, args.warmup, args.backend_port, args.fake_port, state_dir)
+        ms = lambda value: "-" if value is None else f"{value * 1000:.0f}ms"
+        print(f"{r['mode']:<10} {r['calls']:>5} {ms(r['greeting_p50']):>10} {ms(r['greeting_p90']):>10} "
+              f"{ms(r['greeting_max']):>10} {r['checkout_wait_avg_ms']:>11.1f}ms")
+        for error in sorted(set(r["errors"])):
+            print(f"❌ [{mode}] {error}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
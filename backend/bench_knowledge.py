@@ -0,0 +1,73 @@
+"""Benchmark for the per-agent knowledge index behind the lookup_company_info function.
+
+Reports index build time, lookup latency percentiles, and the system prompt size
+with the full company text versus the brand summary used with knowledge lookup.
+Prompt tokens are estimated at about 4 characters per token. ``--scale`` repeats
+the config's long-form fields to simulate a larger, crawled knowledge base.
+
+    python bench_knowledge.py --lookups 2000 --scale 1,10
+"""
+import time
+import argparse
+from typing import List
+
+from knowledge_index import build_knowledge_index
+from prompts import build_system_prompt, get_fallback_config
+
+
+QUERIES = [
+    "how much does it cost",
+    "pricing for small teams",
+    "do you integrate with salesforce",
+    "what does the platform do for call tracking",
+    "who are your customers",
+    "healthcare and insurance companies",
+    "ai analytics for marketing",
+    "why choose you over competitors",
+]
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--scale", default="1,10", help="Comma-separated multipliers for the long-form config fields")
+    args = parser.parse_args()
+
+    config = get_fallback_config()
+    full_tokens = len(build_system_prompt(config)) // 4
+    brief_tokens = len(build_system_prompt(config, knowledge_lookup=True)) // 4
+    print(f"System prompt: {full_tokens} tokens full, {brief_tokens} with knowledge lookup "
+          f"({full_tokens - brief_tokens} fewer per turn, {100 * (full_tokens - brief_tokens) / full_tokens:.0f}%)")
+
+    for scale in (int(s) for s in args.scale.split(",")):
+        scaled = {**config}
+        for field in ("products", "valueProps", "targetCustomers"):
+            scaled[field] = " ".join([config[field]] * scale)
+
+        started = time.perf_counter()
+        index = build_knowledge_index(scaled)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        latencies = []
+        for i in range(args.lookups):
+            started = time.perf_counter()
+            index.search(QUERIES[i % len(QUERIES)])
+            latencies.append((time.perf_counter() - started) * 1e6)
+
+        print(f"scale x{scale}: {len(index)} chunks, {len(index.vocab)} terms, build {build_ms:.1f}ms, "
+              f"lookup p50 {percentile(latencies, 50):.0f}us p99 {percentile(latencies, 99):.0f}us")
+
+    print("\nSample lookups:")
+    index = build_knowledge_index(config)
+    for query in QUERIES[:3]:
+        top = index.search(query, k=1)
+        print(f"  {query!r} -> {top[0]['source'] + ': ' + top[0]['text'][:100] if top else 'no result'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Benchmark for the session store at a large number of live sessions.
+
+Fills each backend with ``--sessions`` sessions shaped like the server's
+(an agent config, lead data and audio settings), then reports the fill rate,
+get and update latency percentiles as seen from the event loop, and the
+process's resident memory before and after filling. Each backend runs in a
+fresh process so the memory figures do not mix. The SQLite database lives
+in a temporary directory; its size on disk is reported alongside RSS.
+
+    python bench_sessions.py --sessions 100000 --backends memory,sqlite
+"""
+import os
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import multiprocessing
+from typing import Any, Dict, List
+
+from prompts import get_fallback_config
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def session_data(n: int) -> Dict[str, Any]:
+    return {
+        "agent_config": get_fallback_config(),
+        "created_at": "2026-01-01T00:00:00",
+        "audio": {"encoding": "mulaw", "sample_rate": 8000},
+        "lead_data": {"lead": {"name": f"caller {n}", "email": f"caller{n}@example.com"}, "final": True},
+    }
+
+
+async def run_backend(backend: str, sessions: int, lookups: int, path: str) -> Dict[str, Any]:
+    options = dict(max_entries=sessions, ttl_seconds=3600, idle_seconds=3600)
+    store = MemorySessionStore(**options) if backend == "memory" else SQLiteSessionStore(path, **options)
+    rss_before = rss_mb()
+
+    started = time.perf_counter()
+    for n in range(sessions):
+        await store.create(f"session-{n}", session_data(n))
+    fill_seconds = time.perf_counter() - started
+
+    ids = [f"session-{random.randrange(sessions)}" for _ in range(lookups)]
+    gets, updates = [], []
+    for session_id in ids:
+        started = time.perf_counter()
+        await store.get(session_id)
+        gets.append((time.perf_counter() - started) * 1e6)
+        started = time.perf_counter()
+        await store.update(session_id, node_id="local")
+        updates.append((time.perf_counter() - started) * 1e6)
+
+    return {
+        "backend": backend,
+        "sessions": len(store),
+        "fill_per_s": sessions / fill_seconds,
+        "get_p50": percentile(gets, 50), "get_p99": percentile(gets, 99),
+        "update_p50": percentile(updates, 50), "update_p99": percentile(updates, 99),
+        "rss_mb": rss_mb() - rss_before,
+        "disk_mb": os.path.getsize(path) / 2**20 if os.path.exists(path) else 0.0,
+    }
+
+
+def run_in_process(backend: str, sessions: int, lookups: int, path: str, results):
+    results.put(asyncio.run(run_backend(backend, sessions, lookups, path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--lookups", type=int, default=5000, help="Random get + update pairs after filling")
+    parser.add_argument("--backends", default="memory,sqlite")
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'sessions':>8} {'fill/s':>8} {'get p50':>8} {'get p99':>8} "
+          f"{'upd p50':>8} {'upd p99':>8} {'+RSS':>8} {'disk':>8}")
+    context = multiprocessing.get_context("spawn")
+    for backend in args.backends.split(","):
+        with tempfile.TemporaryDirectory() as tmp:
+            results = context.Queue()
+            process = context.Process(
+                target=run_in_process, args=(backend, args.sessions, args.lookups, os.path.join(tmp, "sessions.db"), results)
+            )
+            process.start()
+            r = results.get()
+            process.join()
+        print(f"{r['backend']:<8} {r['sessions']:>8} {r['fill_per_s']:>8.0f} {r['get_p50']:>6.0f}us {r['get_p99']:>6.0f}us "
+              f"{r['update_p50']:>6.0f}us {r['update_p99']:>6.0f}us {r['rss_mb']:>6.0f}MB {r['disk_mb']:>6.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark for parsing LLM JSON output: parse success rate and time per response.
+
+Runs a corpus of agent-config responses in the shapes models actually return
+(clean JSON, code fences, prose around the object, braces inside strings,
+missing or truncated braces, bad fields) through the previous regex-based
+cleaner and through structured_output's single-pass extractor. A response
+counts as parsed when it yields a config that passes the schema; responses
+the extractor rejects are the ones parse_or_repair sends to a repair call.
+
+    python bench_structured.py --repeat 2000
+"""
+import re
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Tuple
+
+from prompts import get_fallback_config
+from structured_output import AGENT_CONFIG_SCHEMA, StructuredOutputError, check_schema, parse_structured
+
+
+def legacy_parse(content: str) -> Dict[str, Any]:
+    """The regex cleanup plus json.loads that research and lead analysis used before schema outputs."""
+    if not content or content.strip() == "":
+        raise ValueError("Empty response from LLM")
+    content = content.strip()
+    content = re.sub(r'^```json\s*', '', content)
+    content = re.sub(r'^```\s*', '', content)
+    content = re.sub(r'\s*```$', '', content)
+    cleaned = content.strip().strip('`').strip()
+    if not cleaned.startswith('{') and '"name"' in cleaned:
+        if cleaned.startswith('"name"'):
+            cleaned = '{' + cleaned
+        if not cleaned.endswith('}'):
+            cleaned = cleaned + '}'
+    return check_schema(json.loads(cleaned), AGENT_CONFIG_SCHEMA)
+
+
+def build_corpus() -> List[Tuple[str, str]]:
+    config = get_fallback_config()
+    compact = json.dumps(config)
+    pretty = json.dumps(config, indent=2)
+    braces = json.dumps({**config, "tone": "Friendly {never pushy}, with \"quotes\""}, indent=2)
+    return [
+        ("clean", pretty),
+        ("compact", compact),
+        ("fenced", f"```json\n{pretty}\n```"),
+        ("fenced_no_lang", f"```\n{pretty}\n```"),
+        ("prose_before", f"Here is the configuration based on my research:\n\n{pretty}"),
+        ("prose_after", f"{pretty}\n\nLet me know if you want changes."),
+        ("fenced_with_prose", f"Sure! Here it is:\n```json\n{pretty}\n```\nHope this helps."),
+        ("braces_in_strings", braces),
+        ("citations_after", f"{pretty}\n\nSources: [1] https://example.com/about {{ref}}"),
+        ("missing_open_brace", pretty.strip()[1:].lstrip()),
+        ("missing_close_brace", pretty.rstrip()[:-1]),
+        ("truncated_mid_value", pretty[: len(pretty) // 2]),
+        ("missing_field", json.dumps({k: v for k, v in config.items() if k != "tone"})),
+        ("empty", ""),
+    ]
+
+
+def run(parse: Callable[[str], Dict[str, Any]], corpus: List[Tuple[str, str]], repeat: int) -> Tuple[Dict[str, bool], float]:
+    outcomes = {}
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for name, text in corpus:
+            try:
+                parse(text)
+                outcomes[name] = True
+            except (ValueError, StructuredOutputError):
+                outcomes[name] = False
+    per_parse = (time.perf_counter() - started) / (repeat * len(corpus))
+    return outcomes, per_parse
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = build_corpus()
+    legacy, legacy_time = run(legacy_parse, corpus, args.repeat)
+    single_pass, single_pass_time = run(lambda text: parse_structured(text, AGENT_CONFIG_SCHEMA), corpus, args.repeat)
+
+    print(f"{'response shape':<22} {'legacy':>8} {'single-pass':>12}")
+    for name, _ in corpus:
+        print(f"{name:<22} {'ok' if legacy[name] else 'FAIL':>8} {'ok' if single_pass[name] else 'repair':>12}")
+    print()
+    for label, outcomes, per_parse in (("legacy", legacy, legacy_time), ("single-pass", single_pass, single_pass_time)):
+        rate = 100 * sum(outcomes.values()) / len(outcomes)
+        print(f"{label:<12} parsed {sum(outcomes.values())}/{len(outcomes)} ({rate:.0f}%), {per_parse * 1e6:.1f}us per response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark for VAD engines: CPU per call, calls per core and event-loop lag.
+
+Simulates N concurrent calls in one event loop. Each call feeds 20 ms audio
+frames in real time (alternating speech and silence) to its analyzer through
+its own single-thread executor, the way pipecat's input transport does.
+"local" gives every call its own in-process SileroVADAnalyzer; "batched" uses
+the shared worker process from batched_vad.py. CPU counts this process plus
+the worker, so calls per core is the VAD-only ceiling for one core. The
+"turns" column counts transitions into SPEAKING per call, as a check that
+the analyzers really detect the speech (one per 3 s of audio).
+
+    python bench_vad.py --levels 1,10,30 --seconds 10
+"""
+import os
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.audio.vad.vad_analyzer import VADState
+
+from batched_vad import BatchedVADEngine
+from loadtest import FRAME_SECONDS, synthetic_utterance
+from loop_monitor import LoopMonitor
+from vad_pool import VADPool
+
+
+def process_cpu_seconds(pid: Optional[int]) -> float:
+    """User + system CPU of another process, from /proc."""
+    if pid is None:
+        return 0.0
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+async def run_call(analyzer, audio: List[bytes], seconds: float, latencies: List[float]) -> int:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=1)
+    analyzer.set_sample_rate(16000)
+    started = time.monotonic()
+    n = turns = 0
+    state = VADState.QUIET
+    try:
+        while time.monotonic() - started < seconds:
+            frame_started = time.perf_counter()
+            previous, state = state, await loop.run_in_executor(executor, analyzer.analyze_audio, audio[n % len(audio)])
+            turns += state == VADState.SPEAKING and previous != VADState.SPEAKING
+            latencies.append(time.perf_counter() - frame_started)
+            n += 1
+            # Frames arrive in real time, not as fast as VAD can take them
+            await asyncio.sleep(max(0.0, started + n * FRAME_SECONDS - time.monotonic()))
+    finally:
+        executor.shutdown(wait=False)
+    return turns
+
+
+async def run_level(engine, calls: int, seconds: float, audio: List[bytes], worker_pid: Optional[int]) -> Dict[str, Any]:
+    monitor = LoopMonitor(interval=0.02, window=100000)
+    latencies: List[float] = []
+    async with AsyncExitStack() as stack:
+        analyzers = [await stack.enter_async_context(engine.checkout()) for _ in range(calls)]
+        monitor.start()
+        cpu_before = time.process_time() + process_cpu_seconds(worker_pid)
+        started = time.monotonic()
+        turns = await asyncio.gather(*(run_call(analyzer, audio, seconds, latencies) for analyzer in analyzers))
+        wall = time.monotonic() - started
+        cpu = time.process_time() + process_cpu_seconds(worker_pid) - cpu_before
+        monitor.stop()
+    cores = cpu / wall
+    return {
+        "calls": calls,
+        "cpu_per_call": cores / calls,
+        "calls_per_core": calls / cores if cores else float("inf"),
+        "turns_per_call": sum(turns) / calls,
+        "frame_p50_ms": percentile(latencies, 50) * 1000,
+        "frame_p99_ms": percentile(latencies, 99) * 1000,
+        "lag_p99_ms": monitor.lag_percentile(0.99) * 1000,
+        "lag_max_ms": max(monitor._lags, default=0.0) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,10,30", help="Comma-separated concurrent call counts")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--engines", default="local,batched")
+    args = parser.parse_args()
+
+    logger.remove()
+    # 1.5 s of speech then 1.5 s of silence, so the state machine sees both
+    speech = synthetic_utterance()
+    audio = speech + [bytes(len(speech[0]))] * len(speech)
+    levels = [int(level) for level in args.levels.split(",")]
+
+    print(f"{'engine':<8} {'calls':>5} {'cpu/call':>9} {'calls/core':>11} {'frame p50':>10} {'frame p99':>10} {'lag p99':>8} {'lag max':>8} {'turns':>6}")
+    for name in args.engines.split(","):
+        if name == "batched":
+            engine = BatchedVADEngine(slots=max(levels), fallback=VADPool(size=0))
+        else:
+            engine = VADPool(size=max(levels))
+        await engine.start()
+        worker_pid = engine._process.pid if name == "batched" else None
+        for calls in levels:
+            r = await run_level(engine, calls, args.seconds, audio, worker_pid)
+            print(f"{name:<8} {r['calls']:>5} {r['cpu_per_call'] * 100:>8.1f}% {r['calls_per_core']:>11.0f} "
+                  f"{r['frame_p50_ms']:>8.2f}ms {r['frame_p99_ms']:>8.2f}ms {r['lag_p99_ms']:>6.1f}ms {r['lag_max_ms']:>6.1f}ms {r['turns_per_call']:>6.1f}")
+        await engine.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
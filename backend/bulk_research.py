@@ -0,0 +1,264 @@
+import os
+import time
+import uuid
+import random
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` units per second, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        # One waiter at a time keeps the bucket first-come, first-served
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class BulkResearchJob:
+    """One submitted batch of URLs and the per-domain state of its research."""
+
+    def __init__(self, job_id: str, items: "OrderedDict[str, Dict[str, Any]]"):
+        self.job_id = job_id
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        # Canonical domain -> item state
+        self.items = items
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return all(item["status"] in ("done", "failed") for item in self.items.values())
+
+    def counts(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for item in self.items.values():
+            counts[item["status"]] += 1
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "total": len(self.items),
+            "counts": self.counts(),
+            "items": [self.item_status(item) for item in self.items.values()],
+        }
+
+    @staticmethod
+    def item_status(item: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in item.items() if key != "config"}
+
+    def subscribe(self) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, item: Dict[str, Any]):
+        if self.done and self.finished_at is None:
+            self.finished_at = time.time()
+        for queue in self._subscribers:
+            queue.put_nowait(self.item_status(item))
+            if self.done:
+                queue.put_nowait(None)
+
+
+class BulkResearchScheduler:
+    """Runs website research for batches of URLs under shared limits.
+
+    Every job's domains go through one queue served by ``max_concurrency``
+    workers, and each attempt first takes one request and ``tokens_per_request``
+    estimated tokens from the OpenAI rate-limit buckets. A domain appearing more
+    than once in a batch is researched once. Attempts that fail, or that come
+    back as the fallback config, are retried with jittered exponential backoff.
+    The last failure keeps the fallback config.
+
+    ``research(url) -> (config, cache_hit)`` is injected, so a stub can stand in
+    for the LLM.
+    """
+
+    def __init__(
+        self,
+        research: Callable[[str], Awaitable[Tuple[Dict[str, Any], bool]]],
+        canonicalize: Callable[[str], str],
+        fallback_config: Callable[[], Dict[str, Any]],
+        max_concurrency: int = 4,
+        requests_per_minute: float = 60.0,
+        tokens_per_minute: float = 400_000.0,
+        tokens_per_request: int = 8_000,
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+        max_jobs: int = 100,
+        max_urls: int = 1000,
+    ):
+        self.research = research
+        self.canonicalize = canonicalize
+        self.fallback_config = fallback_config
+        self.max_concurrency = max_concurrency
+        self.tokens_per_request = tokens_per_request
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_jobs = max_jobs
+        self.max_urls = max_urls
+        self.request_bucket = TokenBucket(requests_per_minute / 60.0, max(requests_per_minute / 60.0, 1.0) * 5)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60.0, max(tokens_per_minute / 60.0 * 5, tokens_per_request))
+        self.jobs: "OrderedDict[str, BulkResearchJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+
+    def start(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrency)]
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, urls: List[str]) -> BulkResearchJob:
+        """Queue research for ``urls`` and return the new job."""
+        if self._queue is None:
+            self.start()
+        if len(urls) > self.max_urls:
+            raise ValueError(f"At most {self.max_urls} URLs per job")
+
+        items: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for url in urls:
+            url = url.strip()
+            if not url:
+                continue
+            if not url.startswith(('http://', 'https://')):
+                url = 'https://' + url
+            domain = self.canonicalize(url)
+            if domain in items:
+                items[domain]["duplicates"].append(url)
+                continue
+            items[domain] = {
+                "url": url,
+                "domain": domain,
+                "duplicates": [],
+                "status": "queued",
+                "attempts": 0,
+                "cache_hit": None,
+                "error": None,
+                "config": None,
+            }
+        if not items:
+            raise ValueError("No URLs to research")
+
+        job = BulkResearchJob(str(uuid.uuid4()), items)
+        self.jobs[job.job_id] = job
+        self._evict_finished_jobs()
+        for item in items.values():
+            self._queue.put_nowait((job, item))
+        logger.info(f"📦 Bulk research job {job.job_id}: {len(items)} domain(s) from {len(urls)} URL(s)")
+        return job
+
+    def get(self, job_id: str) -> Optional[BulkResearchJob]:
+        return self.jobs.get(job_id)
+
+    def _evict_finished_jobs(self):
+        for job_id in list(self.jobs):
+            if len(self.jobs) <= self.max_jobs:
+                break
+            if self.jobs[job_id].done:
+                del self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job, item = await self._queue.get()
+            try:
+                await self._run_item(job, item)
+            except Exception as e:
+                logger.error(f"❌ Bulk research worker error for {item['url']}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_item(self, job: BulkResearchJob, item: Dict[str, Any]):
+        item["status"] = "running"
+        job.publish(item)
+        fallback = self.fallback_config()
+        while True:
+            item["attempts"] += 1
+            await self.request_bucket.acquire()
+            await self.token_bucket.acquire(self.tokens_per_request)
+            try:
+                config, cache_hit = await self.research(item["url"])
+                if config == fallback:
+                    raise RuntimeError("Research returned the fallback config")
+                item.update(status="done", config=config, cache_hit=cache_hit, error=None)
+                self.completed += 1
+                break
+            except Exception as e:
+                item["error"] = str(e)
+                if item["attempts"] > self.max_retries:
+                    logger.warning(f"⚠️ Giving up on {item['url']} after {item['attempts']} attempts: {e}")
+                    item.update(status="failed", config={**fallback, "websiteUrl": item["url"]})
+                    self.failed += 1
+                    break
+                self.retries += 1
+                # Full jitter so retries from a throttled batch do not arrive together
+                await asyncio.sleep(random.uniform(0, self.backoff_base ** item["attempts"]))
+        job.publish(item)
+
+    def results(self, job: BulkResearchJob) -> Dict[str, Any]:
+        """Every finished URL's agent config, including duplicates of a researched domain."""
+        configs = {}
+        for item in job.items.values():
+            if item["config"] is None:
+                continue
+            for url in [item["url"]] + item["duplicates"]:
+                configs[url] = {**item["config"], "websiteUrl": url}
+        return {"job_id": job.job_id, "counts": job.counts(), "configs": configs}
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "jobs": len(self.jobs),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+        }
+
+
+def bulk_research_from_env(research, canonicalize, fallback_config) -> BulkResearchScheduler:
+    return BulkResearchScheduler(
+        research,
+        canonicalize,
+        fallback_config,
+        max_concurrency=int(os.getenv("BULK_RESEARCH_CONCURRENCY", "4")),
+        requests_per_minute=float(os.getenv("BULK_RESEARCH_REQUESTS_PER_MINUTE", "60")),
+        tokens_per_minute=float(os.getenv("BULK_RESEARCH_TOKENS_PER_MINUTE", "400000")),
+        tokens_per_request=int(os.getenv("BULK_RESEARCH_TOKENS_PER_REQUEST", "8000")),
+        max_retries=int(os.getenv("BULK_RESEARCH_MAX_RETRIES", "3")),
+    )
@@ -0,0 +1,281 @@
+"""Local stand-ins for Deepgram live STT, the OpenAI chat LLM and OpenAI TTS, for load testing.
+
+Run it, then point the backend at it:
+
+    python fake_services.py --port 8765 --stt-latency 0.15 --llm-ttft 0.35 --tts-ttfb 0.2
+
+    DEEPGRAM_BASE_URL=http://127.0.0.1:8765 OPENAI_BASE_URL=http://127.0.0.1:8765/v1 \\
+    DEEPGRAM_API_KEY=fake OPENAI_API_KEY=fake PUBLIC_WS_URL=ws://127.0.0.1:7860 \\
+    uvicorn server:app --port 7860
+"""
+import math
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from array import array
+
+import uvicorn
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+class FakeLatency:
+    stt_latency = 0.15
+    llm_ttft = 0.35
+    llm_token_interval = 0.02
+    tts_ttfb = 0.2
+    tts_seconds_per_char = 0.06
+
+
+REPLY = "Thanks for calling! I'd be happy to help you with that. Could you tell me a little more about what you need?"
+GREETING = "Hi there! I'm Gaia, an AI voice assistant. Who do I have the pleasure of speaking with today?"
+TRANSCRIPT = "Hi, I'm interested in learning more about your services."
+RESEARCH_CONFIG = {
+    "name": "Gaia",
+    "legalName": "Example, Inc.",
+    "brandName": "Example",
+    "brandVision": "Making examples for everyone.",
+    "industry": "Examples",
+    "products": "Example products.",
+    "valueProps": "The best examples.",
+    "targetCustomers": "Anyone who needs an example.",
+    "tone": "Friendly and clear.",
+}
+
+LEAD_ANALYSIS = {
+    "name": None,
+    "email": None,
+    "phone": None,
+    "qualification_status": "❄️ Cold",
+    "qualification_reason": "Load test call",
+    "pain_points": None,
+    "summary": "Synthetic load test conversation.",
+    "next_steps": "None",
+}
+
+# Incoming linear16 audio louder than this counts as speech
+SPEECH_RMS_THRESHOLD = 500
+END_OF_SPEECH_SILENCE = 0.3
+TTS_SAMPLE_RATE = 24000
+
+app = FastAPI()
+
+
+def _rms(chunk: bytes) -> float:
+    samples = array("h", chunk[: len(chunk) - len(chunk) % 2])
+    if not samples:
+        return 0.0
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+def _deepgram_result(transcript: str, start: float, duration: float) -> str:
+    return json.dumps({
+        "type": "Results",
+        "channel_index": [0, 1],
+        "duration": duration,
+        "start": start,
+        "is_final": True,
+        "speech_final": True,
+        "from_finalize": False,
+        "channel": {"alternatives": [{"transcript": transcript, "confidence": 0.99, "words": []}]},
+        "metadata": {
+            "request_id": str(uuid.uuid4()),
+            "model_info": {"name": "fake", "version": "0", "arch": "fake"},
+            "model_uuid": str(uuid.uuid4()),
+        },
+    })
+
+
+async def _send_transcript(websocket: WebSocket, start: float, duration: float):
+    await asyncio.sleep(FakeLatency.stt_latency)
+    try:
+        await websocket.send_text(_deepgram_result(TRANSCRIPT, start, duration))
+    except Exception:
+        pass
+
+
+@app.websocket("/v1/listen")
+async def fake_deepgram(websocket: WebSocket):
+    """Emit one final transcript shortly after each burst of speech in the incoming audio."""
+    await websocket.accept()
+    # Pipecat streams linear16 at the rate it passes in the query string
+    sample_rate = int(websocket.query_params.get("sample_rate", 16000))
+    received_seconds = 0.0
+    speech_started = None
+    silence = 0.0
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            chunk = message.get("bytes")
+            if not chunk:
+                # KeepAlive / CloseStream control messages
+                if message.get("text") and "CloseStream" in message["text"]:
+                    break
+                continue
+            seconds = len(chunk) / 2 / sample_rate
+            if _rms(chunk) >= SPEECH_RMS_THRESHOLD:
+                if speech_started is None:
+                    speech_started = received_seconds
+                silence = 0.0
+            elif speech_started is not None:
+                silence += seconds
+                if silence >= END_OF_SPEECH_SILENCE:
+                    start, duration = speech_started, received_seconds - speech_started
+                    speech_started = None
+                    asyncio.create_task(_send_transcript(websocket, start, duration))
+            received_seconds += seconds
+    except WebSocketDisconnect:
+        pass
+
+
+def _chat_chunk(completion_id: str, delta: dict, finish_reason=None) -> str:
+    return "data: " + json.dumps({
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }) + "\n\n"
+
+
+# Prompt prefixes seen so far, to report provider-style cached tokens
+_seen_prefixes = set()
+
+
+def _usage_chunk(completion_id: str, body: dict) -> str:
+    """Usage with roughly 4 characters per token, counting a repeated system prefix as cached in 128-token blocks."""
+    messages = body.get("messages", [])
+    prompt_tokens = sum(len(str(m.get("content", ""))) for m in messages) // 4
+    prefix = json.dumps(body.get("tools")) + str(messages[0].get("content", "")) if messages else ""
+    cached_tokens = 0
+    if prefix in _seen_prefixes:
+        cached_tokens = len(prefix) // 4 // 128 * 128
+    _seen_prefixes.add(prefix)
+    return "data: " + json.dumps({
+        "id": completion_id,
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": "fake",
+        "choices": [],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": len(REPLY.split(" ")),
+            "total_tokens": prompt_tokens + len(REPLY.split(" ")),
+            "prompt_tokens_details": {"cached_tokens": cached_tokens},
+        },
+    }) + "\n\n"
+
+
+@app.post("/v1/chat/completions")
+async def fake_chat_completions(request: Request):
+    body = await request.json()
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    if not body.get("stream"):
+        # Pre-generated greeting (ends on a system instruction), crawler research or post-call lead analysis
+        await asyncio.sleep(FakeLatency.llm_ttft)
+        messages = body.get("messages", [])
+        if messages and messages[-1]["role"] == "system":
+            content = GREETING
+        elif messages and "<website_content>" in messages[-1]["content"]:
+            # Research from crawled website content
+            content = json.dumps(RESEARCH_CONFIG, indent=2)
+        else:
+            content = json.dumps(LEAD_ANALYSIS)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "fake",
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": content},
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    async def stream():
+        await asyncio.sleep(FakeLatency.llm_ttft)
+        yield _chat_chunk(completion_id, {"role": "assistant", "content": ""})
+        for word in REPLY.split(" "):
+            yield _chat_chunk(completion_id, {"content": word + " "})
+            await asyncio.sleep(FakeLatency.llm_token_interval)
+        yield _chat_chunk(completion_id, {}, finish_reason="stop")
+        if body.get("stream_options", {}).get("include_usage"):
+            yield _usage_chunk(completion_id, body)
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+def _response_event(event_type: str, sequence_number: int, **fields) -> str:
+    return f"event: {event_type}\ndata: " + json.dumps({"type": event_type, "sequence_number": sequence_number, **fields}) + "\n\n"
+
+
+@app.post("/v1/responses")
+async def fake_responses(request: Request):
+    """Streamed web-search research: a search, then the agent config JSON a few characters at a time."""
+    body = await request.json()
+    config = json.dumps(RESEARCH_CONFIG, indent=2)
+
+    async def stream():
+        seq = 0
+        for event_type in ("response.web_search_call.in_progress", "response.web_search_call.searching"):
+            yield _response_event(event_type, seq, item_id="ws_fake", output_index=0)
+            seq += 1
+        await asyncio.sleep(FakeLatency.llm_ttft * 4)
+        yield _response_event("response.web_search_call.completed", seq, item_id="ws_fake", output_index=0)
+        for i in range(0, len(config), 8):
+            seq += 1
+            yield _response_event("response.output_text.delta", seq, item_id="msg_fake", output_index=1, content_index=0, delta=config[i:i + 8])
+            await asyncio.sleep(FakeLatency.llm_token_interval)
+        yield "data: [DONE]\n\n"
+
+    if not body.get("stream"):
+        return JSONResponse({"error": {"message": "fake /v1/responses only streams"}}, status_code=400)
+    return StreamingResponse(stream(), media_type="text/event-stream")
+
+
+@app.post("/v1/audio/speech")
+async def fake_speech(request: Request):
+    """Stream a quiet tone as 24 kHz PCM, roughly as long as the text would take to say."""
+    body = await request.json()
+    seconds = max(len(body.get("input", "")) * FakeLatency.tts_seconds_per_char, 0.3)
+    chunk_seconds = 0.1
+    samples_per_chunk = int(TTS_SAMPLE_RATE * chunk_seconds)
+    tone = array("h", (int(3000 * math.sin(2 * math.pi * 220 * i / TTS_SAMPLE_RATE)) for i in range(samples_per_chunk))).tobytes()
+
+    async def stream():
+        await asyncio.sleep(FakeLatency.tts_ttfb)
+        for _ in range(int(seconds / chunk_seconds)):
+            yield tone
+            # Synthesis runs faster than real time
+            await asyncio.sleep(chunk_seconds / 4)
+
+    return StreamingResponse(stream(), media_type="audio/pcm")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Deepgram/OpenAI services for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--stt-latency", type=float, default=FakeLatency.stt_latency)
+    parser.add_argument("--llm-ttft", type=float, default=FakeLatency.llm_ttft)
+    parser.add_argument("--llm-token-interval", type=float, default=FakeLatency.llm_token_interval)
+    parser.add_argument("--tts-ttfb", type=float, default=FakeLatency.tts_ttfb)
+    args = parser.parse_args()
+
+    FakeLatency.stt_latency = args.stt_latency
+    FakeLatency.llm_ttft = args.llm_ttft
+    FakeLatency.llm_token_interval = args.llm_token_interval
+    FakeLatency.tts_ttfb = args.tts_ttfb
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+
+from pipecat.services.llm_service import FunctionCallParams
+
+from llm_context import config_key
+from prompts import get_fallback_config
+
+
+# Config fields the agent looks up on demand instead of carrying in every prompt
+KNOWLEDGE_FIELDS = {
+    "products": "Products and services",
+    "valueProps": "Value propositions",
+    "targetCustomers": "Target customers",
+    "brandVision": "Mission and vision",
+}
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+SENTENCE_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+STOPWORDS = frozenset(
+    "a an and are as at be but by can do does for from has have how i in is it its of on or our "
+    "so that the their them they this to was we what when where which who will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def chunk_text(text: str, max_words: int = 60) -> List[str]:
+    """Split ``text`` into chunks of whole sentences, about ``max_words`` words each."""
+    chunks, current, words = [], [], 0
+    for sentence in SENTENCE_RE.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        count = len(sentence.split())
+        if current and words + count > max_words:
+            chunks.append(" ".join(current))
+            current, words = [], 0
+        current.append(sentence)
+        words += count
+    if current:
+        chunks.append(" ".join(current))
+    return chunks
+
+
+class KnowledgeIndex:
+    """BM25 over an agent's company knowledge, split into short chunks.
+
+    The BM25 weight of every (chunk, term) pair is computed once at build time
+    into a dense matrix, so a lookup is a column sum over the query's terms.
+    Agent configs make a few dozen chunks, which keeps the matrix small.
+    """
+
+    def __init__(self, chunks: List[Tuple[str, str]], k1: float = 1.5, b: float = 0.75):
+        # (source label, text) per chunk
+        self.chunks = chunks
+        docs = [tokenize(text) for _, text in chunks]
+        self.vocab: Dict[str, int] = {}
+        for doc in docs:
+            for token in doc:
+                self.vocab.setdefault(token, len(self.vocab))
+
+        tf = np.zeros((len(docs), len(self.vocab)), dtype=np.float32)
+        for row, doc in enumerate(docs):
+            for token in doc:
+                tf[row, self.vocab[token]] += 1
+        df = (tf > 0).sum(axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        lengths = tf.sum(axis=1, keepdims=True)
+        norm = k1 * (1 - b + b * lengths / max(float(lengths.mean()), 1.0)) if len(docs) else lengths
+        self._weights = idf * tf * (k1 + 1) / (tf + norm)
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """Up to ``k`` chunks most relevant to ``query``, best first."""
+        columns = [self.vocab[token] for token in set(tokenize(query)) if token in self.vocab]
+        if not columns:
+            return []
+        scores = self._weights[:, columns].sum(axis=1)
+        top = np.argsort(-scores)[:k]
+        return [
+            {"source": self.chunks[i][0], "text": self.chunks[i][1], "score": round(float(scores[i]), 3)}
+            for i in top
+            if scores[i] > 0
+        ]
+
+    def __len__(self) -> int:
+        return len(self.chunks)
+
+
+def build_knowledge_index(agent_config: Optional[Dict[str, Any]] = None) -> KnowledgeIndex:
+    """Index the long-form fields of an agent config (the fallback config when none is given)."""
+    agent_config = agent_config or get_fallback_config()
+    chunks = []
+    for field, label in KNOWLEDGE_FIELDS.items():
+        text = agent_config.get(field)
+        if isinstance(text, str):
+            chunks.extend((label, chunk) for chunk in chunk_text(text))
+    return KnowledgeIndex(chunks)
+
+
+_index_cache: "OrderedDict[str, KnowledgeIndex]" = OrderedDict()
+_INDEX_CACHE_SIZE = 256
+# Indexes are built in worker threads (asyncio.to_thread), so the cache is shared between them
+_index_lock = threading.Lock()
+
+
+def knowledge_index_for(agent_config: Optional[Dict[str, Any]] = None) -> KnowledgeIndex:
+    """The knowledge index for an agent config, built once and shared by every call using it.
+
+    Building tokenizes every chunk; call it through ``asyncio.to_thread`` from the event loop.
+    """
+    key = config_key(agent_config)
+    with _index_lock:
+        index = _index_cache.get(key)
+        if index is not None:
+            _index_cache.move_to_end(key)
+            return index
+    started = time.perf_counter()
+    index = build_knowledge_index(agent_config)
+    logger.debug(f"📚 Built knowledge index: {len(index)} chunks, {len(index.vocab)} terms in {(time.perf_counter() - started) * 1000:.1f}ms")
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > _INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def lookup_company_info_handler(index: KnowledgeIndex):
+    """The ``lookup_company_info`` function handler for a call, answering from ``index``."""
+
+    async def lookup_company_info(params: FunctionCallParams):
+        query = params.arguments.get("query", "")
+        results = index.search(query)
+        logger.debug(f"📚 lookup_company_info({query!r}): {len(results)} result(s)")
+        if results:
+            await params.result_callback({"results": [f"{result['source']}: {result['text']}" for result in results]})
+        else:
+            await params.result_callback({"results": [], "note": "Nothing found. Offer to have a specialist follow up instead of guessing."})
+
+    return lookup_company_info
@@ -0,0 +1,161 @@
+import re
+import asyncio
+from typing import Any, Callable, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import LLMFullResponseEndFrame
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+
+from openai_clients import openai_registry
+from prompts import build_lead_update_prompt
+from structured_output import LEAD_UPDATE_SCHEMA, chat_response_format, parse_or_repair
+
+
+LEAD_FIELDS = (
+    "name",
+    "email",
+    "phone",
+    "qualification_status",
+    "qualification_reason",
+    "pain_points",
+    "summary",
+    "next_steps",
+)
+
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+
+
+def conversation_turns(messages: List[Dict[str, Any]]) -> List[str]:
+    """User and assistant messages as "AGENT:"/"HUMAN:" lines, the format the lead prompts use."""
+    turns = []
+    for message in messages:
+        if message.get("role") in ("user", "assistant") and message.get("content"):
+            role = "AGENT" if message["role"] == "assistant" else "HUMAN"
+            turns.append(f"{role}: {message['content']}")
+    return turns
+
+
+def extract_confirmed_contact(turns: List[str]) -> Dict[str, str]:
+    """Email and phone the agent read back to the caller, e.g. "Let me confirm - that's jo@acme.com - correct?"."""
+    found = {}
+    for turn in turns:
+        if not turn.startswith("AGENT:") or "confirm" not in turn.lower():
+            continue
+        email = EMAIL_RE.search(turn)
+        if email:
+            found["email"] = email.group(0).rstrip(".")
+        phone = PHONE_RE.search(turn)
+        if phone:
+            found["phone"] = phone.group(0).strip()
+    return found
+
+
+async def update_lead(lead: Dict[str, Any], turns: List[str], agent_config: Optional[Dict[str, Any]] = None, model: str = "gpt-4o-mini") -> Dict[str, Any]:
+    """Fold ``turns`` into ``lead`` with one small LLM call and return the updated record."""
+    updated = {**lead, **extract_confirmed_contact(turns)}
+    async with openai_registry.request("lead_update") as client:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": build_lead_update_prompt(updated, "\n".join(turns), agent_config)}],
+            response_format=chat_response_format("lead_update", LEAD_UPDATE_SCHEMA),
+            max_tokens=400,
+            temperature=0.1,
+        )
+    extracted = await parse_or_repair(response.choices[0].message.content, LEAD_UPDATE_SCHEMA, "lead_update", "lead_update", model)
+    for field in LEAD_FIELDS:
+        if extracted.get(field) is not None:
+            updated[field] = extracted[field]
+    # Read-back contact details win over the model's reading of the transcript
+    updated.update(extract_confirmed_contact(turns))
+    return updated
+
+
+class LeadTracker(BaseObserver):
+    """Keeps a structured lead record up to date while the call is running.
+
+    After each bot response (debounced, so a burst of short turns costs one call)
+    the turns added since the last update are folded into the record in the
+    background. ``snapshot()`` is usable at any time; at hang-up only the turns
+    not folded in yet remain for a final reconciliation pass.
+
+    ``on_update(lead, turns)`` is called after each update with the record and
+    the number of conversation turns it covers.
+    """
+
+    def __init__(
+        self,
+        context: OpenAILLMContext,
+        agent_config: Optional[Dict[str, Any]] = None,
+        debounce: float = 2.0,
+        model: str = "gpt-4o-mini",
+        on_update: Optional[Callable[[Dict[str, Any], int], None]] = None,
+    ):
+        super().__init__()
+        self._context = context
+        self._agent_config = agent_config
+        self.debounce = debounce
+        self.model = model
+        self.on_update = on_update
+        self.lead: Dict[str, Any] = {field: None for field in LEAD_FIELDS}
+        # Conversation turns already folded into self.lead
+        self._processed = 0
+        self._timer: Optional[asyncio.Task] = None
+        # The most recently started update; updates hold _update_lock so only one runs at a time
+        self._update_task: Optional[asyncio.Task] = None
+        self._update_lock = asyncio.Lock()
+
+    async def on_push_frame(self, data: FramePushed):
+        if isinstance(data.frame, LLMFullResponseEndFrame):
+            self._schedule()
+
+    def _schedule(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.create_task(self._debounced_update())
+
+    async def _debounced_update(self):
+        await asyncio.sleep(self.debounce)
+        self._timer = None
+        task = self._update_task = asyncio.create_task(self._update())
+        await asyncio.shield(task)
+
+    async def _update(self):
+        try:
+            # Still folding in earlier turns: wait, then pick up whatever that update left
+            async with self._update_lock:
+                turns = conversation_turns(self._context.get_messages())
+                new_turns = turns[self._processed:]
+                if not new_turns:
+                    return
+                self.lead = await update_lead(self.lead, new_turns, self._agent_config, self.model)
+                self._processed = len(turns)
+                if self.on_update:
+                    self.on_update(self.snapshot(), self._processed)
+                logger.debug(f"📇 Lead record updated through turn {self._processed}: {self.lead.get('qualification_status')}")
+        except Exception as e:
+            logger.warning(f"Incremental lead update failed, will retry with the next turn: {e}")
+        finally:
+            if self._update_task is asyncio.current_task():
+                self._update_task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.lead)
+
+    def pending_turns(self) -> List[str]:
+        """Turns not folded into the record yet."""
+        return conversation_turns(self._context.get_messages())[self._processed:]
+
+    async def stop(self, timeout: float = 1.0) -> Dict[str, Any]:
+        """Stop scheduling updates, let a nearly finished one land, and return the state for reconciliation."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._update_task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._update_task), timeout)
+            except asyncio.TimeoutError:
+                self._update_task.cancel()
+        return {"lead": self.snapshot(), "pending_turns": self.pending_turns()}
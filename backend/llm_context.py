@@ -0,0 +1,149 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.adapters.schemas.function_schema import FunctionSchema
+from pipecat.adapters.schemas.tools_schema import ToolsSchema
+from pipecat.adapters.services.open_ai_adapter import OpenAILLMAdapter
+from pipecat.metrics.metrics import LLMTokenUsage
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
+from pipecat.services.openai.llm import OpenAILLMService
+
+from prompts import build_system_prompt
+from agent_store import config_hash
+from rolling_context import RollingContext
+from voice_metrics import LLM_PROMPT_TOKENS, LLM_TTFT_SECONDS
+
+
+# Define function schema for end conversation
+END_CONVERSATION_FUNCTION = FunctionSchema(
+    name="end_conversation",
+    description="End the conversation gracefully when the caller indicates they want to finish talking or when the conversation has reached its natural conclusion",
+    properties={},
+    required=[]
+)
+
+# Company details are looked up per question instead of riding along in every prompt
+LOOKUP_COMPANY_INFO_FUNCTION = FunctionSchema(
+    name="lookup_company_info",
+    description="Look up details about the company's products, services, pricing, packages, value propositions and target customers. Call this before answering any question about those topics",
+    properties={
+        "query": {
+            "type": "string",
+            "description": "What the caller wants to know, in a few words, e.g. 'pricing for small teams'",
+        },
+    },
+    required=["query"]
+)
+
+# Set KNOWLEDGE_LOOKUP=false to put the full product and customer text back into the system prompt
+KNOWLEDGE_LOOKUP = os.getenv("KNOWLEDGE_LOOKUP", "true").lower() == "true"
+
+# Same schema object for every call so the serialized tools never change
+TOOLS = ToolsSchema(standard_tools=[END_CONVERSATION_FUNCTION, LOOKUP_COMPANY_INFO_FUNCTION] if KNOWLEDGE_LOOKUP else [END_CONVERSATION_FUNCTION])
+
+# First per-call instruction; everything from here on may differ between calls
+OPENING_INSTRUCTION = "Start the conversation by greeting the caller professionally."
+
+_prefix_cache: "OrderedDict[str, str]" = OrderedDict()
+_PREFIX_CACHE_SIZE = 256
+
+
+def config_key(agent_config: Optional[Dict[str, Any]]) -> str:
+    """Key for per-agent precomputation: the config's content hash, as stored in the agent store."""
+    return config_hash(agent_config)
+
+
+def static_system_prompt(agent_config: Optional[Dict[str, Any]] = None) -> str:
+    """The brand system prompt, built once per agent config.
+
+    Providers cache prompts by exact prefix, so every call and every turn for the
+    same config must send this byte-for-byte unchanged, ahead of anything that
+    depends on the caller or the time of day.
+    """
+    key = config_key(agent_config)
+    prompt = _prefix_cache.get(key)
+    if prompt is None:
+        prompt = build_system_prompt(agent_config, knowledge_lookup=KNOWLEDGE_LOOKUP)
+        _prefix_cache[key] = prompt
+        while len(_prefix_cache) > _PREFIX_CACHE_SIZE:
+            _prefix_cache.popitem(last=False)
+    _prefix_cache.move_to_end(key)
+    return prompt
+
+
+def prefix_messages(agent_config: Optional[Dict[str, Any]] = None) -> List[Dict[str, str]]:
+    """Static system prefix followed by the opening instruction, in the order every call sends them."""
+    return [
+        {"role": "system", "content": static_system_prompt(agent_config)},
+        {"role": "system", "content": OPENING_INSTRUCTION},
+    ]
+
+
+def build_call_context(agent_config: Optional[Dict[str, Any]] = None) -> OpenAILLMContext:
+    """LLM context for a call. Per-call messages are appended after the prefix as the call goes."""
+    return OpenAILLMContext(prefix_messages(agent_config), tools=TOOLS)
+
+
+def openai_tools() -> List[Dict[str, Any]]:
+    """``TOOLS`` in the Chat Completions format, for requests made outside the pipeline."""
+    return OpenAILLMAdapter().to_provider_tools_format(TOOLS)
+
+
+class PromptCacheLLMService(OpenAILLMService):
+    """OpenAI LLM service that records, per turn, how much of the prompt the provider served from its cache.
+
+    Pipecat's usage metrics drop ``prompt_tokens_details.cached_tokens``; this reads it
+    off the final streamed chunk, fills it into the usage metrics frame, and records
+    it next to time-to-first-token so the effect of prompt caching is measurable.
+
+    With ``rolling_context`` every request's messages are trimmed to its token
+    budget here, where the context is consumed, whichever direction the context
+    frame arrived from.
+    """
+
+    def __init__(self, *, brand: Optional[str] = None, rolling_context: Optional[RollingContext] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._brand = brand or "unknown"
+        self._rolling_context = rolling_context
+        self._cached_tokens: Optional[int] = None
+
+    async def cleanup(self):
+        await super().cleanup()
+        if self._rolling_context:
+            await self._rolling_context.aclose()
+
+    async def get_chat_completions(self, context, messages):
+        if self._rolling_context:
+            messages = self._rolling_context.trim(messages)
+        started = time.monotonic()
+        chunks = await super().get_chat_completions(context, messages)
+        return self._track_usage(chunks, started)
+
+    async def _track_usage(self, chunks, started: float):
+        ttft = None
+        async for chunk in chunks:
+            if ttft is None and chunk.choices:
+                ttft = time.monotonic() - started
+            if chunk.usage:
+                self._record_usage(chunk.usage, ttft)
+            yield chunk
+
+    def _record_usage(self, usage, ttft: Optional[float]):
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) if details else None) or 0
+        self._cached_tokens = cached
+        LLM_PROMPT_TOKENS.labels(self._brand, "cached").observe(cached)
+        LLM_PROMPT_TOKENS.labels(self._brand, "uncached").observe(max(usage.prompt_tokens - cached, 0))
+        if ttft is not None:
+            LLM_TTFT_SECONDS.labels(self._brand, "hit" if cached else "miss").observe(ttft)
+        logger.debug(f"{self}: prompt {usage.prompt_tokens} tokens, {cached} cached, ttft {ttft}")
+
+    async def start_llm_usage_metrics(self, tokens: LLMTokenUsage):
+        if self._cached_tokens is not None:
+            tokens.cache_read_input_tokens = self._cached_tokens
+            self._cached_tokens = None
+        await super().start_llm_usage_metrics(tokens)
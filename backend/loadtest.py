@@ -0,0 +1,334 @@
+"""Concurrent-call load test for the voice backend.
+
+Each synthetic caller runs /start-session -> /configure-agent -> /connect -> /ws/{id},
+sends the RTVI client-ready message, then talks for ``--turns`` turns by streaming
+PCM as ProtobufFrameSerializer audio frames in real time. Turn latency is measured
+from the last speech frame sent to the first bot audio frame received.
+
+Concurrency levels run one after another. For each level the report gives turn and
+greeting latency percentiles, WebSocket bytes per second per call (both directions),
+backend CPU per call and event-loop lag (from /stats),
+and flags the first level where p90 turn latency degrades past ``--degrade-threshold``
+relative to the lowest level. Start fake_services.py and the backend first; see the
+fake_services.py docstring for the environment to use.
+
+    python loadtest.py --backend http://127.0.0.1:7860 --levels 1,5,10,20,40 --turns 3
+
+``--audio-codec ulaw`` (and optionally ``--sample-rate``) asks /connect for a compressed
+audio format and sends caller audio in whatever format the backend negotiates.
+"""
+import math
+import json
+import random
+import time
+import wave
+import asyncio
+import argparse
+from array import array
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+import websockets
+
+from pipecat.frames.protobufs import frames_pb2
+
+from audio_codec import resample, ulaw_encode
+from prompts import get_fallback_config
+
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+FRAME_SAMPLES = int(SAMPLE_RATE * FRAME_SECONDS)
+SILENCE_FRAME = bytes(FRAME_SAMPLES * 2)
+# Bot audio stops arriving for this long -> the bot has finished its reply
+BOT_DONE_GAP = 0.8
+
+
+# First three formants (Hz) of a few vowels, for synthetic_utterance
+VOWEL_FORMANTS = (
+    (730, 1090, 2440),  # a
+    (270, 2290, 3010),  # i
+    (300, 870, 2240),   # u
+    (530, 1840, 2480),  # e
+    (570, 840, 2410),   # o
+)
+FORMANT_BANDWIDTHS = (80, 100, 120)
+SYLLABLE_SECONDS = 0.25
+
+
+def synthetic_utterance(seconds: float = 1.5, seed: int = 0) -> List[bytes]:
+    """Formant-synthesized babble that Silero and the fake STT both treat as speech.
+
+    A glottal pulse train around 120 Hz is shaped by the formant resonances
+    of a random vowel per 250 ms syllable. Silero scores this well above its
+    default 0.7 threshold, so pipecat's VAD reaches SPEAKING and the caller's
+    turns end on a real user-stopped-speaking; a plain tone scores below 0.2
+    and never does. ``--audio`` replaces it with a recording.
+    """
+    rng = random.Random(seed)
+    total = int(seconds * SAMPLE_RATE)
+    # Pulse train with slow pitch drift, low-passed into a glottal-like source
+    source, phase, tilt = [], 0.0, 0.0
+    for i in range(total):
+        f0 = 120 + 20 * math.sin(2 * math.pi * 1.3 * i / SAMPLE_RATE) + rng.uniform(-2, 2)
+        phase += f0 / SAMPLE_RATE
+        pulse = 1.0 if phase >= 1.0 else 0.0
+        phase -= math.floor(phase)
+        tilt = pulse + 0.95 * tilt
+        source.append(tilt)
+
+    samples: List[float] = []
+    step = int(SYLLABLE_SECONDS * SAMPLE_RATE)
+    for start in range(0, total, step):
+        segment = source[start:start + step]
+        voiced = [0.0] * len(segment)
+        for frequency, bandwidth in zip(rng.choice(VOWEL_FORMANTS), FORMANT_BANDWIDTHS):
+            # Two-pole resonator
+            r = math.exp(-math.pi * bandwidth / SAMPLE_RATE)
+            a1, a2 = 2 * r * math.cos(2 * math.pi * frequency / SAMPLE_RATE), -r * r
+            y1 = y2 = 0.0
+            for i, x in enumerate(segment):
+                y = (1 - r) * x + a1 * y1 + a2 * y2
+                voiced[i] += y
+                y1, y2 = y, y1
+        samples.extend(v * math.sin(math.pi * i / len(segment)) ** 0.6 for i, v in enumerate(voiced))
+
+    scale = 12000 / max(abs(v) for v in samples)
+    pcm = array("h", (int(v * scale) for v in samples)).tobytes()
+    step = FRAME_SAMPLES * 2
+    return [pcm[i:i + step].ljust(step, b"\0") for i in range(0, len(pcm), step)]
+
+
+def load_utterance(path: str) -> List[bytes]:
+    """Read a 16 kHz mono 16-bit WAV into 20 ms frames."""
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise ValueError("Recording must be 16 kHz mono 16-bit PCM")
+        pcm = wav.readframes(wav.getnframes())
+    step = FRAME_SAMPLES * 2
+    return [pcm[i:i + step].ljust(step, b"\0") for i in range(0, len(pcm), step)]
+
+
+def audio_message(pcm: bytes, sample_rate: int = SAMPLE_RATE) -> bytes:
+    frame = frames_pb2.Frame()
+    frame.audio.audio = pcm
+    frame.audio.sample_rate = sample_rate
+    frame.audio.num_channels = 1
+    return frame.SerializeToString()
+
+
+def wire_message(pcm: bytes, audio: Dict[str, Any]) -> bytes:
+    """A 16 kHz PCM frame as an audio message in the format negotiated at /connect."""
+    sample_rate = audio.get("sample_rate") or SAMPLE_RATE
+    if sample_rate != SAMPLE_RATE:
+        pcm = resample(pcm, SAMPLE_RATE, sample_rate)
+    if audio.get("codec") == "ulaw":
+        pcm = ulaw_encode(pcm)
+    return audio_message(pcm, sample_rate)
+
+
+def rtvi_message(message_type: str) -> bytes:
+    frame = frames_pb2.Frame()
+    frame.message.data = json.dumps({"label": "rtvi-ai", "type": message_type, "id": message_type, "data": {}})
+    return frame.SerializeToString()
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+class SyntheticCaller:
+    def __init__(self, backend: str, ws_base: Optional[str], utterance: List[bytes], turns: int, configure_delay: float = 0.0, audio_request: Optional[Dict[str, Any]] = None):
+        self.backend = backend
+        self.ws_base = ws_base
+        self.utterance = utterance
+        self.turns = turns
+        self.configure_delay = configure_delay
+        self.audio_request = audio_request or {}
+        self.audio: Dict[str, Any] = {}
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.call_seconds = 0.0
+        self.turn_latencies: List[float] = []
+        self.greeting_latency: Optional[float] = None
+        self.error: Optional[str] = None
+        self._speech: List[bytes] = []
+        self._last_bot_audio = 0.0
+        self._last_audio_at = 0.0
+        self._bot_audio_event = asyncio.Event()
+
+    async def run(self, http: httpx.AsyncClient):
+        try:
+            session_id = (await http.post(f"{self.backend}/start-session")).json()["session_id"]
+            await http.post(f"{self.backend}/configure-agent", json={"session_id": session_id, "config": get_fallback_config()})
+            # A real user reviews the generated agent before starting the call
+            await asyncio.sleep(self.configure_delay)
+            connect = (await http.post(f"{self.backend}/connect", json={"session_id": session_id, **self.audio_request})).json()
+            if "ws_url" not in connect:
+                raise RuntimeError(f"/connect refused: {connect}")
+            self.audio = connect.get("audio") or {}
+            await self._call(self._ws_url(connect["ws_url"]))
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    def _ws_url(self, ws_url: str) -> str:
+        if not self.ws_base:
+            return ws_url
+        return self.ws_base.rstrip("/") + urlparse(ws_url).path
+
+    async def _call(self, ws_url: str):
+        # Encode once up front, like a client capturing in the negotiated format
+        self.utterance = [wire_message(pcm, self.audio) for pcm in self.utterance]
+        self._silence = wire_message(SILENCE_FRAME, self.audio)
+        started = time.monotonic()
+        async with websockets.connect(ws_url, max_size=None) as ws:
+            receiver = asyncio.create_task(self._receive(ws))
+            sender = asyncio.create_task(self._send_audio(ws))
+            try:
+                connected = time.monotonic()
+                await ws.send(rtvi_message("client-ready"))
+                await asyncio.wait_for(self._bot_audio_event.wait(), timeout=30)
+                self.greeting_latency = self._last_bot_audio - connected
+                await self._wait_bot_done()
+
+                for _ in range(self.turns):
+                    self._bot_audio_event.clear()
+                    self._speech = list(self.utterance)
+                    while self._speech:
+                        await asyncio.sleep(FRAME_SECONDS)
+                    speech_ended = time.monotonic()
+                    await asyncio.wait_for(self._bot_audio_event.wait(), timeout=30)
+                    self.turn_latencies.append(self._last_bot_audio - speech_ended)
+                    await self._wait_bot_done()
+            finally:
+                sender.cancel()
+                receiver.cancel()
+                self.call_seconds = time.monotonic() - started
+
+    async def _send_audio(self, ws):
+        """Stream 20 ms frames in real time: queued speech if any, otherwise silence."""
+        next_send = time.monotonic()
+        while True:
+            message = self._speech.pop(0) if self._speech else self._silence
+            self.bytes_sent += len(message)
+            await ws.send(message)
+            next_send += FRAME_SECONDS
+            await asyncio.sleep(max(next_send - time.monotonic(), 0))
+
+    async def _receive(self, ws):
+        async for data in ws:
+            if not isinstance(data, bytes):
+                continue
+            self.bytes_received += len(data)
+            frame = frames_pb2.Frame.FromString(data)
+            if frame.WhichOneof("frame") == "audio":
+                now = time.monotonic()
+                if not self._bot_audio_event.is_set():
+                    self._last_bot_audio = now
+                    self._bot_audio_event.set()
+                self._last_audio_at = now
+
+    async def _wait_bot_done(self):
+        self._last_audio_at = time.monotonic()
+        while time.monotonic() - self._last_audio_at < BOT_DONE_GAP:
+            await asyncio.sleep(0.1)
+
+
+async def fetch_process_stats(http: httpx.AsyncClient, backend: str) -> Dict[str, Any]:
+    try:
+        return (await http.get(f"{backend}/stats")).json().get("process", {})
+    except Exception:
+        return {}
+
+
+async def run_level(backend: str, ws_base: Optional[str], concurrency: int, utterance: List[bytes], turns: int, configure_delay: float = 0.0, audio_request: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency * 2)
+    async with httpx.AsyncClient(timeout=30, limits=limits) as http:
+        before = await fetch_process_stats(http, backend)
+        started = time.monotonic()
+        callers = [SyntheticCaller(backend, ws_base, utterance, turns, configure_delay, audio_request) for _ in range(concurrency)]
+        await asyncio.gather(*(caller.run(http) for caller in callers))
+        wall = time.monotonic() - started
+        after = await fetch_process_stats(http, backend)
+
+    turn_latencies = [latency for caller in callers for latency in caller.turn_latencies]
+    greetings = [caller.greeting_latency for caller in callers if caller.greeting_latency is not None]
+    cpu_seconds = after.get("cpu_seconds_total", 0) - before.get("cpu_seconds_total", 0)
+    call_seconds = sum(caller.call_seconds for caller in callers)
+    wire_bytes = sum(caller.bytes_sent + caller.bytes_received for caller in callers)
+    return {
+        "concurrency": concurrency,
+        "errors": [caller.error for caller in callers if caller.error],
+        "turns": len(turn_latencies),
+        "turn_p50": percentile(turn_latencies, 0.5),
+        "turn_p90": percentile(turn_latencies, 0.9),
+        "turn_p99": percentile(turn_latencies, 0.99),
+        "greeting_p50": percentile(greetings, 0.5),
+        "greeting_p90": percentile(greetings, 0.9),
+        "wire_bytes_per_call_second": wire_bytes / call_seconds if call_seconds else None,
+        "cpu_per_call": cpu_seconds / (concurrency * wall) if wall else None,
+        "loop_lag_p99_ms": after.get("loop_lag_p99_ms"),
+        "loop_lag_max_ms": after.get("loop_lag_max_ms"),
+    }
+
+
+def print_report(results: List[Dict[str, Any]], degrade_threshold: float):
+    def fmt(value, scale=1000, unit="ms"):
+        return "-" if value is None else f"{value * scale:.0f}{unit}"
+
+    print()
+    print(f"{'calls':>6} {'turns':>6} {'err':>4} {'turn p50':>9} {'turn p90':>9} {'turn p99':>9} "
+          f"{'greet p50':>10} {'wire/call':>10} {'cpu/call':>9} {'lag p99':>8} {'lag max':>8}")
+    for r in results:
+        print(f"{r['concurrency']:>6} {r['turns']:>6} {len(r['errors']):>4} {fmt(r['turn_p50']):>9} {fmt(r['turn_p90']):>9} "
+              f"{fmt(r['turn_p99']):>9} {fmt(r['greeting_p50']):>10} {fmt(r['wire_bytes_per_call_second'], 1 / 1024, 'KB/s'):>10} "
+              f"{fmt(r['cpu_per_call'], 100, '%'):>9} "
+              f"{fmt(r['loop_lag_p99_ms'], 1):>8} {fmt(r['loop_lag_max_ms'], 1):>8}")
+
+    baseline = next((r["turn_p90"] for r in results if r["turn_p90"] is not None), None)
+    degraded = next(
+        (r for r in results if baseline and r["turn_p90"] is not None and r["turn_p90"] > baseline * (1 + degrade_threshold)),
+        None,
+    )
+    print()
+    if degraded:
+        print(f"⚠️ p90 turn latency degrades by more than {degrade_threshold:.0%} at {degraded['concurrency']} concurrent calls")
+    else:
+        print(f"✅ No level degraded p90 turn latency by more than {degrade_threshold:.0%}")
+    for r in results:
+        for error in sorted(set(r["errors"])):
+            print(f"❌ [{r['concurrency']} calls] {error}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent-call load test for the voice backend")
+    parser.add_argument("--backend", default="http://127.0.0.1:7860")
+    parser.add_argument("--ws-base", default=None, help="Override the host of the ws_url returned by /connect")
+    parser.add_argument("--levels", default="1,5,10,20", help="Comma-separated concurrency levels")
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--audio", default=None, help="16 kHz mono 16-bit WAV to use as each caller utterance")
+    parser.add_argument("--configure-delay", type=float, default=0.0, help="Seconds between /configure-agent and /connect")
+    parser.add_argument("--audio-codec", default=None, help="WebSocket audio codec to request at /connect (pcm or ulaw)")
+    parser.add_argument("--sample-rate", type=int, default=None, help="WebSocket audio sample rate to request at /connect")
+    parser.add_argument("--degrade-threshold", type=float, default=0.25)
+    parser.add_argument("--json", default=None, help="Also write raw results to this file")
+    args = parser.parse_args()
+
+    utterance = load_utterance(args.audio) if args.audio else synthetic_utterance()
+    audio_request = {key: value for key, value in (("audio_codec", args.audio_codec), ("sample_rate", args.sample_rate)) if value}
+    results = []
+    for level in [int(level) for level in args.levels.split(",")]:
+        print(f"▶️ Running {level} concurrent call(s)...")
+        results.append(await run_level(args.backend, args.ws_base, level, utterance, args.turns, args.configure_delay, audio_request))
+    print_report(results, args.degrade_threshold)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,114 @@
+import os
+import re
+import sys
+import random
+from typing import Any, Dict, Tuple
+
+from loguru import logger
+
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<magenta>{extra[session_id]}</magenta> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+EMAIL_RE = re.compile(r"([\w.+-])[\w.+-]*@([\w-]+(?:\.[\w-]+)+)")
+# Stricter than the lead tracker's pattern so timestamps, ids and floats are left alone
+PHONE_RE = re.compile(r"(?<!\w)(?<!\d\.)(?:\+\d{1,3}[\s.-]?)?\(?\d{3}\)?[\s.-]?\d{3}[\s.-]?\d{2}(\d{2})(?!\w|\.\d)")
+
+
+def redact(text: str) -> str:
+    """Mask email addresses and phone numbers, keeping enough to tell them apart."""
+    text = EMAIL_RE.sub(r"\1***@\2", text)
+    return PHONE_RE.sub(r"***-***-**\1", text)
+
+
+def _parse_module_map(spec: str, cast) -> Dict[str, Any]:
+    """``"pipecat=WARNING,rolling_context=DEBUG"`` -> ``{"pipecat": "WARNING", ...}``."""
+    result = {}
+    for item in spec.split(","):
+        if "=" in item:
+            module, value = item.split("=", 1)
+            result[module.strip()] = cast(value.strip())
+    return result
+
+
+class LogFilter:
+    """Per-module levels, sampling, truncation and redaction for the stderr sink.
+
+    Levels and sample rates apply to a module and its submodules, the most
+    specific prefix winning. Sampling only drops records below WARNING.
+    Accepted records are truncated to ``max_chars`` and redacted here rather
+    than in a patcher, so records that are filtered out cost nothing extra.
+    """
+
+    def __init__(self, default_level: str, levels: Dict[str, str], sample_rates: Dict[str, float], max_chars: int, redact_pii: bool):
+        self.default_level = logger.level(default_level).no
+        self.levels = {module: logger.level(level).no for module, level in levels.items()}
+        self.sample_rates = sample_rates
+        self.max_chars = max_chars
+        self.redact_pii = redact_pii
+        self.warning = logger.level("WARNING").no
+        self._resolved: Dict[str, Tuple[int, float]] = {}
+
+    def _lookup(self, mapping: Dict[str, Any], name: str, default: Any) -> Any:
+        parts = name.split(".")
+        for i in range(len(parts), 0, -1):
+            value = mapping.get(".".join(parts[:i]))
+            if value is not None:
+                return value
+        return default
+
+    def _settings(self, name: str) -> Tuple[int, float]:
+        settings = self._resolved.get(name)
+        if settings is None:
+            settings = (self._lookup(self.levels, name, self.default_level), self._lookup(self.sample_rates, name, 1.0))
+            self._resolved[name] = settings
+        return settings
+
+    def __call__(self, record: Dict[str, Any]) -> bool:
+        level, rate = self._settings(record["name"] or "")
+        if record["level"].no < level:
+            return False
+        if rate < 1.0 and record["level"].no < self.warning and random.random() >= rate:
+            return False
+        message = record["message"]
+        if self.max_chars and len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... [{len(message) - self.max_chars} more chars]"
+        if self.redact_pii:
+            message = redact(message)
+        record["message"] = message
+        return True
+
+
+_configured = False
+
+
+def configure_logging():
+    """Replace loguru's default synchronous sink with the configured, queue-backed one. Safe to call more than once."""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    log_filter = LogFilter(
+        default_level=os.getenv("LOG_LEVEL", "INFO"),
+        levels=_parse_module_map(os.getenv("LOG_LEVELS", "pipecat=INFO"), str),
+        sample_rates=_parse_module_map(os.getenv("LOG_SAMPLE", ""), float),
+        max_chars=int(os.getenv("LOG_MAX_CHARS", "1000")),
+        redact_pii=os.getenv("LOG_REDACT", "true").lower() == "true",
+    )
+    logger.remove()
+    logger.configure(extra={"session_id": "-"})
+    logger.add(
+        sys.stderr,
+        level=0,
+        format=LOG_FORMAT,
+        filter=log_filter,
+        # Records are written by a background thread so the event loop never blocks on stderr
+        enqueue=True,
+        serialize=os.getenv("LOG_JSON", "false").lower() == "true",
+        backtrace=False,
+        diagnose=False,
+    )
@@ -0,0 +1,69 @@
+import time
+import asyncio
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class LoopMonitor:
+    """Samples asyncio event-loop lag and process CPU usage in the background.
+
+    Lag is how late a ``sleep(interval)`` wakes up: time the loop spent busy
+    with other callbacks (audio pumping, JSON parsing, synchronous I/O) when
+    it should have been scheduling this one.
+    """
+
+    def __init__(self, interval: float = 0.1, window: int = 600):
+        self.interval = interval
+        self._lags = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self._cpu_started = time.process_time()
+        self._wall_started = time.monotonic()
+        self._cpu_last = self._cpu_started
+        self._wall_last = self._wall_started
+        self.cpu_percent = 0.0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        samples = 0
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._lags.append(max(time.monotonic() - expected, 0.0))
+            samples += 1
+            if samples % 10 == 0:
+                self._sample_cpu()
+
+    def _sample_cpu(self):
+        cpu, wall = time.process_time(), time.monotonic()
+        if wall > self._wall_last:
+            self.cpu_percent = (cpu - self._cpu_last) / (wall - self._wall_last) * 100
+        self._cpu_last, self._wall_last = cpu, wall
+
+    def lag_percentile(self, percentile: float, window: Optional[float] = None) -> float:
+        """Lag at ``percentile`` over the whole sample window, or only the last ``window`` seconds."""
+        lags = self._lags
+        if window is not None:
+            count = max(1, int(window / self.interval))
+            lags = list(lags)[-count:]
+        if not lags:
+            return 0.0
+        samples = sorted(lags)
+        return samples[min(len(samples) - 1, int(len(samples) * percentile))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "loop_lag_p50_ms": round(self.lag_percentile(0.5) * 1000, 2),
+            "loop_lag_p99_ms": round(self.lag_percentile(0.99) * 1000, 2),
+            "loop_lag_max_ms": round(max(self._lags, default=0.0) * 1000, 2),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "cpu_seconds_total": round(time.process_time() - self._cpu_started, 3),
+            "uptime_seconds": round(time.monotonic() - self._wall_started, 1),
+        }
@@ -0,0 +1,147 @@
+import os
+import math
+import json
+import time
+import asyncio
+import hashlib
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import httpx
+from loguru import logger
+
+
+DEFAULT_PUBLIC_URL = "wss://representatives-ld-variable-tom.trycloudflare.com"
+
+
+class Node:
+    """One voice node: where callers connect and how busy it last said it was."""
+
+    def __init__(self, node_id: str, public_url: str, status_url: Optional[str] = None, capacity: int = 50):
+        self.node_id = node_id
+        self.public_url = public_url.rstrip('/')
+        self.status_url = status_url
+        self.capacity = capacity
+        self.live_calls = 0
+        self.healthy = True
+        self.last_report = 0.0
+
+    def ws_url(self, session_id: str) -> str:
+        return f"{self.public_url}/ws/{session_id}"
+
+    def weight(self) -> float:
+        """Spare capacity, never quite zero so a full cluster still routes somewhere."""
+        return max(self.capacity - self.live_calls, 0) + 0.01
+
+
+class NodeRouter:
+    """Assigns sessions to voice nodes by weighted rendezvous hashing on the session id.
+
+    Each node scores ``-weight / ln(u)`` where ``u`` is a uniform hash of
+    (node, session); the highest score wins. With equal load this is plain
+    consistent hashing, and a node's share shrinks as its live-call count
+    approaches its capacity. Peer load is refreshed by polling each node's
+    ``/node-status`` endpoint.
+    """
+
+    def __init__(self, self_id: str, nodes: List[Node], poll_interval: float = 5.0):
+        self.self_id = self_id
+        self.nodes = {node.node_id: node for node in nodes}
+        self.poll_interval = poll_interval
+        if self_id not in self.nodes:
+            raise ValueError(f"NODE_ID '{self_id}' is not in the configured node list")
+
+    @property
+    def local(self) -> Node:
+        return self.nodes[self.self_id]
+
+    @staticmethod
+    def _hash_unit(node_id: str, session_id: str) -> float:
+        digest = hashlib.sha256(f"{node_id}:{session_id}".encode()).digest()
+        # 53 bits keeps the value exactly representable; setting the low bit keeps it strictly inside (0, 1)
+        return (int.from_bytes(digest[:8], "big") >> 11 | 1) / float(1 << 53)
+
+    def pick(self, session_id: str) -> Node:
+        candidates = [node for node in self.nodes.values() if node.healthy] or list(self.nodes.values())
+        return max(candidates, key=lambda node: -node.weight() / math.log(self._hash_unit(node.node_id, session_id)))
+
+    def is_local(self, node_id: Optional[str]) -> bool:
+        return node_id is None or node_id == self.self_id
+
+    @contextmanager
+    def track_call(self):
+        """Count a call as live on this node for as long as the block runs."""
+        self.local.live_calls += 1
+        try:
+            yield
+        finally:
+            self.local.live_calls -= 1
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.self_id,
+            "live_calls": self.local.live_calls,
+            "capacity": self.local.capacity,
+        }
+
+    async def poll_peers(self):
+        """Background task that refreshes peer live-call counts and health."""
+        peers = [node for node in self.nodes.values() if node.node_id != self.self_id and node.status_url]
+        if not peers:
+            return
+        async with httpx.AsyncClient(timeout=2.0) as client:
+            while True:
+                await asyncio.gather(*(self._poll(client, node) for node in peers))
+                await asyncio.sleep(self.poll_interval)
+
+    async def _poll(self, client: httpx.AsyncClient, node: Node):
+        try:
+            response = await client.get(node.status_url)
+            response.raise_for_status()
+            node.live_calls = int(response.json().get("live_calls", 0))
+            node.last_report = time.time()
+            if not node.healthy:
+                logger.info(f"🟢 Node {node.node_id} is reachable again")
+            node.healthy = True
+        except Exception as e:
+            if node.healthy:
+                logger.warning(f"🔴 Node {node.node_id} status check failed: {e}")
+            node.healthy = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            node.node_id: {
+                "live_calls": node.live_calls,
+                "capacity": node.capacity,
+                "healthy": node.healthy,
+            }
+            for node in self.nodes.values()
+        }
+
+
+def node_router_from_env() -> NodeRouter:
+    """Build the router from CLUSTER_NODES, a JSON list of
+    ``{"id", "public_url", "status_url", "capacity"}`` objects, and NODE_ID.
+
+    Without CLUSTER_NODES this process is a single node serving PUBLIC_WS_URL.
+    """
+    capacity = int(os.getenv("NODE_CAPACITY", "50"))
+    raw_nodes = os.getenv("CLUSTER_NODES")
+    if not raw_nodes:
+        node = Node("local", os.getenv("PUBLIC_WS_URL") or DEFAULT_PUBLIC_URL, capacity=capacity)
+        return NodeRouter("local", [node])
+
+    nodes = [
+        Node(
+            entry["id"],
+            entry["public_url"],
+            status_url=entry.get("status_url"),
+            capacity=int(entry.get("capacity", capacity)),
+        )
+        for entry in json.loads(raw_nodes)
+    ]
+    return NodeRouter(
+        os.getenv("NODE_ID") or nodes[0].node_id,
+        nodes,
+        poll_interval=float(os.getenv("NODE_POLL_INTERVAL", "5")),
+    )
@@ -0,0 +1,114 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+import httpx
+from loguru import logger
+from openai import AsyncOpenAI
+
+
+# Per-endpoint request timeouts in seconds. Research runs a hosted web search
+# and routinely takes tens of seconds; lead analysis is a short completion.
+DEFAULT_TIMEOUTS: Dict[str, float] = {
+    "research": 120.0,
+    "lead_analysis": 30.0,
+    "tts": 30.0,
+    "greeting": 30.0,
+    "summary": 30.0,
+    "lead_update": 20.0,
+}
+
+
+class OpenAIClientRegistry:
+    """App-scoped AsyncOpenAI client backed by one shared, pooled HTTP connection pool."""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        max_concurrency: int = 16,
+        timeouts: Optional[Dict[str, float]] = None,
+        base_url: Optional[str] = None,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.max_concurrency = max_concurrency
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.base_url = base_url
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._client: Optional[AsyncOpenAI] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def start(self):
+        """Create the shared HTTP pool. The OpenAI client itself is built on first use
+        so the app still starts when OPENAI_API_KEY is missing."""
+        if self._http_client is not None:
+            return
+        self._http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        logger.info(
+            f"🔌 OpenAI client pool ready: {self.max_connections} connections, "
+            f"{self.max_keepalive_connections} keep-alive, {self.max_concurrency} concurrent requests"
+        )
+
+    async def aclose(self):
+        """Close the shared HTTP pool."""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._client = None
+        self._semaphore = None
+
+    def client(self, endpoint: str) -> AsyncOpenAI:
+        """Return the shared client configured with the timeout for ``endpoint``."""
+        if self._http_client is None:
+            # Used outside the FastAPI lifespan (scripts, standalone agent runs)
+            self.start()
+        if self._client is None:
+            self._client = AsyncOpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                base_url=self.base_url,
+                http_client=self._http_client,
+            )
+        timeout = self.timeouts.get(endpoint)
+        if timeout is None:
+            return self._client
+        return self._client.with_options(timeout=timeout)
+
+    @asynccontextmanager
+    async def request(self, endpoint: str):
+        """Hold a concurrency slot for one upstream request and yield the client to use."""
+        client = self.client(endpoint)
+        async with self._semaphore:
+            yield client
+
+
+def openai_registry_from_env() -> OpenAIClientRegistry:
+    return OpenAIClientRegistry(
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60")),
+        max_concurrency=int(os.getenv("OPENAI_MAX_CONCURRENCY", "16")),
+        timeouts={
+            "research": float(os.getenv("OPENAI_RESEARCH_TIMEOUT", DEFAULT_TIMEOUTS["research"])),
+            "lead_analysis": float(os.getenv("OPENAI_LEAD_ANALYSIS_TIMEOUT", DEFAULT_TIMEOUTS["lead_analysis"])),
+            "tts": float(os.getenv("OPENAI_TTS_TIMEOUT", DEFAULT_TIMEOUTS["tts"])),
+            "greeting": float(os.getenv("OPENAI_GREETING_TIMEOUT", DEFAULT_TIMEOUTS["greeting"])),
+            "summary": float(os.getenv("OPENAI_SUMMARY_TIMEOUT", DEFAULT_TIMEOUTS["summary"])),
+            "lead_update": float(os.getenv("OPENAI_LEAD_UPDATE_TIMEOUT", DEFAULT_TIMEOUTS["lead_update"])),
+        },
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+    )
+
+
+# Shared by server.py and voice_agent.py; started and closed by the FastAPI lifespan
+openai_registry = openai_registry_from_env()
@@ -0,0 +1,72 @@
+import json
+from typing import Any, List, Tuple
+
+
+class IncrementalObjectParser:
+    """Yields the top-level fields of a streamed JSON object as soon as each value is complete.
+
+    Feed it text deltas as they arrive. Anything before the first ``{`` (such as a
+    markdown code fence) is skipped. Each ``feed`` returns the ``(key, value)``
+    pairs completed by that delta. The text is scanned once, character by
+    character, tracking only string/escape state and nesting depth.
+    """
+
+    def __init__(self):
+        self._started = False
+        self._done = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        # Characters of the current top-level "key": value member
+        self._member: List[str] = []
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        completed = []
+        for ch in text:
+            if self._done:
+                break
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if self._in_string:
+                self._member.append(ch)
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._member.append(ch)
+            elif ch in "{[":
+                self._depth += 1
+                self._member.append(ch)
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._done = True
+                    completed.extend(self._finish_member())
+                else:
+                    self._member.append(ch)
+            elif ch == "," and self._depth == 1:
+                completed.extend(self._finish_member())
+            else:
+                self._member.append(ch)
+        return completed
+
+    def _finish_member(self) -> List[Tuple[str, Any]]:
+        member = "".join(self._member).strip()
+        self._member = []
+        if not member:
+            return []
+        try:
+            parsed = json.loads("{" + member + "}")
+        except json.JSONDecodeError:
+            return []
+        return list(parsed.items())
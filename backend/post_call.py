@@ -0,0 +1,238 @@
+import os
+import json
+import time
+import uuid
+import random
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from loguru import logger
+
+
+class PostCallQueue:
+    """Durable queue of post-call jobs processed by a bounded pool of async workers.
+
+    Every job is journaled to ``journal_dir`` as one JSON file before it is
+    queued and removed only once its handler succeeds, so jobs pending at a
+    crash or redeploy are picked up again by ``start()``. Jobs that still fail
+    after ``max_retries`` are moved to ``journal_dir/failed`` for manual review.
+    A job enqueued with the ``job_id`` of one still pending is dropped, so a
+    caller that may hand over the same work twice (a call's post-call job,
+    and its recovery after a crash) picks a stable id.
+
+    The handler is called as ``handler(job, final_attempt)``; on the final
+    attempt it should fall back to a best-effort result rather than raise.
+    It may return an awaitable acknowledgement for work it handed off, such
+    as a lead queued for the batched Sheets writer. The job stays journaled
+    until that resolves, without holding a worker, and a failed
+    acknowledgement counts as a failed attempt.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict[str, Any], bool], Awaitable[Optional[Awaitable[Any]]]],
+        journal_dir: str = "post_call_journal",
+        workers: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 2.0,
+    ):
+        self.handler = handler
+        self.journal_dir = journal_dir
+        self.failed_dir = os.path.join(journal_dir, "failed")
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Jobs whose handler finished, waiting on its acknowledgement or on a retry delay
+        self._waiting: Set[asyncio.Task] = set()
+        # Journaled jobs not yet completed or failed
+        self._pending_ids: Set[str] = set()
+        self._in_flight = 0
+        self.duplicates = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.recovered = 0
+        self._latencies: List[float] = []
+
+    async def start(self):
+        """Start the workers and re-queue any jobs left in the journal."""
+        os.makedirs(self.failed_dir, exist_ok=True)
+        self._queue = asyncio.Queue()
+        for name in sorted(os.listdir(self.journal_dir)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.journal_dir, name), 'r') as f:
+                    job = json.load(f)
+            except Exception as e:
+                logger.error(f"❌ Unreadable post-call journal entry {name}: {e}")
+                continue
+            self._pending_ids.add(job["job_id"])
+            self._queue.put_nowait(job)
+            self.recovered += 1
+        if self.recovered:
+            logger.info(f"♻️ Recovered {self.recovered} post-call job(s) from journal")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def aclose(self, timeout: float = 10.0):
+        """Give queued jobs a chance to finish, then stop. Anything left stays journaled."""
+        if self._queue is None:
+            return
+        deadline = time.monotonic() + timeout
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            if self._waiting:
+                await asyncio.wait(set(self._waiting), timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        if self.depth() or self._waiting:
+            logger.warning(f"Post-call queue still has {self.depth() + len(self._waiting)} job(s) at shutdown; they will resume on restart")
+        for task in self._tasks + list(self._waiting):
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._waiting, return_exceptions=True)
+        self._tasks = []
+        self._waiting = set()
+
+    async def enqueue(self, job: Dict[str, Any]) -> str:
+        """Journal ``job`` to disk and hand it to the workers, unless a job with its ``job_id`` is already pending."""
+        job = {
+            **job,
+            "job_id": job.get("job_id") or str(uuid.uuid4()),
+            "enqueued_at": time.time(),
+            "attempts": 0,
+        }
+        if self._queue is None:
+            await self.start()
+        if job["job_id"] in self._pending_ids:
+            self.duplicates += 1
+            logger.info(f"Post-call job {job['job_id']} is already pending, not queuing it again")
+            return job["job_id"]
+        self._pending_ids.add(job["job_id"])
+        try:
+            await asyncio.to_thread(self._write_journal, job)
+        except BaseException:
+            self._pending_ids.discard(job["job_id"])
+            raise
+        self._queue.put_nowait(job)
+        return job["job_id"]
+
+    def _journal_path(self, job: Dict[str, Any], directory: Optional[str] = None) -> str:
+        return os.path.join(directory or self.journal_dir, f"{job['job_id']}.json")
+
+    def _write_journal(self, job: Dict[str, Any]):
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = self._journal_path(job)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(job, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _finish_journal(self, job: Dict[str, Any], failed: bool):
+        path = self._journal_path(job)
+        try:
+            if failed:
+                os.replace(path, self._journal_path(job, self.failed_dir))
+            else:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self._in_flight += 1
+            try:
+                with logger.contextualize(session_id=job.get("session_id") or "-"):
+                    await self._process(job)
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    async def _process(self, job: Dict[str, Any]):
+        while True:
+            job["attempts"] += 1
+            final_attempt = job["attempts"] > self.max_retries
+            try:
+                ack = await self.handler(job, final_attempt)
+            except Exception as e:
+                if not await self._attempt_failed(job, e, final_attempt):
+                    return
+                continue
+            if ack is None:
+                await self._complete(job)
+            else:
+                self._wait(self._acknowledge(job, ack, final_attempt))
+            return
+
+    def _wait(self, coro):
+        task = asyncio.create_task(coro)
+        self._waiting.add(task)
+        task.add_done_callback(self._waiting.discard)
+
+    async def _acknowledge(self, job: Dict[str, Any], ack: Awaitable[Any], final_attempt: bool):
+        with logger.contextualize(session_id=job.get("session_id") or "-"):
+            try:
+                await ack
+            except Exception as e:
+                if await self._attempt_failed(job, e, final_attempt):
+                    self._queue.put_nowait(job)
+                return
+            await self._complete(job)
+
+    async def _complete(self, job: Dict[str, Any]):
+        self._pending_ids.discard(job["job_id"])
+        self.completed += 1
+        self._record_latency(time.time() - job["enqueued_at"])
+        await asyncio.to_thread(self._finish_journal, job, False)
+
+    async def _attempt_failed(self, job: Dict[str, Any], error: Exception, final_attempt: bool) -> bool:
+        """Record a failed attempt; returns True once the job should be tried again."""
+        if final_attempt:
+            self._pending_ids.discard(job["job_id"])
+            self.failed += 1
+            logger.error(f"❌ Post-call job {job['job_id']} failed after {job['attempts']} attempt(s): {error}")
+            await asyncio.to_thread(self._finish_journal, job, True)
+            return False
+        self.retries += 1
+        delay = self.backoff_base * (2 ** (job["attempts"] - 1)) * (0.5 + random.random())
+        logger.warning(f"Post-call job {job['job_id']} attempt {job['attempts']} failed ({error}), retrying in {delay:.1f}s")
+        await asyncio.sleep(delay)
+        return True
+
+    def _record_latency(self, latency: float):
+        self._latencies.append(latency)
+        if len(self._latencies) > 1000:
+            self._latencies = self._latencies[-1000:]
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._latencies)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "depth": self.depth(),
+            "in_flight": self._in_flight,
+            "awaiting_ack": len(self._waiting),
+            "workers": self.workers,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "recovered": self.recovered,
+            "duplicates": self.duplicates,
+            "job_latency_avg_s": round(sum(samples) / len(samples), 3) if samples else 0.0,
+            "job_latency_p95_s": round(p95, 3),
+        }
+
+
+def post_call_queue_from_env(handler: Callable[[Dict[str, Any], bool], Awaitable[Optional[Awaitable[Any]]]]) -> PostCallQueue:
+    return PostCallQueue(
+        handler,
+        journal_dir=os.getenv("POST_CALL_JOURNAL_DIR", "post_call_journal"),
+        workers=int(os.getenv("POST_CALL_WORKERS", "4")),
+        max_retries=int(os.getenv("POST_CALL_MAX_RETRIES", "3")),
+    )
@@ -1,3 +1,5 @@
+import re
+import json
 from typing import Dict, Any, Optional
 from loguru import logger
 
@@ -115,6 +117,14 @@ IMPORTANT:
 
 Return ONLY valid JSON, no other text or formatting."""
 
+    CRAWLED_CONTENT_TEMPLATE = """
+
+Instead of searching the web, use the text below, extracted from pages crawled on {url}. Base every field only on this content; where it says nothing about a field, write a reasonable, clearly general description rather than inventing specifics such as prices.
+
+<website_content>
+{corpus}
+</website_content>"""
+
     LEAD_QUALIFICATION_TEMPLATE = """<role>You are a lead qualification specialist who analyzes AI voice assistant conversations to identify prospects and determine optimal follow-up actions. You excel at extracting actionable intelligence from natural conversations and routing leads to the appropriate team for maximum conversion.</role>
 
 <task>
@@ -174,15 +184,61 @@ Return ONLY valid JSON in this exact structure:
 {transcript}
 </conversation_transcript>"""
 
+    LEAD_UPDATE_TEMPLATE = """<role>You keep a running lead record for a live voice conversation between our AI voice assistant and a potential {industry} customer for {company_name}.</role>
+
+<task>
+Update the current lead record with what the newest turns of the conversation add or correct. Return the complete updated record.
+</task>
+
+<instructions>
+- Extract only information explicitly stated - never infer or assume
+- Contact details the agent read back and the caller confirmed override earlier values
+- Keep existing values the new turns do not contradict
+- The transcript comes from speech recognition and may contain errors
+- Keep summary to 2-3 sentences covering the whole conversation so far
+</instructions>
+
+<qualification_criteria>
+- 🔥 Hot: Timeline ≤30 days OR asked for pricing/proposal OR expressed urgency OR ready to move forward
+- 🟠 Warm: Genuine interest + budget/authority BUT no immediate timeline OR exploratory phase
+- ❄️ Cold: Not interested OR no budget OR wrong fit OR just information gathering
+</qualification_criteria>
+
+<current_lead_record>
+{lead}
+</current_lead_record>
+
+<newest_turns>
+{turns}
+</newest_turns>
+
+<output_format>
+Return ONLY valid JSON with exactly these keys: "name", "email", "phone", "qualification_status" ("🔥 Hot" | "🟠 Warm" | "❄️ Cold"), "qualification_reason", "pain_points", "summary", "next_steps". Use null for missing information.
+</output_format>"""
+
     FALLBACK_SYSTEM_PROMPT = """You are a professional customer service representative. Greet callers warmly, understand their needs, and provide helpful information. Keep responses under 25 words and ask one question at a time."""
 
 
-def build_system_prompt(agent_config: Optional[Dict[str, Any]] = None) -> str:
+def brief(text: str, limit: int = 160) -> str:
+    """First sentence of ``text``, cut at a word boundary near ``limit`` characters."""
+    text = " ".join(text.split())
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    if match and len(match.group(1)) <= limit:
+        return match.group(1)
+    if len(text) <= limit:
+        return text
+    return text[:limit].rsplit(" ", 1)[0] + "..."
+
+
+def build_system_prompt(agent_config: Optional[Dict[str, Any]] = None, knowledge_lookup: bool = False) -> str:
     """
     Generate a dynamic system instruction from agent configuration.
     
     Args:
         agent_config: Configuration dictionary containing business context
+        knowledge_lookup: Summarize products, value props and target customers in one
+                          sentence each and have the agent look details up with the
+                          lookup_company_info function instead
                      
     Returns:
         Formatted system prompt string
@@ -205,6 +261,11 @@ def build_system_prompt(agent_config: Optional[Dict[str, Any]] = None) -> str:
         target_customers = agent_config.get('targetCustomers', fallback['targetCustomers'])
         tone = agent_config.get('tone', fallback['tone'])
         
+        lookup_guideline = ""
+        if knowledge_lookup:
+            products, value_props, target_customers = brief(products), brief(value_props), brief(target_customers)
+            lookup_guideline = "\n- Before answering questions about products, pricing, features, packages or who we serve, call lookup_company_info with the caller's question and answer from what it returns; never guess details"
+        
         # Build prompt directly with f-string
         prompt = f"""You are {name}, a professional representative for {brand_name}. 
 
@@ -230,7 +291,7 @@ CORE GUIDELINES:
 - If conversation goes well, offer to follow up: "I'll have one of our specialists send you some information. What's the best way to reach you - email or phone?"
 - Always confirm contact details by repeating them back: "Let me confirm - that's [contact info] - is that correct?"
 - If contact info sounds unclear, ask them to spell or repeat it for accuracy
-- Make information requests feel like better service, not sales tactics
+- Make information requests feel like better service, not sales tactics{lookup_guideline}
 
 Start by greeting the caller professionally and introduce yourself as {name}, an AI voice assistant from {brand_name}."""
         
@@ -269,6 +330,50 @@ def build_lead_qualification_prompt(transcript: str, agent_config: Optional[Dict
     
 
 
+def build_lead_update_prompt(lead: Dict[str, Any], turns: str, agent_config: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the prompt that folds the newest conversation turns into a running lead record.
+    
+    Args:
+        lead: Current lead record
+        turns: Newest turns, one "AGENT:"/"HUMAN:" line each
+        agent_config: Agent configuration for context
+        
+    Returns:
+        Formatted lead update prompt string
+    """
+    company_name = "the company"
+    industry = "business"
+    
+    if agent_config:
+        company_name = agent_config.get('brandName', 'the company')
+        industry = agent_config.get('industry', 'business')
+    
+    return PromptTemplates.LEAD_UPDATE_TEMPLATE.format(
+        industry=industry.lower(),
+        company_name=company_name,
+        lead=json.dumps(lead, ensure_ascii=False),
+        turns=turns
+    )
+
+
+def build_crawled_research_prompt(url: str, corpus: str) -> str:
+    """
+    Build the company research prompt for content crawled from the website itself.
+    
+    Args:
+        url: Website that was crawled
+        corpus: Condensed text of the crawled pages
+        
+    Returns:
+        COMPANY_RESEARCH_TEMPLATE followed by the crawled content
+    """
+    return (
+        PromptTemplates.COMPANY_RESEARCH_TEMPLATE.format(url=url)
+        + PromptTemplates.CRAWLED_CONTENT_TEMPLATE.format(url=url, corpus=corpus)
+    )
+
+
 def get_fallback_config() -> Dict[str, Any]:
     """Get a complete fallback configuration using the new simplified schema."""
     return {
@@ -0,0 +1,149 @@
+import os
+import re
+import copy
+import json
+import time
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from loguru import logger
+
+
+class ResearchCache:
+    """TTL + LRU cache of website research results with single-flight request coalescing.
+
+    Entries live in memory and, when ``disk_dir`` is set, are mirrored to one JSON
+    file per key so they survive restarts. Concurrent lookups for a key that is
+    already being researched wait on the same upstream call instead of starting
+    their own.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, max_entries: int = 256, disk_dir: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        force_refresh: bool = False,
+        should_cache: Callable[[Dict[str, Any]], bool] = lambda value: True,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return ``(value, cache_hit)`` for ``key``, running ``compute`` at most once per key at a time."""
+        if not force_refresh:
+            cached = await self._get(key)
+            if cached is not None:
+                self.hits += 1
+                return copy.deepcopy(cached), True
+
+        task = self._inflight.get(key)
+        if task is not None:
+            # Someone is already researching this site; their result is as fresh as ours would be
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            # A task of its own, so cancelling the request that started it does not cancel the ones waiting on it
+            task = asyncio.ensure_future(self._compute(key, compute, should_cache))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._computed(key, done))
+        return copy.deepcopy(await asyncio.shield(task)), False
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Dict[str, Any]]], should_cache: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        value = await compute()
+        if should_cache(value):
+            await self._put(key, value)
+        return value
+
+    def _computed(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark retrieved so a failure nobody waited for does not log "exception never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+    async def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None and self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.time() - stored_at > self.ttl_seconds:
+            await self.invalidate(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def _put(self, key: str, value: Dict[str, Any]):
+        entry = (time.time(), copy.deepcopy(value))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, entry)
+
+    async def invalidate(self, key: str):
+        self._entries.pop(key, None)
+        if self.disk_dir:
+            await asyncio.to_thread(self._remove_disk, key)
+
+    def _remove_disk(self, key: str):
+        try:
+            os.remove(self._disk_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, re.sub(r'[^a-zA-Z0-9.-]', '_', key) + ".json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                data = json.load(f)
+            return data["stored_at"], data["value"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable research cache entry for {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, entry: Tuple[float, Dict[str, Any]]):
+        path = self._disk_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({"key": key, "stored_at": entry[0], "value": entry[1]}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not persist research cache entry for {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+        }
+
+
+def research_cache_from_env() -> ResearchCache:
+    return ResearchCache(
+        ttl_seconds=float(os.getenv("RESEARCH_CACHE_TTL_SECONDS", str(24 * 3600))),
+        max_entries=int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "256")),
+        disk_dir=os.getenv("RESEARCH_CACHE_DIR") or None,
+    )
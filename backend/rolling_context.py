@@ -0,0 +1,121 @@
+import os
+import json
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from openai_clients import openai_registry
+
+
+SUMMARY_PROMPT = """Summarize the earlier part of this phone conversation between an AI voice agent and a caller so the agent can continue it.
+Keep every detail the caller gave about themselves (name, email, phone, company, role), their needs and pain points, questions still open and anything the agent promised.
+Write at most 120 words of plain prose.
+
+{previous_summary}<conversation>
+{conversation}
+</conversation>"""
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Rough token count (about 4 characters per token) that needs no tokenizer."""
+    return sum(len(json.dumps(message, default=str)) for message in messages) // 4
+
+
+class RollingContext:
+    """Keeps the prompt sent to the LLM within a token budget on long calls.
+
+    Applied by the LLM service to the messages of every completion request, so
+    it covers both the context frames the user aggregator pushes downstream and
+    the ones the assistant aggregator pushes back upstream after a function
+    call. The aggregators keep appending to the full call context, which stays
+    verbatim for persistence and lead analysis; only the request gets the
+    trimmed copy: the leading system messages, a summary of older turns, and
+    the latest ``keep_turns`` turns. Turns are cut at user messages, so a tool
+    call and its result are never split.
+
+    Once the estimated prompt passes ``summarize_at`` tokens, older turns are
+    summarized in the background and later turns use the summary. Until it is
+    ready they stay verbatim, and only past ``max_tokens`` are the oldest of
+    them dropped.
+    """
+
+    def __init__(self, max_tokens: int = 6000, summarize_at: int = 4000, keep_turns: int = 6, summary_model: str = "gpt-4o-mini"):
+        self.max_tokens = max_tokens
+        self.summarize_at = summarize_at
+        self.keep_turns = keep_turns
+        self.summary_model = summary_model
+        self._summary: Optional[str] = None
+        # Number of conversation messages (after the system head) the summary covers
+        self._summarized_upto = 0
+        self._summary_task: Optional[asyncio.Task] = None
+
+    async def aclose(self):
+        """Cancel a summary still being written."""
+        task, self._summary_task = self._summary_task, None
+        if task:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def trim(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The messages to send for this request; starts a background summary once they grow past ``summarize_at``."""
+        if estimate_tokens(messages) <= self.summarize_at and not self._summary:
+            return messages
+
+        head_len = 0
+        while head_len < len(messages) and messages[head_len].get("role") == "system":
+            head_len += 1
+        head, body = messages[:head_len], messages[head_len:]
+
+        # Older turns end where the latest keep_turns user messages begin
+        user_starts = [i for i, message in enumerate(body) if message.get("role") == "user"]
+        cut = user_starts[-self.keep_turns] if len(user_starts) >= self.keep_turns else 0
+
+        memory = [{"role": "system", "content": f"Summary of the conversation so far: {self._summary}"}] if self._summary else []
+        unsummarized = head + memory + body[self._summarized_upto:]
+        if cut > self._summarized_upto and self._summary_task is None and estimate_tokens(unsummarized) > self.summarize_at:
+            self._summary_task = asyncio.create_task(self._summarize(body[self._summarized_upto:cut], cut))
+
+        pending = body[self._summarized_upto:cut]
+        recent = body[max(cut, self._summarized_upto):]
+
+        # Summary not caught up yet: keep unsummarized turns verbatim while they fit
+        while pending and estimate_tokens(head + memory + pending + recent) > self.max_tokens:
+            next_user = next((i for i, message in enumerate(pending) if i > 0 and message.get("role") == "user"), len(pending))
+            pending = pending[next_user:]
+
+        trimmed = head + memory + pending + recent
+        logger.debug(f"Rolling context: sending {len(trimmed)}/{len(messages)} messages, ~{estimate_tokens(trimmed)} tokens")
+        return trimmed
+
+    async def _summarize(self, older: List[Dict[str, Any]], upto: int):
+        try:
+            conversation = "\n".join(
+                f"{'AGENT' if message['role'] == 'assistant' else 'HUMAN'}: {message.get('content')}"
+                for message in older
+                if message.get("role") in ("user", "assistant") and message.get("content")
+            )
+            previous = f"<previous_summary>\n{self._summary}\n</previous_summary>\n" if self._summary else ""
+            async with openai_registry.request("summary") as client:
+                response = await client.chat.completions.create(
+                    model=self.summary_model,
+                    messages=[{"role": "user", "content": SUMMARY_PROMPT.format(previous_summary=previous, conversation=conversation)}],
+                    max_tokens=250,
+                    temperature=0.1,
+                )
+            self._summary = response.choices[0].message.content.strip()
+            self._summarized_upto = upto
+            logger.info(f"🗜️ Summarized {upto} earlier conversation messages")
+        except Exception as e:
+            logger.warning(f"Could not summarize earlier conversation, keeping it verbatim: {e}")
+        finally:
+            self._summary_task = None
+
+
+def rolling_context_from_env() -> RollingContext:
+    return RollingContext(
+        max_tokens=int(os.getenv("CONTEXT_MAX_TOKENS", "6000")),
+        summarize_at=int(os.getenv("CONTEXT_SUMMARIZE_AT_TOKENS", "4000")),
+        keep_turns=int(os.getenv("CONTEXT_KEEP_TURNS", "6")),
+        summary_model=os.getenv("CONTEXT_SUMMARY_MODEL", "gpt-4o-mini"),
+    )
@@ -3,24 +3,104 @@ import os
 import json
 import uuid
 import datetime
+from collections import OrderedDict
 from contextlib import asynccontextmanager
-from typing import Any, Dict, Optional
-from openai import AsyncOpenAI
+from typing import Any, Callable, Dict, Optional
 
 import uvicorn
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request, WebSocket
+from fastapi import FastAPI, Request, Response, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 load_dotenv(override=True)
 
-from voice_agent import run_voice_agent, clean_json_response
-from prompts import PromptTemplates, get_fallback_config
+from loguru import logger
+from log_config import configure_logging
+
+# Before the imports below, so no module logs through loguru's default blocking sink
+configure_logging()
+
+from voice_agent import run_voice_agent, sheets_writer, process_post_call_job, recovered_post_call_job, generate_greetings, TTS_VOICE, TTS_MODEL
+from prompts import PromptTemplates, get_fallback_config, build_crawled_research_prompt
+from partial_json import IncrementalObjectParser
+from structured_output import AGENT_CONFIG_SCHEMA, StructuredOutputError, chat_response_format, check_schema, responses_text_format, parse_or_repair
+from batched_vad import vad_engine_from_env
+from openai_clients import openai_registry
+from research_cache import research_cache_from_env
+from post_call import post_call_queue_from_env
+from transcript_journal import transcript_journal_from_env
+from session_store import session_store_from_env
+from node_router import node_router_from_env
+from loop_monitor import LoopMonitor
+from admission import AdmissionRejected, admission_from_env
+from audio_codec import negotiate_audio
+from bulk_research import bulk_research_from_env
+from tts_cache import tts_cache, seed_phrases
+from site_crawler import canonical_website, site_crawler_from_env
+from knowledge_index import knowledge_index_for
+from agent_store import agent_store_from_env, config_hash
+
+# Silero VAD for every call: pre-warmed in-process analyzers, or a batching worker process (VAD_ENGINE=batched)
+vad_pool = vad_engine_from_env()
+
+# Voice nodes this deployment can route calls to, and which one this process is
+node_router = node_router_from_env()
+
+# Event-loop lag and CPU sampling for this process
+loop_monitor = LoopMonitor()
+
+# Every call's transcript, journaled turn by turn; segments are per node so recovery only sees this process's calls
+transcript_journal = transcript_journal_from_env(node_router.self_id)
+
+# Per-process call limit and load-based backpressure for new calls
+admission = admission_from_env(node_router, loop_monitor)
+
+# Website research results keyed by canonical host
+research_cache = research_cache_from_env()
+
+# Local crawler for the "crawler" research engine
+site_crawler = site_crawler_from_env()
+
+# Research engine used when a request does not pick one: "web_search" or "crawler"
+RESEARCH_ENGINES = ("web_search", "crawler")
+DEFAULT_RESEARCH_ENGINE = os.getenv("RESEARCH_ENGINE", "web_search")
+
+# Fire-and-forget work started by request handlers; kept referenced until done
+background_tasks = set()
+
+def run_in_background(coro):
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+    return task
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handles FastAPI startup and shutdown."""
+    loop_monitor.start()
+    await vad_pool.start()
+    openai_registry.start()
+    sheets_writer.start()
+    await post_call_queue.start()
+    await recover_unfinished_calls()
+    bulk_research.start()
+    sweeper = asyncio.create_task(session_store.run_sweeper(float(os.getenv("SESSION_SWEEP_INTERVAL", "60"))))
+    peer_poller = asyncio.create_task(node_router.poll_peers())
     yield  # Run app
+    peer_poller.cancel()
+    sweeper.cancel()
+    loop_monitor.stop()
+    await bulk_research.aclose()
+    await site_crawler.aclose()
+    await vad_pool.aclose()
+    await post_call_queue.aclose()
+    await transcript_journal.aclose()
+    await sheets_writer.aclose()
+    await openai_registry.aclose()
+    # Let the logging thread drain its queue
+    await logger.complete()
 
 
 # Initialize FastAPI app with lifespan manager
@@ -33,164 +113,583 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Research-Cache", "Retry-After"],
 )
 
 
 @app.post("/start-session")
 async def start_session() -> Dict[str, str]:
     """Create a new user session"""
-    session_id = create_session()
+    session_id = await create_session()
     return {"session_id": session_id}
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
-    print(f"🔌 WebSocket connection attempt for session: {session_id}")
-    print(f"📋 Available sessions: {list(sessions.keys())}")
+    logger.info(f"🔌 WebSocket connection attempt for session: {session_id}")
     
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session:
-        print(f"❌ Session {session_id} not found")
+        logger.warning(f"❌ Session {session_id} not found")
         await websocket.close(code=1008, reason="Invalid session")
         return
     
-    await websocket.accept()
-    print(f"✅ WebSocket connection accepted for session: {session_id}")
+    assigned_node = session.get("node_id")
+    if not node_router.is_local(assigned_node):
+        logger.info(f"↪️ Session {session_id} is assigned to node {assigned_node}, not {node_router.self_id}")
+        await websocket.close(code=1008, reason=f"Wrong node, reconnect to {assigned_node}")
+        return
+    
     try:
-        await run_voice_agent(websocket, session["agent_config"], session_id, store_lead_data)
-    except Exception as e:
-        print(f"Exception in run_voice_agent: {e}")
+        admission.admit(session_id)
+    except AdmissionRejected as e:
+        logger.warning(f"🚦 Refused call {session_id}: {e.reason}")
+        # 1013: Try Again Later
+        await websocket.close(code=1013, reason=f"Server busy, retry in {e.retry_after}s")
+        return
+    
+    # admit() has already taken the reservation: count the call as live before awaiting the handshake.
+    # Every record logged by this call's pipeline tasks carries its session id.
+    with admission.call(), logger.contextualize(session_id=session_id):
+        await websocket.accept()
+        logger.info(f"✅ WebSocket connection accepted for session: {session_id}")
+        try:
+            async with vad_pool.checkout() as vad_analyzer:
+                await run_voice_agent(
+                    websocket, session["agent_config"], session_id, store_lead_data,
+                    vad_analyzer=vad_analyzer, post_call_callback=post_call_queue.enqueue,
+                    greetings=session.get("greetings"), audio=session.get("audio"),
+                    transcript_journal=transcript_journal,
+                )
+        except Exception as e:
+            logger.exception(f"Exception in run_voice_agent: {e}")
 
 
 # Session management
-sessions: Dict[str, Dict] = {}
+session_store = session_store_from_env()
+
+# Versioned agent configs, reusable by any session
+agent_store = agent_store_from_env()
 
-def create_session() -> str:
+# Pre-generated greetings by agent config hash, reused by every session of the same agent
+greetings_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+GREETINGS_CACHE_SIZE = 256
+
+async def create_session() -> str:
     """Create a new session and return its ID."""
     session_id = str(uuid.uuid4())
-    sessions[session_id] = {
+    await session_store.create(session_id, {
         "agent_config": {},
-        "created_at": datetime.datetime.now()
-    }
+        "created_at": datetime.datetime.now().isoformat()
+    })
     return session_id
 
-def get_session(session_id: str) -> Optional[Dict]:
+async def get_session(session_id: str) -> Optional[Dict]:
     """Get session data by ID."""
-    return sessions.get(session_id)
+    return await session_store.get(session_id)
+
+async def update_config(session_id: str, config: Dict, agent: Optional[Dict] = None):
+    """Update agent config for a session, dropping greetings written for the previous one.
 
-def update_config(session_id: str, config: Dict):
-    """Update agent config for a session."""
-    if session_id in sessions:
-        sessions[session_id]["agent_config"] = config
+    ``agent`` is the agent store record the config came from, if any.
+    """
+    agent_ref = {key: agent[key] for key in ("agent_id", "version", "hash")} if agent else None
+    await session_store.update(session_id, agent_config=config, agent=agent_ref, greetings=None)
 
-def store_lead_data(session_id: str, lead_data: Dict):
+async def store_lead_data(session_id: str, lead_data: Dict):
     """Store lead data for a session."""
-    if session_id in sessions:
-        sessions[session_id]["lead_data"] = lead_data
+    await session_store.update(session_id, lead_data=lead_data)
+
+# Durable post-call analysis and persistence, run off the WebSocket disconnect path
+post_call_queue = post_call_queue_from_env(
+    lambda job, final_attempt: process_post_call_job(job, final_attempt, store_lead_callback=store_lead_data)
+)
+
+async def recover_unfinished_calls():
+    """Queue post-call analysis for calls the transcript journal saw start but never finish."""
+    transcript_journal.start()
+    calls = await transcript_journal.recover()
+    for call in calls:
+        with logger.contextualize(session_id=call["session_id"]):
+            await post_call_queue.enqueue(recovered_post_call_job(call))
+            logger.info(f"♻️ Re-queued analysis for unfinished call ({len(call['turns'])} turns)")
+    # Marked finished in one batch once every job is durable in the post-call journal
+    await asyncio.gather(*(transcript_journal.end(call["session_id"], recovered=True) for call in calls))
 
 @app.post("/configure-agent")
 async def configure_agent(request: Request) -> Dict[Any, Any]:
+    """Configure a session's agent from a full ``config``, or from a stored agent by ``agent_id`` (and optional ``version``).
+
+    Full configs are saved to the agent store, so the returned ``agent_id`` can be used for later sessions.
+    """
     data = await request.json()
     session_id = data.get("session_id")
     config_data = data.get("config")
+    agent_id = data.get("agent_id")
     
-    print(f"📥 Backend: Received config data: {config_data}")
-    print(f"📝 Backend: Config keys: {list(config_data.keys()) if config_data else 'None'}")
-    print(f"📝 Backend: brandName in config: {config_data.get('brandName') if config_data else 'Not found'}")
-    
-    if not session_id or not get_session(session_id):
+    if not session_id or not await get_session(session_id):
         return {"error": "Invalid session"}
     
-    update_config(session_id, config_data)
-    print(f"Agent configured for session {session_id}: {config_data.get('brandName', 'Unknown')}")
-    return {"status": "success", "message": "Agent configured successfully"}
+    if agent_id:
+        agent = await asyncio.to_thread(agent_store.get, agent_id, data.get("version"))
+        if not agent:
+            return {"error": "Unknown agent"}
+        config_data = agent["config"]
+    elif isinstance(config_data, dict):
+        logger.debug(f"📥 Received config for session {session_id}: keys {list(config_data.keys())}, brandName {config_data.get('brandName', 'not found')}")
+        agent = await asyncio.to_thread(agent_store.save, config_data)
+    else:
+        return {"error": "config or agent_id is required"}
+    
+    await configure_session(session_id, config_data, agent)
+    logger.info(f"Agent configured for session {session_id}: {config_data.get('brandName', 'Unknown')} (agent {agent['agent_id']} v{agent['version']})")
+    return {
+        "status": "success",
+        "message": "Agent configured successfully",
+        "agent_id": agent["agent_id"],
+        "version": agent["version"],
+        "hash": agent["hash"],
+    }
+
+async def configure_session(session_id: str, config: Dict, agent: Optional[Dict] = None):
+    """Attach ``config`` to a session and start the per-agent precomputation for its call."""
+    await update_config(session_id, config, agent)
+    # Index the company details the agent looks up during the call
+    await asyncio.to_thread(knowledge_index_for, config)
+    # Write and synthesize the opening greeting and fixed phrases ahead of the call
+    run_in_background(prepare_call_audio(session_id, config))
+
+async def prepare_call_audio(session_id: str, config: Dict):
+    """Pre-generate the session's greetings and warm the TTS cache with everything the call will say first."""
+    try:
+        key = config_hash(config)
+        greetings = greetings_cache.get(key)
+        if greetings is None:
+            greetings = await generate_greetings(config)
+            greetings_cache[key] = greetings
+            while len(greetings_cache) > GREETINGS_CACHE_SIZE:
+                greetings_cache.popitem(last=False)
+        greetings_cache.move_to_end(key)
+        # The agent may have been reconfigured while we were generating
+        session = await get_session(session_id)
+        if session and session.get("agent_config") == config:
+            await session_store.update(session_id, greetings=greetings)
+            logger.info(f"👋 Greetings ready for session {session_id}")
+        await tts_cache.seed(greetings.values(), TTS_VOICE, TTS_MODEL)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not pre-generate greetings for session {session_id}: {e}")
+    try:
+        await tts_cache.seed(seed_phrases(config), TTS_VOICE, TTS_MODEL)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not pre-synthesize fixed phrases for session {session_id}: {e}")
 
 async def research_with_llm(url: str) -> Dict[str, Any]:
     """Use LLM with native web search tool to analyze website and generate agent configuration."""
     try:
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
         prompt = PromptTemplates.COMPANY_RESEARCH_TEMPLATE.format(url=url)
 
-        response = await client.responses.create(
-            model="gpt-4.1",
-            input=prompt,
-            tools=[{"type": "web_search"}]
-        )
+        async with openai_registry.request("research") as client:
+            response = await client.responses.create(
+                model="gpt-4.1",
+                input=prompt,
+                tools=[{"type": "web_search"}],
+                text=responses_text_format("agent_config", AGENT_CONFIG_SCHEMA)
+            )
         
         content = response.output_text
-        print(f"🔍 Raw response from LLM: {content}")
+        logger.debug(f"🔍 Raw response from LLM: {content}")
         
-        # Clean and parse JSON response using shared function
-        cleaned_content = clean_json_response(content)
-        print(f"🧹 Cleaned content: {cleaned_content}")
+        # Parse against the schema; malformed output gets a small repair call rather than a repeat of the research
+        config = await parse_or_repair(content, AGENT_CONFIG_SCHEMA, "agent_config", "research")
         
-        # Parse and validate JSON
-        config = json.loads(cleaned_content)
-        print(f"✅ Parsed JSON keys: {list(config.keys())}")
-        print(f"✅ Full config structure: {config}")
+        logger.info(f"✅ Generated agent config for {url}: {list(config.keys())}")
+        logger.debug(f"✅ Full config structure: {config}")
+        return config
         
-        # Config is ready as-is from LLM
+    except Exception as e:
+        logger.error(f"❌ Error with LLM analysis: {e}")
+        # Return fallback config
+        return get_fallback_config()
+
+async def research_with_llm_stream(url: str, emit: Callable[[str, Dict[str, Any]], None]) -> Dict[str, Any]:
+    """Like research_with_llm, but streams the Responses API events and reports
+    search progress and each config field through ``emit`` as soon as it is complete."""
+    try:
+        prompt = PromptTemplates.COMPANY_RESEARCH_TEMPLATE.format(url=url)
+        parser = IncrementalObjectParser()
+        deltas = []
+
+        async with openai_registry.request("research") as client:
+            stream = await client.responses.create(
+                model="gpt-4.1",
+                input=prompt,
+                tools=[{"type": "web_search"}],
+                text=responses_text_format("agent_config", AGENT_CONFIG_SCHEMA),
+                stream=True
+            )
+            async for event in stream:
+                if event.type == "response.web_search_call.searching":
+                    emit("status", {"stage": "searching"})
+                elif event.type == "response.web_search_call.completed":
+                    emit("status", {"stage": "search_completed"})
+                elif event.type == "response.output_text.delta":
+                    if not deltas:
+                        emit("status", {"stage": "writing"})
+                    deltas.append(event.delta)
+                    for field, value in parser.feed(event.delta):
+                        emit("field", {"field": field, "value": value})
+        
+        content = "".join(deltas)
+        logger.debug(f"🔍 Raw streamed response from LLM: {content}")
         
-        print(f"✅ Generated agent config for {url}: {config}")
+        config = await parse_or_repair(content, AGENT_CONFIG_SCHEMA, "agent_config", "research")
+        logger.info(f"✅ Generated agent config for {url}")
         return config
         
     except Exception as e:
-        print(f"❌ Error with LLM analysis: {e}")
-        # Return fallback config
+        logger.error(f"❌ Error with streaming LLM analysis: {e}")
+        emit("status", {"stage": "fallback", "error": str(e)})
         return get_fallback_config()
 
+async def research_with_crawler(url: str, emit: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """Crawl the website locally and generate the agent configuration from its text with a plain completion call."""
+    try:
+        if emit:
+            emit("status", {"stage": "crawling"})
+        pages = await site_crawler.crawl(url)
+        if not pages:
+            raise ValueError(f"No readable pages crawled from {url}")
+        corpus = site_crawler.corpus(pages)
+        logger.info(f"🕷️ Crawled {len(pages)} page(s) from {url}, {len(corpus)} characters of content")
+        
+        if emit:
+            emit("status", {"stage": "writing"})
+        async with openai_registry.request("research") as client:
+            response = await client.chat.completions.create(
+                model="gpt-4.1",
+                messages=[{"role": "user", "content": build_crawled_research_prompt(url, corpus)}],
+                response_format=chat_response_format("agent_config", AGENT_CONFIG_SCHEMA),
+                temperature=0.3
+            )
+        
+        content = response.choices[0].message.content
+        logger.debug(f"🔍 Raw response from LLM: {content}")
+        
+        config = await parse_or_repair(content, AGENT_CONFIG_SCHEMA, "agent_config", "research")
+        logger.info(f"✅ Generated agent config for {url} from crawled content")
+        return config
+        
+    except Exception as e:
+        logger.error(f"❌ Error with crawler research: {e}")
+        if emit:
+            emit("status", {"stage": "fallback", "error": str(e)})
+        return get_fallback_config()
+
+def research_engine(data: Dict[str, Any]) -> str:
+    engine = data.get('engine') or DEFAULT_RESEARCH_ENGINE
+    if engine not in RESEARCH_ENGINES:
+        raise ValueError(f"Unknown research engine '{engine}', expected one of: {', '.join(RESEARCH_ENGINES)}")
+    return engine
+
+def research_cache_key(url: str, engine: str) -> str:
+    # Engines give different results for the same site, so they are cached separately
+    key = canonical_website(url).lower()
+    return key if engine == "web_search" else f"{engine}:{key}"
+
+def normalize_research_url(url: str) -> str:
+    url = url.strip()
+    if url and not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    return url
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 @app.post("/analyze-company")
-async def analyze_company(request: Request) -> Dict[Any, Any]:
-    """Analyze a company website and generate agent configuration using LLM with web search."""
+async def analyze_company(request: Request, response: Response) -> Dict[Any, Any]:
+    """Analyze a company website and generate agent configuration using LLM with web search,
+    or from a local crawl of the site with ``"engine": "crawler"``."""
     try:
         data = await request.json()
         url = data.get('url', '').strip()
+        force_refresh = bool(data.get('force_refresh', False))
         
         if not url:
             return {"error": "URL is required"}
         
         # Normalize URL
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
+        url = normalize_research_url(url)
+        engine = research_engine(data)
         
-        print(f"🔍 Starting LLM web research for: {url}")
+        logger.info(f"🔍 Starting LLM research for: {url} (engine: {engine})")
         
-        # Use LLM with web search to analyze the website
-        agent_config = await research_with_llm(url)
+        # Use LLM with web search (or the local crawler) to analyze the website, reusing recent research for the same site.
+        # Fallback configs are not cached so a transient failure does not stick for the whole TTL.
+        agent_config, cache_hit = await research_cache.get_or_compute(
+            research_cache_key(url, engine),
+            (lambda: research_with_crawler(url)) if engine == "crawler" else (lambda: research_with_llm(url)),
+            force_refresh=force_refresh,
+            should_cache=lambda config: config != get_fallback_config(),
+        )
+        response.headers["X-Research-Cache"] = "HIT" if cache_hit else "MISS"
         
         # Add the website URL to the config for persistence
         agent_config['websiteUrl'] = url
         
-        print(f"✅ LLM research completed for {url}")
+        logger.info(f"✅ LLM research completed for {url} (cache {'hit' if cache_hit else 'miss'})")
         return agent_config
         
     except Exception as e:
-        print(f"❌ Error in LLM website research: {e}")
+        logger.error(f"❌ Error in LLM website research: {e}")
         return {"error": f"Research failed: {str(e)}"}
 
+@app.post("/analyze-company/stream")
+async def analyze_company_stream(request: Request):
+    """Server-sent-events version of /analyze-company.
+
+    Emits ``status`` events for search progress, a ``field`` event for each agent
+    config field as soon as it is complete, then one ``config`` event with the
+    validated full config (or ``error``). Research keeps running, and is cached,
+    if the client goes away. With ``"engine": "crawler"`` the fields all arrive
+    once the config is ready, after ``crawling`` and ``writing`` status events.
+    """
+    data = await request.json()
+    url = normalize_research_url(data.get('url', ''))
+    force_refresh = bool(data.get('force_refresh', False))
+    if not url:
+        return {"error": "URL is required"}
+    try:
+        engine = research_engine(data)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    logger.info(f"🔍 Starting streaming LLM research for: {url} (engine: {engine})")
+    events: asyncio.Queue = asyncio.Queue()
+    sent_fields = set()
+
+    def emit(event: str, payload: Dict[str, Any]):
+        if event == "field":
+            sent_fields.add(payload["field"])
+        events.put_nowait((event, payload))
+
+    async def research():
+        try:
+            agent_config, cache_hit = await research_cache.get_or_compute(
+                research_cache_key(url, engine),
+                (lambda: research_with_crawler(url, emit)) if engine == "crawler" else (lambda: research_with_llm_stream(url, emit)),
+                force_refresh=force_refresh,
+                should_cache=lambda config: config != get_fallback_config(),
+            )
+            is_fallback = agent_config == get_fallback_config()
+            agent_config['websiteUrl'] = url
+            emit("status", {"stage": "done", "cache": "HIT" if cache_hit else "MISS"})
+            # Cache hits and coalesced requests streamed nothing, and a fallback replaces any partial fields
+            for field, value in agent_config.items():
+                if is_fallback or field not in sent_fields:
+                    emit("field", {"field": field, "value": value})
+            emit("config", agent_config)
+            logger.info(f"✅ Streaming LLM research completed for {url} (cache {'hit' if cache_hit else 'miss'})")
+        except Exception as e:
+            logger.error(f"❌ Error in streaming LLM website research: {e}")
+            emit("error", {"error": f"Research failed: {str(e)}"})
+        finally:
+            events.put_nowait(None)
+
+    run_in_background(research())
+
+    async def event_stream():
+        while True:
+            item = await events.get()
+            if item is None:
+                return
+            yield sse_event(*item)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+async def research_cached(url: str):
+    """Research ``url`` through the shared cache, as /analyze-company does."""
+    return await research_cache.get_or_compute(
+        canonical_website(url).lower(),
+        lambda: research_with_llm(url),
+        should_cache=lambda config: config != get_fallback_config(),
+    )
+
+# Batched research for onboarding many websites at once
+bulk_research = bulk_research_from_env(
+    research_cached,
+    lambda url: canonical_website(url).lower(),
+    get_fallback_config,
+)
+
+@app.post("/bulk-research")
+async def submit_bulk_research(request: Request) -> Dict[Any, Any]:
+    """Queue research for a list of website URLs and return a job id to poll."""
+    data = await request.json()
+    urls = data.get("urls")
+    if not isinstance(urls, list) or not all(isinstance(url, str) for url in urls):
+        return {"error": "urls must be a list of strings"}
+    try:
+        job = bulk_research.submit(urls)
+    except ValueError as e:
+        return {"error": str(e)}
+    return {"job_id": job.job_id, "total": len(job.items)}
+
+@app.get("/bulk-research/{job_id}")
+async def get_bulk_research(job_id: str) -> Dict[Any, Any]:
+    """Per-URL status of a bulk research job."""
+    job = bulk_research.get(job_id)
+    if not job:
+        return {"error": "Unknown job"}
+    return job.summary()
+
+@app.get("/bulk-research/{job_id}/events")
+async def stream_bulk_research(job_id: str):
+    """Server-sent events: the current status of every URL, then each change until the job finishes."""
+    job = bulk_research.get(job_id)
+    if not job:
+        return {"error": "Unknown job"}
+    updates = job.subscribe()
+
+    async def event_stream():
+        try:
+            for item in job.summary()["items"]:
+                yield sse_event("item", item)
+            while not job.done:
+                item = await updates.get()
+                if item is None:
+                    break
+                yield sse_event("item", item)
+            yield sse_event("done", {"counts": job.counts()})
+        finally:
+            job.unsubscribe(updates)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/bulk-research/{job_id}/results")
+async def get_bulk_research_results(job_id: str):
+    """All agent configs produced so far, keyed by submitted URL, as a JSON download."""
+    job = bulk_research.get(job_id)
+    if not job:
+        return {"error": "Unknown job"}
+    return JSONResponse(
+        bulk_research.results(job),
+        headers={"Content-Disposition": f'attachment; filename="agent-configs-{job_id}.json"'},
+    )
+
+@app.post("/agents")
+async def create_agent(request: Request) -> Dict[Any, Any]:
+    """Store an agent config. Returns its agent id, version and content hash."""
+    data = await request.json()
+    submitted = data.get("config")
+    try:
+        config = check_schema(submitted, AGENT_CONFIG_SCHEMA)
+    except StructuredOutputError as e:
+        return {"error": f"Invalid agent config: {e}"}
+    # Not part of the researched schema; research sets it, and the store keys agents by it
+    if submitted.get("websiteUrl"):
+        config["websiteUrl"] = submitted["websiteUrl"]
+    agent = await asyncio.to_thread(agent_store.save, config)
+    return {key: value for key, value in agent.items() if key != "config"}
+
+@app.get("/agents/{agent_id}")
+async def get_agent(agent_id: str, version: Optional[int] = None) -> Dict[Any, Any]:
+    """A stored agent config, the latest version unless ``version`` is given, with its version history."""
+    agent = await asyncio.to_thread(agent_store.get, agent_id, version)
+    if not agent:
+        return {"error": "Unknown agent"}
+    return {**agent, "versions": await asyncio.to_thread(agent_store.versions, agent_id)}
+
+@app.post("/agents/{agent_id}/attach")
+async def attach_agent(agent_id: str, request: Request) -> Dict[Any, Any]:
+    """Configure a session with a stored agent, as /configure-agent does with ``agent_id``."""
+    data = await request.json()
+    session_id = data.get("session_id")
+    if not session_id or not await get_session(session_id):
+        return {"error": "Invalid session"}
+    agent = await asyncio.to_thread(agent_store.get, agent_id, data.get("version"))
+    if not agent:
+        return {"error": "Unknown agent"}
+    await configure_session(session_id, agent["config"], agent)
+    logger.info(f"Agent {agent_id} v{agent['version']} attached to session {session_id}")
+    return {"status": "success", "agent_id": agent_id, "version": agent["version"], "hash": agent["hash"]}
+
 @app.get("/get-lead-data/{session_id}")
 async def get_lead_data(session_id: str) -> Dict[Any, Any]:
     """Retrieve lead analysis data for a completed session."""
-    session = get_session(session_id)
+    session = await get_session(session_id)
     if not session:
         return {"error": "Invalid session"}
     
     lead_data = session.get("lead_data")
     if not lead_data:
+        # Mid-call, or while the post-call analysis runs: the transcript so far, from the journal
+        call = transcript_journal.call(session_id)
+        if call:
+            return {
+                "error": "No lead data available for this session",
+                "status": "analyzing" if call["ended"] else "in_call",
+                "conversation_log": "\n".join(call["turns"]),
+                "final": False,
+            }
         return {"error": "No lead data available for this session"}
     
     return lead_data
 
+@app.get("/stats")
+async def get_stats() -> Dict[str, Any]:
+    """Report process-level resource pool statistics."""
+    return {
+        "process": loop_monitor.stats(),
+        "sessions": session_store.stats(),
+        "agent_store": await asyncio.to_thread(agent_store.stats),
+        "nodes": node_router.stats(),
+        "admission": admission.stats(),
+        "vad_pool": vad_pool.stats(),
+        "research_cache": research_cache.stats(),
+        "tts_cache": tts_cache.stats(),
+        "sheets_writer": sheets_writer.stats(),
+        "post_call_queue": post_call_queue.stats(),
+        "transcript_journal": transcript_journal.stats(),
+        "bulk_research": bulk_research.stats(),
+    }
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    """Expose Prometheus metrics, including the per-turn voice latency histograms."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 @app.post("/connect")
 async def bot_connect(request: Request) -> Dict[Any, Any]:
     data = await request.json()
     session_id = data.get("session_id")
     
-    if not session_id or not get_session(session_id):
+    if not session_id or not await get_session(session_id):
         return {"error": "Invalid session"}
     
-    tunnel_host = "representatives-ld-variable-tom.trycloudflare.com"
-    return {"ws_url": f"wss://{tunnel_host}/ws/{session_id}"}
+    # Pin the call to one node so /ws/{session_id} lands where it was routed
+    node = node_router.pick(session_id)
+    if node_router.is_local(node.node_id):
+        # Peers run their own admission when the WebSocket arrives
+        try:
+            await admission.reserve(session_id)
+        except AdmissionRejected as e:
+            logger.warning(f"🚦 Refused call {session_id}: {e.reason}, retry in {e.retry_after}s")
+            return JSONResponse(
+                {"error": "Server busy", "reason": e.reason, "retry_after": e.retry_after, "queue_length": e.queue_length},
+                status_code=503,
+                headers={"Retry-After": str(e.retry_after)},
+            )
+    audio = negotiate_audio(data)
+    await session_store.update(session_id, node_id=node.node_id, audio=audio)
+    return {"ws_url": node.ws_url(session_id), "audio": audio}
+
+@app.get("/node-status")
+async def node_status() -> Dict[str, Any]:
+    """Report this node's live-call count for peers' routing decisions."""
+    return node_router.status()
 
 
 async def main():
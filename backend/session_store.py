@@ -0,0 +1,279 @@
+import os
+import copy
+import json
+import time
+import asyncio
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+
+# A read refreshes a session's last access only once it is this fraction of idle_seconds old,
+# so most reads do not write; idle expiry can come that much early
+LAST_ACCESS_REFRESH = 0.1
+
+
+class SessionStore(ABC):
+    """Session storage with absolute TTL, idle expiry and an LRU-evicted entry cap.
+
+    Session dicts returned by ``get`` are read-only snapshots; change them
+    through ``update`` so every backend sees the write. ``create``, ``get``
+    and ``update`` are coroutines so backends that block (SQLite) can run off
+    the event loop; ``sweep`` is always called from a worker thread.
+    """
+
+    def __init__(self, ttl_seconds: float = 24 * 3600, idle_seconds: float = 2 * 3600, max_entries: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.idle_seconds = idle_seconds
+        self.max_entries = max_entries
+        self.evicted = 0
+        self.expired = 0
+
+    @abstractmethod
+    async def create(self, session_id: str, data: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def update(self, session_id: str, **fields) -> bool:
+        """Merge ``fields`` into an existing session. Returns False if it does not exist."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Drop expired sessions and return how many were removed."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of stored sessions; cheap enough to call on the event loop."""
+
+    def _is_expired(self, created_at: float, last_access: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds or now - last_access > self.idle_seconds
+
+    async def run_sweeper(self, interval: float = 60.0):
+        """Background task that periodically removes expired sessions."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                removed = await asyncio.to_thread(self.sweep)
+                if removed:
+                    logger.info(f"🧹 Swept {removed} expired session(s), {len(self)} remaining")
+            except Exception as e:
+                logger.error(f"❌ Session sweep failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": type(self).__name__,
+            "sessions": len(self),
+            "max_entries": self.max_entries,
+            "evicted": self.evicted,
+            "expired": self.expired,
+        }
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process session store backed by an ordered dict in LRU order."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # session_id -> [created_at, last_access, data]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def create(self, session_id: str, data: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._entries[session_id] = [now, now, dict(data)]
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evicted += 1
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if self._is_expired(entry[0], entry[1], now):
+                del self._entries[session_id]
+                self.expired += 1
+                return None
+            entry[1] = now
+            self._entries.move_to_end(session_id)
+            data = entry[2]
+        # update() replaces the dict rather than changing it, so it can be copied outside the lock
+        return copy.deepcopy(data)
+
+    async def update(self, session_id: str, **fields) -> bool:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return False
+            entry[1] = time.time()
+            entry[2] = {**entry[2], **fields}
+            self._entries.move_to_end(session_id)
+            return True
+
+    def sweep(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, entry in self._entries.items() if self._is_expired(entry[0], entry[1], now)]
+            for sid in expired:
+                del self._entries[sid]
+        self.expired += len(expired)
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a SQLite database in WAL mode, shared by every worker process on the host.
+
+    Queries run on a small thread pool, so a write waiting out another
+    process's lock (up to the 5 s busy timeout) never stalls the event loop.
+    """
+
+    def __init__(self, path: str, threads: int = 4, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="session-db")
+        # This process's view of the row count, kept up to date by its own writes and
+        # recounted on sweep and when it passes max_entries, so len() never queries on the event loop
+        self._count = 0
+        self._count_lock = threading.Lock()
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_access ON sessions (last_access)")
+        conn.commit()
+        self._count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shareable across threads; each pool thread and the sweeper get their own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def create(self, session_id: str, data: Dict[str, Any]):
+        await self._run(self._create, session_id, data)
+
+    async def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._run(self._get, session_id)
+
+    async def update(self, session_id: str, **fields) -> bool:
+        return await self._run(self._update, session_id, fields)
+
+    def _create(self, session_id: str, data: Dict[str, Any]):
+        now = time.time()
+        conn = self._conn()
+        row = (json.dumps(data, default=str), now, now, session_id)
+        added = conn.execute(
+            "INSERT OR IGNORE INTO sessions (data, created_at, last_access, id) VALUES (?, ?, ?, ?)", row
+        ).rowcount
+        if not added:
+            conn.execute("UPDATE sessions SET data = ?, created_at = ?, last_access = ? WHERE id = ?", row)
+            return
+        with self._count_lock:
+            self._count += 1
+            full = self._count > self.max_entries
+        if not full:
+            return
+        # Other processes write to the same table, so count it before evicting
+        count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+            self.evicted += overflow
+        with self._count_lock:
+            self._count = min(count, self.max_entries)
+
+    def _get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT data, created_at, last_access FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        data, created_at, last_access = row
+        if self._is_expired(created_at, last_access, now):
+            if conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount:
+                self.expired += 1
+                with self._count_lock:
+                    self._count -= 1
+            return None
+        if now - last_access > self.idle_seconds * LAST_ACCESS_REFRESH:
+            conn.execute("UPDATE sessions SET last_access = ? WHERE id = ?", (now, session_id))
+        return json.loads(data)
+
+    def _update(self, session_id: str, fields: Dict[str, Any]) -> bool:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT data FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return False
+            data = {**json.loads(row[0]), **fields}
+            conn.execute(
+                "UPDATE sessions SET data = ?, last_access = ? WHERE id = ?",
+                (json.dumps(data, default=str), time.time(), session_id),
+            )
+            conn.execute("COMMIT")
+            return True
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def sweep(self) -> int:
+        now = time.time()
+        conn = self._conn()
+        cursor = conn.execute(
+            "DELETE FROM sessions WHERE created_at < ? OR last_access < ?",
+            (now - self.ttl_seconds, now - self.idle_seconds),
+        )
+        self.expired += cursor.rowcount
+        count = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        with self._count_lock:
+            self._count = count
+        return cursor.rowcount
+
+    def __len__(self) -> int:
+        return self._count
+
+
+def session_store_from_env() -> SessionStore:
+    options = dict(
+        ttl_seconds=float(os.getenv("SESSION_TTL_SECONDS", str(24 * 3600))),
+        idle_seconds=float(os.getenv("SESSION_IDLE_SECONDS", str(2 * 3600))),
+        max_entries=int(os.getenv("SESSION_MAX_ENTRIES", "10000")),
+    )
+    path = os.getenv("SESSION_DB_PATH")
+    if path:
+        return SQLiteSessionStore(path, **options)
+    return MemorySessionStore(**options)
@@ -0,0 +1,217 @@
+import time
+import random
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from loguru import logger
+
+
+SHEET_HEADERS = [
+    "Session ID", "Start Time", "End Time", "Duration", "Website", "Lead Name", "Phone", "Email",
+    "Qualification Status", "Qualification Reason", "Summary", "Pain Points", "Next Steps", "Conversation"
+]
+
+
+def lead_to_row(lead: Dict[str, Any]) -> List[Any]:
+    """Flatten a lead record into a row matching SHEET_HEADERS."""
+    return [
+        lead["session_id"],
+        lead["start_time"],
+        lead.get("end_time", ""),
+        lead.get("duration", "0:00"),
+        lead.get("website_url", ""),
+        lead["lead_name"],
+        lead["phone"],
+        lead["email"],
+        lead["qualification_status"],
+        lead["qualification_reason"],
+        lead["summary"],
+        lead["pain_points"],
+        lead["next_steps"],
+        lead["conversation_log"]
+    ]
+
+
+def _is_retryable(error: Exception) -> bool:
+    """Quota (429) and transient server errors are worth retrying; anything else is not."""
+    code = getattr(error, "code", None)
+    return code == 429 or (isinstance(code, int) and code >= 500)
+
+
+class SheetsLeadWriter:
+    """Long-lived Google Sheets writer that batches leads per worksheet.
+
+    The authorized client, spreadsheet and worksheet handles are cached for the
+    life of the process. Leads are queued and written with one ``append_rows``
+    per worksheet whenever ``batch_size`` leads are waiting or ``flush_interval``
+    seconds have passed since the oldest queued lead. ``enqueue`` returns a
+    future that resolves once the lead's row is written, or fails with the
+    error that kept it from being written, so callers can keep the lead
+    durable until Sheets has it.
+
+    ``client_manager_factory`` returns anything with the
+    ``gspread_asyncio.AsyncioGspreadClientManager`` surface, so an in-memory fake
+    can stand in for the real API.
+    """
+
+    def __init__(
+        self,
+        client_manager_factory: Callable[[], Any],
+        sheet_id: Optional[str],
+        sheet_name_for: Callable[[Optional[str]], str],
+        batch_size: int = 20,
+        flush_interval: float = 2.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+    ):
+        self.client_manager_factory = client_manager_factory
+        self.sheet_id = sheet_id
+        self.sheet_name_for = sheet_name_for
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._client_manager = None
+        self._spreadsheet = None
+        self._worksheets: Dict[str, Any] = {}
+        self._needs_header: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.api_calls = 0
+        self.leads_written = 0
+        self.leads_failed = 0
+        self.retries = 0
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        """Flush anything still queued and stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    def enqueue(self, lead: Dict[str, Any]) -> asyncio.Future:
+        if self._task is None:
+            self.start()
+        written = asyncio.get_running_loop().create_future()
+        # Failures are logged by flush(); callers that do not wait on the write should not warn again
+        written.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._queue.put_nowait((lead, written))
+        return written
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self.flush(batch)
+
+    async def flush(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]):
+        """Write a batch of ``(lead, written)`` pairs with one append_rows per worksheet, resolving each ``written``."""
+        by_sheet: Dict[str, List[Tuple[Dict[str, Any], asyncio.Future]]] = defaultdict(list)
+        for lead, written in batch:
+            by_sheet[self.sheet_name_for(lead.get("website_url"))].append((lead, written))
+
+        for sheet_name, items in by_sheet.items():
+            sheet_leads = [lead for lead, _ in items]
+            try:
+                await self._with_retry(lambda: self._append(sheet_name, sheet_leads))
+                self.leads_written += len(sheet_leads)
+                logger.info(f"✅ {len(sheet_leads)} lead(s) saved to Google Sheets ({sheet_name})")
+                outcome = None
+            except Exception as e:
+                self.leads_failed += len(sheet_leads)
+                # Drop the handle in case the worksheet was deleted or renamed under us
+                self._worksheets.pop(sheet_name, None)
+                logger.error(f"❌ Error saving {len(sheet_leads)} lead(s) to Google Sheets ({sheet_name}): {e}")
+                outcome = e
+            for _, written in items:
+                if written.done():
+                    continue
+                if outcome is None:
+                    written.set_result(None)
+                else:
+                    written.set_exception(outcome)
+
+    async def _append(self, sheet_name: str, leads: List[Dict[str, Any]]):
+        ws = await self._worksheet(sheet_name)
+        rows = [lead_to_row(lead) for lead in leads]
+        if sheet_name in self._needs_header:
+            # Write the header in the same request as the first batch
+            rows.insert(0, SHEET_HEADERS)
+        self.api_calls += 1
+        await ws.append_rows(rows)
+        self._needs_header.discard(sheet_name)
+
+    async def _worksheet(self, sheet_name: str):
+        ws = self._worksheets.get(sheet_name)
+        if ws is not None:
+            return ws
+
+        if self._spreadsheet is None:
+            if self._client_manager is None:
+                self._client_manager = self.client_manager_factory()
+            self.api_calls += 1
+            client = await self._client_manager.authorize()
+            self.api_calls += 1
+            self._spreadsheet = await client.open_by_key(self.sheet_id)
+
+        try:
+            self.api_calls += 1
+            ws = await self._spreadsheet.worksheet(sheet_name)
+        except Exception as worksheet_error:
+            if _is_retryable(worksheet_error):
+                raise
+            logger.info(f"Worksheet '{sheet_name}' not found, creating it...")
+            self.api_calls += 1
+            ws = await self._spreadsheet.add_worksheet(title=sheet_name, rows=1000, cols=20)
+            self._needs_header.add(sheet_name)
+        self._worksheets[sheet_name] = ws
+        return ws
+
+    async def _with_retry(self, operation: Callable[[], Any]):
+        attempt = 0
+        while True:
+            try:
+                return await operation()
+            except Exception as e:
+                attempt += 1
+                if not _is_retryable(e) or attempt > self.max_retries:
+                    raise
+                self.retries += 1
+                delay = self.backoff_base * (2 ** (attempt - 1)) * (0.5 + random.random())
+                logger.warning(f"Google Sheets quota/server error ({e}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "leads_written": self.leads_written,
+            "leads_failed": self.leads_failed,
+            "api_calls": self.api_calls,
+            "api_calls_per_lead": round(self.api_calls / self.leads_written, 3) if self.leads_written else 0.0,
+            "retries": self.retries,
+            "cached_worksheets": len(self._worksheets),
+        }
@@ -0,0 +1,347 @@
+import os
+import re
+import time
+import asyncio
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from loguru import logger
+
+
+USER_AGENT = "WebsiteToVoiceAgentBot/1.0 (+company research for voice agent setup)"
+
+# Elements whose text is navigation, chrome or code rather than page content
+SKIP_TAGS = {"script", "style", "noscript", "svg", "nav", "header", "footer", "aside", "form", "iframe", "template", "button", "select"}
+BLOCK_TAGS = {"p", "li", "h1", "h2", "h3", "h4", "h5", "h6", "td", "th", "dd", "dt", "blockquote", "section", "article", "div", "br", "tr"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+# Pages most useful for an agent profile are crawled first
+PRIORITY_WORDS = ("about", "product", "service", "solution", "pricing", "plan", "package", "compan", "mission", "industr", "customer", "feature", "who-we")
+SKIP_EXTENSIONS = (".pdf", ".jpg", ".jpeg", ".png", ".gif", ".svg", ".webp", ".zip", ".mp4", ".mp3", ".css", ".js", ".xml", ".ico", ".woff", ".woff2")
+TRACKING_PARAMS = re.compile(r"^(utm_|gclid$|fbclid$|mc_|ref$|ref_src$)")
+
+
+def canonical_url(url: str) -> str:
+    """Normalize a URL for dedup: lowercase host without www., no fragment, no tracking params, no trailing slash."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = re.sub(r"/+$", "", parts.path) or "/"
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k)))
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def canonical_website(url):
+    """Reduce a URL to its bare host: no protocol, no www., no path."""
+    # Remove protocol
+    clean_url = url.strip().replace('https://', '').replace('http://', '')
+    
+    # Remove www.
+    if clean_url.startswith('www.'):
+        clean_url = clean_url[4:]
+    
+    # Remove trailing slash and paths
+    return clean_url.split('/')[0]
+
+
+def _priority(url: str) -> int:
+    path = urlsplit(url).path.lower()
+    return 0 if any(word in path for word in PRIORITY_WORDS) else 1
+
+
+class TextExtractor(HTMLParser):
+    """Streaming HTML to text. Feed it a whole page or chunks of one.
+
+    Keeps the title, meta description and visible text outside boilerplate
+    elements, one line per block element, and collects links and the
+    ``rel=canonical`` URL along the way.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.description = ""
+        self.canonical: Optional[str] = None
+        self.links: List[str] = []
+        self._lines: List[str] = []
+        self._current: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "a" and attrs.get("href"):
+            self.links.append(attrs["href"])
+        elif tag == "link" and (attrs.get("rel") or "").lower() == "canonical" and attrs.get("href"):
+            self.canonical = attrs["href"]
+        elif tag == "meta" and (attrs.get("name") or "").lower() == "description":
+            self.description = (attrs.get("content") or "").strip()
+        elif tag == "title":
+            self._in_title = True
+        if tag in SKIP_TAGS and tag not in VOID_TAGS:
+            self._skip_depth += 1
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag == "title":
+            self._in_title = False
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip_depth:
+            self._current.append(data)
+
+    def _flush(self):
+        line = " ".join("".join(self._current).split())
+        self._current = []
+        # Very short fragments are mostly menu items and buttons that escaped the skip list
+        if len(line) >= 25 and (not self._lines or self._lines[-1] != line):
+            self._lines.append(line)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n".join(self._lines)
+
+
+class SiteCrawler:
+    """Crawls one website at a time for research, within a page and byte budget.
+
+    Honors robots.txt, seeds the frontier from the homepage and any sitemaps,
+    stays on the starting host, dedups by canonical URL and caps in-flight
+    requests per host. All crawls share one pooled HTTP client.
+
+    Every body (robots.txt, sitemaps, pages) is streamed and counted in bytes
+    against ``max_page_bytes`` and the crawl's ``max_bytes``, of which sitemaps
+    may use at most a quarter. Parsing runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        max_pages: int = 20,
+        max_bytes: int = 2_000_000,
+        max_page_bytes: int = 500_000,
+        per_host_concurrency: int = 4,
+        timeout: float = 10.0,
+        max_chars_per_page: int = 4000,
+        max_corpus_chars: int = 40_000,
+    ):
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.max_page_bytes = max_page_bytes
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.max_chars_per_page = max_chars_per_page
+        self.max_corpus_chars = max_corpus_chars
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+
+    def start(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+            )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    def _host_limit(self, host: str) -> asyncio.Semaphore:
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+        return self._host_limits[host]
+
+    async def crawl(self, start_url: str) -> List[Dict[str, str]]:
+        """Crawl ``start_url``'s site and return ``[{"url", "title", "description", "text"}]`` in crawl order."""
+        self.start()
+        started = time.monotonic()
+        host = urlsplit(canonical_url(start_url)).netloc
+        state = {"bytes": 0, "in_flight": 0}
+        robots = await self._robots(start_url, state)
+
+        frontier: List[Tuple[int, int, str]] = []
+        seen: Set[str] = set()
+        order = 0
+
+        def enqueue(url: str):
+            nonlocal order
+            url = urljoin(start_url, url.strip())
+            parts = urlsplit(url)
+            if parts.scheme not in ("http", "https") or parts.path.lower().endswith(SKIP_EXTENSIONS):
+                return
+            key = canonical_url(url)
+            if urlsplit(key).netloc != host or key in seen or not robots.can_fetch(USER_AGENT, url):
+                return
+            seen.add(key)
+            order += 1
+            frontier.append((_priority(url), order, url))
+
+        enqueue(start_url)
+        for url in await self._sitemap_urls(start_url, robots, state):
+            enqueue(url)
+
+        pages: List[Dict[str, str]] = []
+        progress = asyncio.Condition()
+
+        async def fetch(url: str):
+            try:
+                page = await self._fetch_page(url, state)
+                if page is None:
+                    return
+                extractor, final_url = page
+                if extractor.canonical:
+                    # Pages that declare a different canonical were reached under an alias
+                    seen.add(canonical_url(urljoin(final_url, extractor.canonical)))
+                text = extractor.text()
+                if text:
+                    pages.append({"url": final_url, "title": extractor.title.strip(), "description": extractor.description, "text": text})
+                for link in extractor.links:
+                    enqueue(urljoin(final_url, link))
+            except Exception as e:
+                logger.debug(f"Crawl of {url} failed: {e}")
+            finally:
+                async with progress:
+                    state["in_flight"] -= 1
+                    progress.notify_all()
+
+        tasks = []
+        launched = 0
+        while launched < self.max_pages and state["bytes"] < self.max_bytes:
+            if not frontier:
+                if state["in_flight"] == 0:
+                    break
+                async with progress:
+                    await progress.wait()
+                continue
+            if state["in_flight"] >= self.per_host_concurrency:
+                async with progress:
+                    await progress.wait()
+                continue
+            frontier.sort()
+            _, _, url = frontier.pop(0)
+            state["in_flight"] += 1
+            launched += 1
+            tasks.append(asyncio.create_task(fetch(url)))
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(f"🕷️ Crawled {len(pages)} page(s), {state['bytes']} bytes from {host} in {time.monotonic() - started:.1f}s")
+        return pages
+
+    async def _fetch_page(self, url: str, state: Dict[str, int]) -> Optional[Tuple[TextExtractor, str]]:
+        host = urlsplit(url).netloc.lower()
+        async with self._host_limit(host):
+            async with self._client.stream("GET", url) as response:
+                content_type = response.headers.get("content-type", "")
+                if response.status_code != 200 or "html" not in content_type:
+                    return None
+                body = await self._read_body(response, state, self.max_bytes)
+                text = body.decode(response.encoding or "utf-8", errors="replace")
+                return await asyncio.to_thread(self._parse_html, text), str(response.url)
+
+    async def _read_body(self, response: httpx.Response, state: Dict[str, int], budget: int) -> bytes:
+        """Up to ``max_page_bytes`` of the body, stopping once the crawl's byte count reaches ``budget``."""
+        chunks = []
+        size = 0
+        async for chunk in response.aiter_bytes():
+            chunk = chunk[:self.max_page_bytes - size]
+            chunks.append(chunk)
+            size += len(chunk)
+            state["bytes"] += len(chunk)
+            if size >= self.max_page_bytes or state["bytes"] >= budget:
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    def _parse_html(text: str) -> TextExtractor:
+        extractor = TextExtractor()
+        extractor.feed(text)
+        extractor.close()
+        return extractor
+
+    async def _robots(self, start_url: str, state: Dict[str, int]) -> RobotFileParser:
+        robots = RobotFileParser()
+        lines: List[str] = []
+        try:
+            async with self._client.stream("GET", urljoin(start_url, "/robots.txt")) as response:
+                if response.status_code == 200:
+                    body = await self._read_body(response, state, self.max_bytes)
+                    lines = body.decode("utf-8", errors="replace").splitlines()
+        except Exception:
+            pass
+        await asyncio.to_thread(robots.parse, lines)
+        return robots
+
+    @staticmethod
+    def _parse_sitemap(text: str) -> Tuple[bool, List[str]]:
+        """Whether this is a sitemap index, and its ``<loc>`` URLs."""
+        return "<sitemapindex" in text, re.findall(r"<loc>\s*([^<\s]+)\s*</loc>", text)
+
+    async def _sitemap_urls(self, start_url: str, robots: RobotFileParser, state: Dict[str, int], limit: int = 200) -> List[str]:
+        sitemaps = list(robots.site_maps() or []) or [urljoin(start_url, "/sitemap.xml")]
+        # Sitemaps seed the frontier; most of the byte budget is kept for the pages themselves
+        budget = self.max_bytes // 4
+        urls: List[str] = []
+        # One level of sitemap indexes is followed
+        for depth in range(2):
+            nested = []
+            for sitemap in sitemaps[:5]:
+                if state["bytes"] >= budget:
+                    break
+                try:
+                    async with self._client.stream("GET", sitemap) as response:
+                        if response.status_code != 200:
+                            continue
+                        body = await self._read_body(response, state, budget)
+                    # A truncated sitemap still yields every <loc> that arrived whole
+                    is_index, locs = await asyncio.to_thread(self._parse_sitemap, body.decode("utf-8", errors="replace"))
+                except Exception:
+                    continue
+                if is_index:
+                    nested.extend(locs)
+                else:
+                    urls.extend(locs)
+            if not nested or depth:
+                break
+            sitemaps = nested
+        # Sitemaps list every page; keep the ones worth reading first
+        return sorted(urls, key=_priority)[:limit]
+
+    def corpus(self, pages: List[Dict[str, str]]) -> str:
+        """Condense crawled pages into one text block for the research prompt."""
+        parts = []
+        total = 0
+        for page in pages:
+            header = f"### {page['title'] or page['url']}\nURL: {page['url']}"
+            if page.get("description"):
+                header += f"\nDescription: {page['description']}"
+            block = f"{header}\n{page['text'][:self.max_chars_per_page]}"
+            if total + len(block) > self.max_corpus_chars:
+                block = block[:self.max_corpus_chars - total]
+            parts.append(block)
+            total += len(block)
+            if total >= self.max_corpus_chars:
+                break
+        return "\n\n".join(parts)
+
+
+def site_crawler_from_env() -> SiteCrawler:
+    return SiteCrawler(
+        max_pages=int(os.getenv("CRAWL_MAX_PAGES", "20")),
+        max_bytes=int(os.getenv("CRAWL_MAX_BYTES", "2000000")),
+        per_host_concurrency=int(os.getenv("CRAWL_PER_HOST_CONCURRENCY", "4")),
+        timeout=float(os.getenv("CRAWL_TIMEOUT", "10")),
+        max_corpus_chars=int(os.getenv("CRAWL_MAX_CORPUS_CHARS", "40000")),
+    )
@@ -0,0 +1,204 @@
+import json
+from typing import Any, Dict, Optional
+
+from loguru import logger
+
+from openai_clients import openai_registry
+
+
+def _strings(fields, nullable: bool = False) -> Dict[str, Any]:
+    return {field: {"type": ["string", "null"] if nullable else "string"} for field in fields}
+
+
+AGENT_CONFIG_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": _strings(("name", "legalName", "brandName", "brandVision", "industry", "products", "valueProps", "targetCustomers", "tone")),
+    "required": ["name", "legalName", "brandName", "brandVision", "industry", "products", "valueProps", "targetCustomers", "tone"],
+    "additionalProperties": False,
+}
+
+QUALIFICATION_STATUSES = ["🔥 Hot", "🟠 Warm", "❄️ Cold"]
+
+LEAD_RECORD_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        **_strings(("name", "email", "phone"), nullable=True),
+        "qualification_status": {"type": "string", "enum": QUALIFICATION_STATUSES},
+        "qualification_reason": {"type": "string"},
+        **_strings(("pain_points",), nullable=True),
+        **_strings(("summary", "next_steps")),
+    },
+    "required": ["name", "email", "phone", "qualification_status", "qualification_reason", "pain_points", "summary", "next_steps"],
+    "additionalProperties": False,
+}
+
+# In-call updates may not know anything yet, so every field is nullable
+LEAD_UPDATE_SCHEMA: Dict[str, Any] = {
+    **LEAD_RECORD_SCHEMA,
+    "properties": {
+        **_strings(LEAD_RECORD_SCHEMA["required"], nullable=True),
+        "qualification_status": {"type": ["string", "null"], "enum": QUALIFICATION_STATUSES + [None]},
+    },
+}
+
+
+class StructuredOutputError(ValueError):
+    """Model output that is not a JSON object matching the expected schema."""
+
+    def __init__(self, message: str, text: str):
+        super().__init__(message)
+        self.text = text
+
+
+def chat_response_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Strict JSON-schema ``response_format`` for Chat Completions."""
+    return {"type": "json_schema", "json_schema": {"name": name, "schema": schema, "strict": True}}
+
+
+def responses_text_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Strict JSON-schema ``text`` option for the Responses API."""
+    return {"format": {"type": "json_schema", "name": name, "schema": schema, "strict": True}}
+
+
+_decoder = json.JSONDecoder()
+
+
+def extract_json_object(text: Optional[str]) -> Dict[str, Any]:
+    """Parse the first balanced JSON object in ``text``.
+
+    The decoder reads from the first ``{`` and stops at the end of the object,
+    so code fences, prose before or after it and braces inside strings need no
+    cleanup passes. Only when that fails does one scan (tracking string/escape
+    state and open brackets) recover an object that is missing its opening
+    brace, has trailing commas or was truncated.
+    """
+    if not text or not text.strip():
+        raise StructuredOutputError("Empty response from LLM", text or "")
+    start = text.find("{")
+    if start != -1:
+        try:
+            parsed, _ = _decoder.raw_decode(text, start)
+            if isinstance(parsed, dict):
+                return parsed
+        except json.JSONDecodeError:
+            pass
+    else:
+        # Opening brace dropped by the model: start at the first key
+        first_key = text.find('"')
+        if first_key == -1:
+            raise StructuredOutputError("No JSON object in response", text)
+        text, start = "{" + text[first_key:], 0
+
+    # Closers for the objects and arrays open so far
+    closers = []
+    out = []
+    in_string = escaped = False
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch in "}]":
+            # Drop a trailing comma before the closing bracket
+            end = len(out)
+            while end and out[end - 1].isspace():
+                end -= 1
+            if end and out[end - 1] == ",":
+                del out[end - 1]
+        out.append(ch)
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+        elif ch in "}]" and closers:
+            closers.pop()
+            if not closers:
+                candidate = "".join(out)
+                break
+    else:
+        # Truncated output: close what is open and let json decide
+        candidate = "".join(out).rstrip().rstrip(",") + ('"' if in_string else "") + "".join(reversed(closers))
+
+    try:
+        parsed = json.loads(candidate)
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"Invalid JSON: {e}", text) from e
+    if not isinstance(parsed, dict):
+        raise StructuredOutputError("Response is not a JSON object", text)
+    return parsed
+
+
+def check_schema(obj: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a flat object against one of the schemas above. Returns it with extra keys dropped."""
+    if not isinstance(obj, dict):
+        raise StructuredOutputError("Expected a JSON object", json.dumps(obj, ensure_ascii=False, default=str))
+    problems = []
+    for field in schema["required"]:
+        spec = schema["properties"][field]
+        types = spec["type"] if isinstance(spec["type"], list) else [spec["type"]]
+        value = obj.get(field)
+        if value is None:
+            if "null" not in types:
+                problems.append(f"{field} is missing")
+        elif not isinstance(value, str) or ("null" not in types and not value.strip()):
+            problems.append(f"{field} must be a non-empty string")
+        elif "enum" in spec and value not in spec["enum"]:
+            problems.append(f"{field} must be one of {spec['enum']}")
+    if problems:
+        raise StructuredOutputError("; ".join(problems), json.dumps(obj, ensure_ascii=False))
+    return {field: obj.get(field) for field in schema["properties"]}
+
+
+def parse_structured(text: Optional[str], schema: Dict[str, Any]) -> Dict[str, Any]:
+    return check_schema(extract_json_object(text), schema)
+
+
+REPAIR_PROMPT = """The JSON below was supposed to match the schema, but it failed with: {error}
+
+Fix only what is wrong and return the corrected JSON object. Keep every value that is already valid exactly as it is; do not research or invent new content beyond what is needed to fill a missing field.
+
+<schema>
+{schema}
+</schema>
+
+<output_to_fix>
+{text}
+</output_to_fix>"""
+
+
+async def parse_or_repair(
+    text: Optional[str],
+    schema: Dict[str, Any],
+    name: str,
+    purpose: str,
+    model: str = "gpt-4o-mini",
+) -> Dict[str, Any]:
+    """Parse ``text`` against ``schema``; if that fails, have a small model fix the output once.
+
+    The repair call sends only the broken output and the error, so it is much
+    cheaper than repeating the original request (which may include web search
+    or a whole transcript). Raises StructuredOutputError if the repair fails too.
+    """
+    try:
+        return parse_structured(text, schema)
+    except StructuredOutputError as e:
+        if not text or not text.strip():
+            raise
+        logger.warning(f"🩹 {name}: {e}; repairing")
+        error = str(e)
+
+    async with openai_registry.request(purpose) as client:
+        response = await client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": REPAIR_PROMPT.format(error=error, schema=json.dumps(schema, ensure_ascii=False), text=text[:20000])}],
+            response_format=chat_response_format(name, schema),
+            temperature=0,
+        )
+    repaired = parse_structured(response.choices[0].message.content, schema)
+    logger.info(f"🩹 {name}: repaired output")
+    return repaired
@@ -0,0 +1,12 @@
+import os
+import sys
+import tempfile
+
+# Backend modules are flat, top-level imports (run from backend/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Tests that import server open its stores and journals; keep them out of the working tree
+_state_dir = tempfile.mkdtemp(prefix="backend-tests-")
+for _var, _name in (("AGENT_STORE_PATH", "agents.db"), ("POST_CALL_JOURNAL_DIR", "post_call"),
+                    ("TRANSCRIPT_JOURNAL_DIR", "transcripts")):
+    os.environ.setdefault(_var, os.path.join(_state_dir, _name))
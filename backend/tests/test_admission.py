@@ -0,0 +1,37 @@
+import uuid
+import asyncio
+
+import pytest
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+
+def test_admitted_call_counts_as_live_before_the_handshake(monkeypatch):
+    import server
+
+    seen = {}
+    accept = WebSocket.accept
+
+    async def observed_accept(self, *args, **kwargs):
+        seen["at_accept"] = (server.admission.live_calls, len(server.admission._reserved))
+        await accept(self, *args, **kwargs)
+
+    async def run_voice_agent(websocket, *args, **kwargs):
+        seen["in_call"] = server.admission.live_calls
+        await websocket.close()
+
+    monkeypatch.setattr(WebSocket, "accept", observed_accept)
+    monkeypatch.setattr(server, "run_voice_agent", run_voice_agent)
+
+    session_id = str(uuid.uuid4())
+    asyncio.run(server.session_store.create(session_id, {"agent_config": {}}))
+    asyncio.run(server.admission.reserve(session_id))
+    assert (server.admission.live_calls, len(server.admission._reserved)) == (0, 1)
+
+    with pytest.raises(WebSocketDisconnect):
+        with TestClient(server.app).websocket_connect(f"/ws/{session_id}") as websocket:
+            websocket.receive_bytes()
+
+    # The reservation became a live call before accept() awaited, never neither
+    assert seen == {"at_accept": (1, 0), "in_call": 1}
+    assert server.admission.live_calls == 0
@@ -0,0 +1,52 @@
+from agent_store import AgentConfigStore
+from site_crawler import canonical_website
+
+
+def config(tagline: str):
+    return {"brandName": "Acme", "websiteUrl": "https://www.acme.com/", "tagline": tagline}
+
+
+def test_resaving_an_older_config_makes_it_latest(tmp_path):
+    store = AgentConfigStore(str(tmp_path / "agents.db"))
+    a1 = store.save(config("A"))
+    b = store.save(config("B"))
+    a2 = store.save(config("A"))
+    assert (a1["version"], b["version"], a2["version"]) == (1, 2, 3)
+    assert a1["agent_id"] == b["agent_id"] == a2["agent_id"]
+    assert a2["hash"] == a1["hash"]
+    assert store.get(a1["agent_id"])["config"]["tagline"] == "A"
+
+
+def test_saving_the_latest_config_again_adds_no_version(tmp_path):
+    store = AgentConfigStore(str(tmp_path / "agents.db"))
+    first = store.save(config("A"))
+    # Same content in a different key order
+    again = store.save(dict(reversed(list(config("A").items()))))
+    assert again["version"] == first["version"] == 1
+    assert [v["version"] for v in store.versions(first["agent_id"])] == [1]
+
+
+def test_website_variants_share_an_agent_and_the_research_key(tmp_path):
+    store = AgentConfigStore(str(tmp_path / "agents.db"))
+    first = store.save(config("A"))
+    other = store.save({**config("B"), "websiteUrl": "http://Acme.com/pricing"})
+    assert other["agent_id"] == first["agent_id"] and other["version"] == 2
+    # The key server.py uses for research and bulk research of the same URL
+    assert store.get(first["agent_id"])["website"] == canonical_website("https://www.acme.com/").lower() == "acme.com"
+
+
+def test_post_agents_validates_against_the_research_schema():
+    import server
+    from prompts import get_fallback_config
+    from starlette.testclient import TestClient
+
+    client = TestClient(server.app)
+    incomplete = {**get_fallback_config(), "tone": ""}
+    assert "tone must be a non-empty string" in client.post("/agents", json={"config": incomplete}).json()["error"]
+    assert "error" in client.post("/agents", json={"config": "not an object"}).json()
+
+    submitted = {**get_fallback_config(), "websiteUrl": "https://www.invoca.com/", "unknown": "dropped"}
+    agent = client.post("/agents", json={"config": submitted}).json()
+    stored = client.get(f"/agents/{agent['agent_id']}").json()
+    assert stored["website"] == "invoca.com"
+    assert stored["config"] == {**get_fallback_config(), "websiteUrl": "https://www.invoca.com/"}
@@ -0,0 +1,29 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from audio_codec import ulaw_decode, ulaw_encode
+
+
+ALL_SAMPLES = np.arange(-32768, 32768, dtype=np.int16)
+
+
+def test_ulaw_reference_codes_and_round_trip():
+    # Silence, full scale and the most negative sample, as in G.711
+    assert ulaw_encode(np.array([0, 32767, -32768], dtype=np.int16).tobytes()) == bytes([0xFF, 0x80, 0x00])
+    decoded = np.frombuffer(ulaw_decode(ulaw_encode(ALL_SAMPLES.tobytes())), dtype=np.int16)
+    # Step size doubles per segment; the top segment quantizes in steps of 1024
+    samples = ALL_SAMPLES.astype(np.int32)
+    error = np.abs(decoded - samples)
+    assert error.max() <= 1024
+    assert np.all(error[np.abs(samples) < 100] <= 8)
+
+
+def test_ulaw_matches_audioop():
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        audioop = pytest.importorskip("audioop")
+    pcm = ALL_SAMPLES.tobytes()
+    assert ulaw_encode(pcm) == audioop.lin2ulaw(pcm, 2)
+    assert ulaw_decode(bytes(range(256))) == audioop.ulaw2lin(bytes(range(256)), 2)
@@ -0,0 +1,66 @@
+import time
+import asyncio
+
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADState
+
+from batched_vad import BatchedVADEngine
+from loadtest import synthetic_utterance
+from vad_pool import VADPool
+
+
+def speech_then_silence(repeats: int = 2):
+    speech = synthetic_utterance()
+    return (speech + [bytes(len(speech[0]))] * 60) * repeats
+
+
+async def analyze(analyzer, audio):
+    loop = asyncio.get_running_loop()
+    analyzer.set_sample_rate(16000)
+    return [await loop.run_in_executor(None, analyzer.analyze_audio, frame) for frame in audio]
+
+
+def speaking_turns(states):
+    return sum(1 for previous, state in zip([VADState.QUIET] + states, states)
+               if state == VADState.SPEAKING and previous != VADState.SPEAKING)
+
+
+def test_batched_transitions_match_the_stock_analyzer():
+    async def run():
+        audio = speech_then_silence()
+        engine = BatchedVADEngine(slots=2, fallback=VADPool(size=0))
+        await engine.start()
+        try:
+            async with engine.checkout() as analyzer:
+                batched = await analyze(analyzer, audio)
+        finally:
+            await engine.aclose()
+        stock = await analyze(SileroVADAnalyzer(), audio)
+        assert speaking_turns(stock) == 2
+        assert batched == stock
+
+    asyncio.run(run())
+
+
+def test_calls_move_to_local_vad_when_the_worker_dies():
+    async def run():
+        audio = speech_then_silence()
+        engine = BatchedVADEngine(slots=2, fallback=VADPool(size=0))
+        await engine.start()
+        try:
+            async with engine.checkout() as analyzer:
+                before = await analyze(analyzer, audio[:10])
+                engine._process.kill()
+                await asyncio.to_thread(engine._process.join)
+                started = time.monotonic()
+                after = await analyze(analyzer, audio[10:])
+                elapsed = time.monotonic() - started
+            stats = engine.stats()
+        finally:
+            await engine.aclose()
+        # One liveness check, not a timeout per frame, and the turns are still heard
+        assert elapsed < engine.timeout
+        assert speaking_turns(before + after) == 2
+        assert (stats["switched_calls"], stats["timeouts"]) == (1, 0)
+
+    asyncio.run(run())
@@ -0,0 +1,125 @@
+import time
+import asyncio
+
+from bulk_research import BulkResearchScheduler
+
+
+FALLBACK = {"brandName": "Fallback"}
+
+
+def domain(url: str) -> str:
+    return url.split("://", 1)[-1].split("/", 1)[0].removeprefix("www.")
+
+
+class StubResearch:
+    """Stands in for the LLM research call, recording when each call starts and how many overlap."""
+
+    def __init__(self, delay: float = 0.0, failures: int = 0):
+        self.delay = delay
+        self.failures = failures
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, url: str):
+        self.started.append(time.monotonic())
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures:
+                self.failures -= 1
+                return dict(FALLBACK), False
+            return {"brandName": domain(url)}, False
+        finally:
+            self.in_flight -= 1
+
+
+def scheduler(research: StubResearch, **kwargs) -> BulkResearchScheduler:
+    return BulkResearchScheduler(research, domain, lambda: dict(FALLBACK), **kwargs)
+
+
+async def wait_done(*jobs, timeout: float = 10.0):
+    deadline = time.monotonic() + timeout
+    while not all(job.done for job in jobs):
+        assert time.monotonic() < deadline, "jobs did not finish"
+        await asyncio.sleep(0.01)
+
+
+def test_concurrent_jobs_share_one_request_budget():
+    # 10 requests/s with a 50-request burst, shared by both jobs
+    research = StubResearch()
+
+    async def run():
+        bulk = scheduler(research, max_concurrency=8, requests_per_minute=600, tokens_per_minute=10**9)
+        started = time.monotonic()
+        jobs = [bulk.submit([f"https://site{job}-{n}.example" for n in range(35)]) for job in range(2)]
+        await wait_done(*jobs)
+        await bulk.aclose()
+        return started, jobs
+
+    started, jobs = asyncio.run(run())
+    assert all(job.counts()["done"] == 35 for job in jobs)
+    offsets = sorted(at - started for at in research.started)
+    assert len(offsets) == 70
+    # Never ahead of burst + rate * elapsed, counted across both jobs
+    for n, offset in enumerate(offsets, 1):
+        assert n <= 50 + 10 * offset + 1
+    assert offsets[-1] >= 1.8
+
+
+def test_token_budget_limits_requests_across_jobs():
+    # 20k tokens/s at 5k per request: 4 requests/s after a 20-request burst
+    research = StubResearch()
+
+    async def run():
+        bulk = scheduler(research, max_concurrency=8, requests_per_minute=10**6,
+                         tokens_per_minute=20_000 * 60, tokens_per_request=5_000)
+        started = time.monotonic()
+        jobs = [bulk.submit([f"https://t{job}-{n}.example" for n in range(12)]) for job in range(2)]
+        await wait_done(*jobs)
+        await bulk.aclose()
+        return started
+
+    started = asyncio.run(run())
+    offsets = sorted(at - started for at in research.started)
+    for n, offset in enumerate(offsets, 1):
+        assert n <= 20 + 4 * offset + 1
+    assert offsets[-1] >= 0.9
+
+
+def test_workers_are_shared_and_duplicates_researched_once():
+    research = StubResearch(delay=0.05)
+
+    async def run():
+        bulk = scheduler(research, max_concurrency=3, requests_per_minute=10**6, tokens_per_minute=10**9)
+        first = bulk.submit([f"https://a{n}.example" for n in range(6)] + ["https://www.a0.example/pricing"])
+        second = bulk.submit([f"https://b{n}.example" for n in range(6)])
+        await wait_done(first, second)
+        await bulk.aclose()
+        return bulk, first
+
+    bulk, first = asyncio.run(run())
+    assert research.max_in_flight == 3
+    assert len(research.started) == 12
+    configs = bulk.results(first)["configs"]
+    assert configs["https://www.a0.example/pricing"]["brandName"] == "a0.example"
+
+
+def test_fallback_results_are_retried_then_kept():
+    async def run(failures: int):
+        research = StubResearch(failures=failures)
+        bulk = scheduler(research, max_concurrency=1, max_retries=3, backoff_base=0.05,
+                         requests_per_minute=10**6, tokens_per_minute=10**9)
+        job = bulk.submit(["https://retried.example"])
+        await wait_done(job)
+        await bulk.aclose()
+        return bulk, job.items["retried.example"]
+
+    bulk, item = asyncio.run(run(failures=3))
+    assert (item["status"], item["attempts"], item["config"]) == ("done", 4, {"brandName": "retried.example"})
+    assert bulk.stats()["retries"] == 3
+
+    bulk, item = asyncio.run(run(failures=10))
+    assert (item["status"], item["attempts"]) == ("failed", 4)
+    assert item["config"] == {**FALLBACK, "websiteUrl": "https://retried.example"}
@@ -0,0 +1,58 @@
+import asyncio
+from types import SimpleNamespace
+
+from knowledge_index import KnowledgeIndex, chunk_text, knowledge_index_for, lookup_company_info_handler
+from prompts import get_fallback_config
+
+
+def test_chunks_are_whole_sentences_of_bounded_length():
+    text = " ".join(f"Sentence {n} has exactly six words." for n in range(20))
+    chunks = chunk_text(text, max_words=20)
+    assert all(len(chunk.split()) <= 20 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_search_ranks_the_matching_chunk_first():
+    index = KnowledgeIndex([
+        ("Products", "The Pro plan includes call tracking and call recording."),
+        ("Products", "The Enterprise plan adds single sign-on and a sandbox."),
+        ("Customers", "Retailers and insurers use the platform to track calls."),
+    ])
+    assert [result["text"] for result in index.search("sso sandbox enterprise")][:1] == ["The Enterprise plan adds single sign-on and a sandbox."]
+    # A term in one chunk outweighs one in every chunk
+    results = index.search("recording plan")
+    assert results[0]["text"].startswith("The Pro plan")
+    assert [result["score"] for result in results] == sorted((result["score"] for result in results), reverse=True)
+    assert len(index.search("plan call", k=1)) == 1
+    # Stopwords and unknown words match nothing
+    assert index.search("what is the") == [] and index.search("zebra") == []
+
+
+def test_agent_config_index_answers_and_is_shared():
+    config = get_fallback_config()
+    index = knowledge_index_for(config)
+    assert knowledge_index_for(dict(config)) is index
+    assert knowledge_index_for({**config, "products": "Only one product."}) is not index
+    top = index.search("Which industries do you serve, like automotive or healthcare?")[0]
+    assert top["source"] == "Target customers"
+    assert "Enterprise Plan" in index.search("Do you support SAML single sign-on?")[0]["text"]
+
+
+def test_lookup_tool_returns_results_or_a_note():
+    handler = lookup_company_info_handler(knowledge_index_for(get_fallback_config()))
+
+    async def call(query):
+        results = []
+
+        async def result_callback(result):
+            results.append(result)
+
+        await handler(SimpleNamespace(arguments={"query": query}, result_callback=result_callback))
+        return results
+
+    found, = asyncio.run(call("sandbox demo environment"))
+    assert found["results"][0].startswith("Products and services: ")
+    assert "sandbox demo environment" in found["results"][0]
+    missing, = asyncio.run(call("zebra"))
+    assert missing["results"] == [] and "specialist" in missing["note"]
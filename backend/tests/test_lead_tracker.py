@@ -0,0 +1,42 @@
+import asyncio
+
+import lead_tracker
+from lead_tracker import LeadTracker
+from llm_context import build_call_context
+
+
+def test_overlapping_debounced_updates_run_one_at_a_time(monkeypatch):
+    calls = []
+    running = 0
+    max_running = 0
+
+    async def slow_update(lead, turns, agent_config=None, model=None):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        calls.append(list(turns))
+        await asyncio.sleep(0.1)
+        running -= 1
+        return {**lead, "summary": f"{len(calls)} update(s)"}
+
+    monkeypatch.setattr(lead_tracker, "update_lead", slow_update)
+
+    async def run():
+        context = build_call_context()
+        tracker = LeadTracker(context, debounce=0.01)
+        for n in range(4):
+            context.add_message({"role": "user", "content": f"question {n}"})
+            context.add_message({"role": "assistant", "content": f"answer {n}"})
+            tracker._schedule()
+            # Each debounce fires while the previous update is still running
+            await asyncio.sleep(0.03)
+        await asyncio.sleep(0.6)
+        return tracker
+
+    tracker = asyncio.run(run())
+    assert max_running == 1
+    # Every turn folded in exactly once, in order
+    folded = [turn for turns in calls for turn in turns]
+    assert folded == [f"{role}: {word} {n}" for n in range(4) for role, word in (("HUMAN", "question"), ("AGENT", "answer"))]
+    assert tracker.pending_turns() == []
+    assert tracker._update_task is None
@@ -0,0 +1,66 @@
+import sys
+import time
+import asyncio
+
+from loguru import logger
+
+import log_config
+from loop_monitor import LoopMonitor
+
+
+class SlowStream:
+    """A stderr that takes 2 ms per write, like a busy terminal or a full log shipper pipe."""
+
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, message):
+        time.sleep(0.002)
+        self.lines += 1
+
+    def flush(self):
+        pass
+
+
+async def calls_logging(calls: int = 10, seconds: float = 1.0) -> float:
+    """Loop lag p99 while ``calls`` tasks each log two records per 20 ms audio frame."""
+    monitor = LoopMonitor(interval=0.01, window=10_000)
+
+    async def call(n: int):
+        with logger.contextualize(session_id=f"call-{n}"):
+            for frame in range(int(seconds / 0.02)):
+                logger.info(f"frame {frame} from caller jane@example.com")
+                logger.debug(f"vad state for frame {frame}")
+                await asyncio.sleep(0.02)
+
+    monitor.start()
+    await asyncio.gather(*(call(n) for n in range(calls)))
+    monitor.stop()
+    await logger.complete()
+    return monitor.lag_percentile(0.99)
+
+
+def test_queued_sink_keeps_logging_off_the_event_loop(monkeypatch):
+    stream = SlowStream()
+    try:
+        # Before: loguru's default, a synchronous DEBUG sink on stderr
+        logger.remove()
+        logger.configure(extra={"session_id": "-"})
+        logger.add(stream, level="DEBUG")
+        blocking_lag = asyncio.run(calls_logging())
+        blocking_lines = stream.lines
+
+        # After: configure_logging's queue-backed sink at INFO
+        stream.lines = 0
+        monkeypatch.setattr(sys, "stderr", stream)
+        monkeypatch.setattr(log_config, "_configured", False)
+        log_config.configure_logging()
+        queued_lag = asyncio.run(calls_logging())
+    finally:
+        logger.remove()
+        logger.add(sys.__stderr__)
+
+    assert blocking_lines == 1000
+    assert stream.lines == 500
+    assert queued_lag < blocking_lag / 3
+    assert queued_lag < 0.015
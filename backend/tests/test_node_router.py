@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+
+import pytest
+from aiohttp import web
+from starlette.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from node_router import Node, NodeRouter
+
+
+SESSIONS = [str(uuid.UUID(int=n)) for n in range(3000)]
+
+
+class StatusServer:
+    """Serves a router's /node-status on a local port, as a peer node would."""
+
+    def __init__(self, router: NodeRouter):
+        self.router = router
+        self._runner = None
+        self.url = None
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.router.status())
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/node-status", self._status)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/node-status"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+def cluster(node_ids, capacity=50):
+    """One router per node, each with its own view of the same node list."""
+    return {
+        self_id: NodeRouter(self_id, [Node(node_id, f"wss://{node_id}.example", capacity=capacity) for node_id in node_ids])
+        for self_id in node_ids
+    }
+
+
+def shares(router: NodeRouter):
+    counts = {node_id: 0 for node_id in router.nodes}
+    for session_id in SESSIONS:
+        counts[router.pick(session_id).node_id] += 1
+    return {node_id: count / len(SESSIONS) for node_id, count in counts.items()}
+
+
+def test_every_node_routes_a_session_to_the_same_node():
+    routers = cluster(["a", "b", "c"])
+    for session_id in SESSIONS[:500]:
+        picks = {router.pick(session_id).node_id for router in routers.values()}
+        assert len(picks) == 1
+    for share in shares(routers["a"]).values():
+        assert share == pytest.approx(1 / 3, abs=0.05)
+
+
+def test_adding_a_node_only_moves_its_share_of_sessions():
+    before = cluster(["a", "b", "c"])["a"]
+    after = cluster(["a", "b", "c", "d"])["a"]
+    moved = [session_id for session_id in SESSIONS if before.pick(session_id).node_id != after.pick(session_id).node_id]
+    assert all(after.pick(session_id).node_id == "d" for session_id in moved)
+    assert len(moved) / len(SESSIONS) == pytest.approx(1 / 4, abs=0.05)
+
+
+def test_busy_node_gets_a_smaller_share():
+    router = cluster(["a", "b"])["a"]
+    router.nodes["b"].live_calls = 40
+    # Spare capacity 50 vs 10
+    assert shares(router)["b"] == pytest.approx(10 / 60, abs=0.05)
+    router.nodes["b"].live_calls = 50
+    assert shares(router)["b"] < 0.01
+
+
+def test_peer_polling_shares_load_and_routes_around_a_dead_node():
+    async def run():
+        routers = cluster(["a", "b", "c"])
+        async with StatusServer(routers["b"]) as b, StatusServer(routers["c"]) as c:
+            router = routers["a"]
+            router.nodes["b"].status_url = b.url
+            router.nodes["c"].status_url = c.url
+            router.poll_interval = 0.05
+            with routers["b"].track_call(), routers["b"].track_call():
+                poller = asyncio.create_task(router.poll_peers())
+                await asyncio.sleep(0.2)
+                assert router.nodes["b"].live_calls == 2
+                assert router.nodes["b"].healthy and router.nodes["c"].healthy
+            await asyncio.sleep(0.2)
+            assert router.nodes["b"].live_calls == 0
+        # Both peers are gone; everything lands on the local node
+        await asyncio.sleep(0.2)
+        poller.cancel()
+        assert not router.nodes["b"].healthy and not router.nodes["c"].healthy
+        assert {router.pick(session_id).node_id for session_id in SESSIONS[:200]} == {"a"}
+
+    asyncio.run(run())
+
+
+def test_websocket_for_another_node_is_refused():
+    import server
+
+    session_id = str(uuid.uuid4())
+    asyncio.run(server.session_store.create(session_id, {"agent_config": {}, "node_id": "elsewhere"}))
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with TestClient(server.app).websocket_connect(f"/ws/{session_id}"):
+            pass
+    assert closed.value.code == 1008
+    assert "elsewhere" in closed.value.reason
@@ -0,0 +1,97 @@
+import asyncio
+
+from aiohttp import web
+
+from openai_clients import OpenAIClientRegistry
+
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+}
+
+
+class StubOpenAI:
+    """Local chat-completions endpoint that records which TCP connection served each request."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.connections = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._runner = None
+        self.base_url = None
+
+    async def _completions(self, request: web.Request) -> web.Response:
+        self.connections.append(request.transport.get_extra_info("peername"))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            return web.json_response(COMPLETION)
+        finally:
+            self.in_flight -= 1
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+async def complete(registry: OpenAIClientRegistry):
+    async with registry.request("lead_analysis") as client:
+        response = await client.chat.completions.create(model="gpt-4o", messages=[{"role": "user", "content": "hi"}])
+    return response.choices[0].message.content
+
+
+def test_sequential_requests_reuse_one_connection(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    async def run():
+        async with StubOpenAI() as stub:
+            registry = OpenAIClientRegistry(base_url=stub.base_url)
+            registry.start()
+            try:
+                results = [await complete(registry) for _ in range(20)]
+            finally:
+                await registry.aclose()
+            return results, stub.connections
+
+    results, connections = asyncio.run(run())
+    assert results == ["ok"] * 20
+    assert len(connections) == 20
+    assert len(set(connections)) == 1
+
+
+def test_burst_is_bounded_and_connections_are_reused(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    async def run():
+        async with StubOpenAI(delay=0.05) as stub:
+            registry = OpenAIClientRegistry(base_url=stub.base_url, max_connections=8, max_keepalive_connections=8, max_concurrency=4)
+            registry.start()
+            try:
+                # Three waves of calls ending at once
+                for _ in range(3):
+                    await asyncio.gather(*(complete(registry) for _ in range(25)))
+            finally:
+                await registry.aclose()
+            return stub
+
+    stub = asyncio.run(run())
+    assert len(stub.connections) == 75
+    assert stub.max_in_flight <= 4
+    # The semaphore caps concurrency, so the pool never needs more sockets than that
+    assert len(set(stub.connections)) <= 4
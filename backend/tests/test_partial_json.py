@@ -0,0 +1,29 @@
+import pytest
+
+from partial_json import IncrementalObjectParser
+
+
+def parse(chunks):
+    parser = IncrementalObjectParser()
+    return [parser.feed(chunk) for chunk in chunks]
+
+
+@pytest.mark.parametrize("chunks, expected", [
+    (['{"name": "Gaia", "tone": "warm"}'], [("name", "Gaia"), ("tone", "warm")]),
+    (['```json\n{"na', 'me": "Ac', 'me", "tone"', ': "warm"}\n```'], [("name", "Acme"), ("tone", "warm")]),
+    (["Sure! Here it is: ", '{"name": "Gaia"}', " Anything else?"], [("name", "Gaia")]),
+    (['{"quote": "say \\', '"hi\\"", "b": 1}'], [("quote", 'say "hi"'), ("b", 1)]),
+    (['{"a": "x, y}", "b": "[z]"}'], [("a", "x, y}"), ("b", "[z]")]),
+    (['{"a": {"b": [1, ', '2], "c": {"d": "}"}}, "e": "f"}'], [("a", {"b": [1, 2], "c": {"d": "}"}}), ("e", "f")]),
+    (['{"a": 1,}'], [("a", 1)]),
+    (['{"a": 1, "b": "unfinish'], [("a", 1)]),
+    (['{"a": 1} {"b": 2}'], [("a", 1)]),
+    (['{"a": 1, "b": oops, "c": 3}'], [("a", 1), ("c", 3)]),
+])
+def test_fields_are_parsed_across_chunks(chunks, expected):
+    assert [pair for completed in parse(chunks) for pair in completed] == expected
+
+
+def test_each_field_is_yielded_by_the_chunk_that_completes_it():
+    chunks = ['{"name": "Ga', 'ia", "br', 'andName": "Invoca"', ', "tone": {"x": 1', '}}']
+    assert parse(chunks) == [[], [("name", "Gaia")], [], [("brandName", "Invoca")], [("tone", {"x": 1})]]
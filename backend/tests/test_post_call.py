@@ -0,0 +1,126 @@
+import os
+import asyncio
+
+from post_call import PostCallQueue
+
+
+def journaled(queue: PostCallQueue):
+    return sorted(name for name in os.listdir(queue.journal_dir) if name.endswith(".json"))
+
+
+def test_job_stays_journaled_until_acknowledged(tmp_path):
+    async def run():
+        acks = []
+
+        async def handler(job, final_attempt):
+            acks.append(asyncio.get_running_loop().create_future())
+            return acks[-1]
+
+        queue = PostCallQueue(handler, journal_dir=str(tmp_path), workers=1)
+        await queue.start()
+        await queue.enqueue({"session_id": "a"})
+        await queue.enqueue({"session_id": "b"})
+        await asyncio.sleep(0.05)
+        # One worker, yet both handlers ran: waiting for an ack does not hold the worker
+        assert len(acks) == 2
+        assert len(journaled(queue)) == 2
+        assert queue.stats()["awaiting_ack"] == 2
+
+        acks[0].set_result(None)
+        await asyncio.sleep(0.05)
+        assert len(journaled(queue)) == 1
+        acks[1].set_result(None)
+        await queue.aclose()
+        return queue
+
+    queue = asyncio.run(run())
+    assert journaled(queue) == []
+    assert queue.completed == 2
+
+
+def test_failed_ack_retries_then_keeps_job_for_review(tmp_path):
+    async def run():
+        attempts = []
+
+        async def handler(job, final_attempt):
+            attempts.append(final_attempt)
+            ack = asyncio.get_running_loop().create_future()
+            ack.set_exception(RuntimeError("Sheets quota exhausted"))
+            return ack
+
+        queue = PostCallQueue(handler, journal_dir=str(tmp_path), workers=1, max_retries=2, backoff_base=0.001)
+        await queue.start()
+        await queue.enqueue({"session_id": "a"})
+        for _ in range(100):
+            if queue.failed:
+                break
+            await asyncio.sleep(0.01)
+        await queue.aclose()
+        return queue, attempts
+
+    queue, attempts = asyncio.run(run())
+    assert attempts == [False, False, True]
+    assert queue.retries == 2 and queue.failed == 1 and queue.completed == 0
+    assert journaled(queue) == []
+    assert len(os.listdir(queue.failed_dir)) == 1
+
+
+def test_unacknowledged_job_resumes_after_restart(tmp_path):
+    async def run():
+        async def never_written(job, final_attempt):
+            return asyncio.get_running_loop().create_future()
+
+        queue = PostCallQueue(never_written, journal_dir=str(tmp_path))
+        await queue.start()
+        await queue.enqueue({"session_id": "a"})
+        await asyncio.sleep(0.05)
+        await queue.aclose(timeout=0.1)
+
+        handled = []
+
+        async def handler(job, final_attempt):
+            handled.append(job["session_id"])
+
+        restarted = PostCallQueue(handler, journal_dir=str(tmp_path))
+        await restarted.start()
+        await restarted.aclose()
+        return restarted, handled
+
+    restarted, handled = asyncio.run(run())
+    assert restarted.recovered == 1
+    assert handled == ["a"]
+    assert journaled(restarted) == []
+
+
+def test_job_requeued_after_a_crash_runs_once(tmp_path):
+    async def run():
+        async def never_written(job, final_attempt):
+            return asyncio.get_running_loop().create_future()
+
+        # The call's own job was journaled, then the process died before the call was marked ended
+        queue = PostCallQueue(never_written, journal_dir=str(tmp_path))
+        await queue.start()
+        await queue.enqueue({"job_id": "a", "session_id": "a", "lead": "live"})
+        await asyncio.sleep(0.05)
+        await queue.aclose(timeout=0.1)
+
+        handled = []
+
+        async def handler(job, final_attempt):
+            handled.append(job["lead"])
+
+        restarted = PostCallQueue(handler, journal_dir=str(tmp_path))
+        await restarted.start()
+        # Transcript recovery hands over the same call again
+        await restarted.enqueue({"job_id": "a", "session_id": "a", "lead": "recovered"})
+        await restarted.aclose()
+        # Once done, the id can be used again
+        await restarted.start()
+        await restarted.enqueue({"job_id": "a", "session_id": "a", "lead": "later"})
+        await restarted.aclose()
+        return restarted, handled
+
+    restarted, handled = asyncio.run(run())
+    assert handled == ["live", "later"]
+    assert restarted.duplicates == 1
+    assert journaled(restarted) == []
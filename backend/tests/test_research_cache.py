@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from research_cache import ResearchCache
+
+
+class SlowResearch:
+    """Stands in for the upstream research call, counting how often it runs."""
+
+    def __init__(self, delay: float = 0.1):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"brandName": "Acme", "call": self.calls}
+
+
+def test_concurrent_lookups_share_one_upstream_call(tmp_path):
+    research = SlowResearch()
+    cache = ResearchCache(disk_dir=str(tmp_path))
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_compute("acme.com", research) for _ in range(10)))
+        return results, await cache.get_or_compute("acme.com", research)
+
+    results, later = asyncio.run(run())
+    assert research.calls == 1
+    assert cache.stats()["coalesced"] == 9 and cache.misses == 1
+    assert all(result == ({"brandName": "Acme", "call": 1}, False) for result in results)
+    # Every caller got its own copy
+    assert len({id(value) for value, _ in results}) == 10
+    assert later == ({"brandName": "Acme", "call": 1}, True)
+    # The entry was mirrored to disk and serves a fresh process
+    assert asyncio.run(ResearchCache(disk_dir=str(tmp_path)).get_or_compute("acme.com", research))[1] is True
+
+
+def test_cancelling_the_first_caller_does_not_cancel_the_others():
+    research = SlowResearch()
+    cache = ResearchCache()
+
+    async def run():
+        leader = asyncio.create_task(cache.get_or_compute("acme.com", research))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_compute("acme.com", research)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        # e.g. the client that started the research disconnected
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*waiters), await cache.get_or_compute("acme.com", research)
+
+    results, cached = asyncio.run(run())
+    assert research.calls == 1
+    assert all(value == {"brandName": "Acme", "call": 1} for value, _ in results)
+    # The research finished and was cached even though its first caller left
+    assert cached[1] is True
+
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    cache = ResearchCache()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        results = await asyncio.gather(*(cache.get_or_compute("acme.com", failing) for _ in range(3)), return_exceptions=True)
+        return results, cache.stats()["inflight"]
+
+    results, inflight = asyncio.run(run())
+    assert len(calls) == 1 and inflight == 0
+    assert all(isinstance(result, RuntimeError) for result in results)
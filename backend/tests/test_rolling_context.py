@@ -0,0 +1,125 @@
+import json
+import asyncio
+
+from aiohttp import web
+
+from pipecat.frames.frames import EndFrame
+from pipecat.pipeline.pipeline import Pipeline
+from pipecat.pipeline.runner import PipelineRunner
+from pipecat.pipeline.task import PipelineTask
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContextFrame
+
+import openai_clients
+from llm_context import PromptCacheLLMService, build_call_context
+from rolling_context import RollingContext, estimate_tokens
+
+
+def sse(delta, finish_reason=None) -> bytes:
+    chunk = {
+        "id": "chatcmpl-test", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4o",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+class StubChat:
+    """Streams a lookup_company_info tool call for the first completion and text after it.
+
+    Records the messages of every streamed request; answers the background
+    summary request with a fixed summary.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self._runner = None
+        self.base_url = None
+
+    async def _completions(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        if not body.get("stream"):
+            return web.json_response({
+                "id": "chatcmpl-summary", "object": "chat.completion", "created": 0, "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "Jane from Acme asked about pricing."}}],
+            })
+        self.requests.append(body["messages"])
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        if len(self.requests) == 1:
+            await response.write(sse({"role": "assistant", "tool_calls": [{
+                "index": 0, "id": "call_1", "type": "function",
+                "function": {"name": "lookup_company_info", "arguments": '{"query": "pricing"}'},
+            }]}))
+            await response.write(sse({}, "tool_calls"))
+        else:
+            await response.write(sse({"role": "assistant", "content": "Plans start at fifty dollars."}))
+            await response.write(sse({}, "stop"))
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self._completions)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/v1"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+def long_call_context():
+    context = build_call_context()
+    for n in range(20):
+        context.add_message({"role": "user", "content": f"Question {n}: " + "tell me more about that " * 20})
+        context.add_message({"role": "assistant", "content": f"Answer {n}: " + "here is some detail " * 20})
+    context.add_message({"role": "user", "content": "How much does it cost?"})
+    return context
+
+
+def test_budget_applies_to_the_request_after_a_tool_call(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+
+    async def run():
+        async with StubChat() as stub:
+            monkeypatch.setattr(openai_clients.openai_registry, "base_url", stub.base_url)
+            head_tokens = estimate_tokens(build_call_context().get_messages())
+            rolling = RollingContext(max_tokens=head_tokens + 600, summarize_at=head_tokens + 400, keep_turns=2)
+            llm = PromptCacheLLMService(api_key="test", base_url=stub.base_url, model="gpt-4o", rolling_context=rolling)
+
+            async def lookup(params):
+                await params.result_callback({"results": ["Pricing: plans start at $50 per month"]})
+
+            llm.register_function("lookup_company_info", lookup)
+            context = long_call_context()
+            aggregator = llm.create_context_aggregator(context)
+            task = PipelineTask(Pipeline([llm, aggregator.assistant()]))
+            runner = asyncio.create_task(PipelineRunner(handle_sigint=False).run(task))
+
+            await task.queue_frame(OpenAILLMContextFrame(context))
+            for _ in range(100):
+                if len(stub.requests) >= 2 and context.get_messages()[-1]["role"] == "assistant":
+                    break
+                await asyncio.sleep(0.05)
+            await task.queue_frame(EndFrame())
+            await runner
+            await openai_clients.openai_registry.aclose()
+            return stub.requests, context.get_messages(), rolling.max_tokens
+
+    requests, full, max_tokens = asyncio.run(run())
+    # The first request came downstream; the second came back upstream from the assistant aggregator
+    assert len(requests) == 2
+    for messages in requests:
+        assert estimate_tokens(messages) <= max_tokens
+        assert len(messages) < len(full)
+    # The tool call and its result went out together, after the latest question
+    follow_up = requests[1]
+    roles = [message["role"] for message in follow_up]
+    assert roles[-3:] == ["user", "assistant", "tool"]
+    assert follow_up[-2]["tool_calls"][0]["id"] == follow_up[-1]["tool_call_id"] == "call_1"
+    # The call context itself keeps every message
+    assert full[-1] == {"role": "assistant", "content": "Plans start at fifty dollars."}
+    assert sum(1 for message in full if message["role"] == "user") == 21
@@ -0,0 +1,103 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import session_store
+from session_store import MemorySessionStore, SQLiteSessionStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, "time", SimpleNamespace(time=clock.time))
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    def make(**kwargs):
+        if request.param == "memory":
+            return MemorySessionStore(**kwargs)
+        return SQLiteSessionStore(str(tmp_path / "sessions.db"), threads=1, **kwargs)
+    return make
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_expire_after_their_ttl(make_store, clock):
+    store = make_store(ttl_seconds=100, idle_seconds=1000)
+    run(store.create("a", {"n": 1}))
+    clock.now += 50
+    assert run(store.get("a")) == {"n": 1}
+    clock.now += 51
+    assert run(store.get("a")) is None
+    assert (store.expired, len(store)) == (1, 0)
+
+
+def test_sessions_expire_when_idle_and_reads_keep_them_alive(make_store, clock):
+    store = make_store(ttl_seconds=1000, idle_seconds=10)
+    run(store.create("a", {}))
+    run(store.create("b", {}))
+    for _ in range(3):
+        clock.now += 6
+        assert run(store.get("a")) == {}
+    assert run(store.get("b")) is None
+    clock.now += 11
+    assert store.sweep() == 1
+    assert len(store) == 0
+
+
+def test_least_recently_used_session_is_evicted(make_store, clock):
+    store = make_store(idle_seconds=100, max_entries=3)
+    for session_id in ("a", "b", "c"):
+        run(store.create(session_id, {}))
+        clock.now += 20
+    run(store.get("a"))
+    run(store.create("d", {}))
+    assert [run(store.get(session_id)) is not None for session_id in "abcd"] == [True, False, True, True]
+    assert (store.evicted, len(store)) == (1, 3)
+    # Recreating a stored session replaces it without counting as a new one
+    run(store.create("d", {"again": True}))
+    assert (store.evicted, len(store)) == (1, 3)
+
+
+def test_update_merges_fields_and_reports_missing_sessions(make_store, clock):
+    store = make_store()
+    assert run(store.update("missing", x=1)) is False
+    assert run(store.get("missing")) is None
+    run(store.create("a", {"agent_config": {"brandName": "Acme"}, "lead_data": None}))
+    assert run(store.update("a", lead_data={"name": "Jane"})) is True
+    session = run(store.get("a"))
+    assert session == {"agent_config": {"brandName": "Acme"}, "lead_data": {"name": "Jane"}}
+    # A snapshot: changing it does not change the store
+    session["agent_config"]["brandName"] = "Changed"
+    session["lead_data"] = None
+    assert run(store.get("a")) == {"agent_config": {"brandName": "Acme"}, "lead_data": {"name": "Jane"}}
+
+
+def test_sqlite_reads_refresh_last_access_only_when_stale(tmp_path, clock):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path, threads=1, idle_seconds=100)
+    run(store.create("a", {}))
+
+    def last_access():
+        return sqlite3.connect(path).execute("SELECT last_access FROM sessions WHERE id = 'a'").fetchone()[0]
+
+    clock.now += 5
+    run(store.get("a"))
+    assert last_access() == 1000.0
+    clock.now += 10
+    run(store.get("a"))
+    assert last_access() == 1015.0
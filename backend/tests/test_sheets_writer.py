@@ -0,0 +1,185 @@
+import asyncio
+
+from gspread.exceptions import APIError, WorksheetNotFound
+
+from sheets_writer import SHEET_HEADERS, SheetsLeadWriter
+
+
+class FakeResponse:
+    def __init__(self, code: int):
+        self.code = code
+        self.text = f"error {code}"
+
+    def json(self):
+        return {"error": {"code": self.code, "message": self.text, "status": "ERROR"}}
+
+
+class FakeWorksheet:
+    def __init__(self, book: "FakeSpreadsheet", title: str):
+        self.book = book
+        self.title = title
+        self.rows = []
+
+    async def append_rows(self, rows):
+        self.book.calls.append(("append_rows", self.title, len(rows)))
+        if self.book.failures:
+            raise APIError(FakeResponse(self.book.failures.pop(0)))
+        self.rows.extend(rows)
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.worksheets = {}
+        self.calls = []
+        # Error codes the next append_rows calls raise, in order
+        self.failures = []
+
+    async def worksheet(self, title):
+        self.calls.append(("worksheet", title))
+        if title not in self.worksheets:
+            raise WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    async def add_worksheet(self, title, rows, cols):
+        self.calls.append(("add_worksheet", title))
+        self.worksheets[title] = FakeWorksheet(self, title)
+        return self.worksheets[title]
+
+
+class FakeClientManager:
+    """In-memory stand-in for gspread_asyncio.AsyncioGspreadClientManager."""
+
+    def __init__(self, spreadsheet: FakeSpreadsheet):
+        self.spreadsheet = spreadsheet
+        self.authorizations = 0
+
+    async def authorize(self):
+        self.authorizations += 1
+        return self
+
+    async def open_by_key(self, key):
+        self.spreadsheet.calls.append(("open_by_key", key))
+        return self.spreadsheet
+
+
+def lead(n: int, website: str):
+    return {
+        "session_id": f"lead_{n}", "start_time": "2026-01-01T00:00:00", "end_time": "2026-01-01T00:01:00",
+        "duration": "1:00", "website_url": website, "lead_name": f"Lead {n}", "phone": None, "email": None,
+        "qualification_status": "warm", "qualification_reason": "", "summary": "", "pain_points": "",
+        "next_steps": "", "conversation_log": "",
+    }
+
+
+def make_writer(spreadsheet: FakeSpreadsheet, managers: list, **kwargs) -> SheetsLeadWriter:
+    def factory():
+        managers.append(FakeClientManager(spreadsheet))
+        return managers[-1]
+
+    kwargs = {"batch_size": 20, "flush_interval": 0.05, "backoff_base": 0.001, **kwargs}
+    return SheetsLeadWriter(factory, sheet_id="sheet", sheet_name_for=lambda url: url, **kwargs)
+
+
+def test_batches_per_worksheet_and_caches_handles():
+    spreadsheet, managers = FakeSpreadsheet(), []
+
+    async def run():
+        writer = make_writer(spreadsheet, managers)
+        writer.start()
+        for n in range(10):
+            writer.enqueue(lead(n, "a.com" if n % 2 else "b.com"))
+        await asyncio.sleep(0.2)
+        # A second batch reuses the authorized client and worksheet handles
+        for n in range(10, 14):
+            writer.enqueue(lead(n, "a.com"))
+        await writer.aclose()
+        return writer
+
+    writer = asyncio.run(run())
+    appends = [call for call in spreadsheet.calls if call[0] == "append_rows"]
+    assert appends == [("append_rows", "b.com", 6), ("append_rows", "a.com", 6), ("append_rows", "a.com", 4)]
+    assert len(managers) == 1 and managers[0].authorizations == 1
+    assert [call[0] for call in spreadsheet.calls].count("open_by_key") == 1
+    assert spreadsheet.worksheets["a.com"].rows[0] == SHEET_HEADERS
+    assert len(spreadsheet.worksheets["a.com"].rows) == 1 + 9
+    stats = writer.stats()
+    assert stats["leads_written"] == 14
+    # authorize + open_by_key + 2 x (worksheet + add_worksheet) + 3 x append_rows
+    assert stats["api_calls"] == 9
+    assert stats["api_calls_per_lead"] == round(9 / 14, 3)
+
+
+def test_retries_quota_and_server_errors_with_backoff():
+    spreadsheet, managers = FakeSpreadsheet(), []
+    spreadsheet.worksheets["a.com"] = FakeWorksheet(spreadsheet, "a.com")
+    spreadsheet.failures = [429, 503]
+
+    async def run():
+        writer = make_writer(spreadsheet, managers)
+        writer.start()
+        for n in range(3):
+            writer.enqueue(lead(n, "a.com"))
+        await writer.aclose()
+        return writer
+
+    writer = asyncio.run(run())
+    assert len(spreadsheet.worksheets["a.com"].rows) == 3
+    assert writer.retries == 2
+    assert writer.leads_written == 3 and writer.leads_failed == 0
+
+
+def test_does_not_retry_client_errors():
+    spreadsheet, managers = FakeSpreadsheet(), []
+    spreadsheet.worksheets["a.com"] = FakeWorksheet(spreadsheet, "a.com")
+    spreadsheet.failures = [400]
+
+    async def run():
+        writer = make_writer(spreadsheet, managers)
+        writer.start()
+        writer.enqueue(lead(0, "a.com"))
+        await writer.aclose()
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.retries == 0
+    assert writer.leads_failed == 1
+    assert spreadsheet.worksheets["a.com"].rows == []
+    # The handle is dropped in case the worksheet was deleted under us
+    assert writer.stats()["cached_worksheets"] == 0
+
+
+def test_gives_up_after_max_retries():
+    spreadsheet, managers = FakeSpreadsheet(), []
+    spreadsheet.worksheets["a.com"] = FakeWorksheet(spreadsheet, "a.com")
+    spreadsheet.failures = [429] * 10
+
+    async def run():
+        writer = make_writer(spreadsheet, managers, max_retries=3)
+        writer.start()
+        writer.enqueue(lead(0, "a.com"))
+        await writer.aclose()
+        return writer
+
+    writer = asyncio.run(run())
+    assert writer.retries == 3
+    assert writer.leads_failed == 1
+
+
+def test_enqueue_resolves_once_written_or_failed():
+    spreadsheet, managers = FakeSpreadsheet(), []
+    spreadsheet.worksheets["a.com"] = FakeWorksheet(spreadsheet, "a.com")
+    spreadsheet.failures = [400]
+
+    async def run():
+        writer = make_writer(spreadsheet, managers)
+        writer.start()
+        failed = writer.enqueue(lead(0, "a.com"))
+        await asyncio.sleep(0.2)
+        written = writer.enqueue(lead(1, "a.com"))
+        assert not written.done()
+        await writer.aclose()
+        return failed, written
+
+    failed, written = asyncio.run(run())
+    assert isinstance(failed.exception(), APIError)
+    assert written.result() is None
@@ -0,0 +1,103 @@
+import asyncio
+
+from aiohttp import web
+
+from site_crawler import SiteCrawler
+
+
+def page(title: str, *links: str, body: str = "") -> str:
+    anchors = "".join(f'<a href="{link}">{link}</a>' for link in links)
+    text = body or f"{title} is a page with enough words in it to count as content."
+    return f"<html><head><title>{title}</title></head><body><p>{text}</p>{anchors}</body></html>"
+
+
+class StaticSite:
+    """Serves a fixed set of paths on a local port and records which ones were requested."""
+
+    def __init__(self, routes):
+        # path -> (content type, body); "{base}" and "{other}" are filled in once the ports are known
+        self.routes = routes
+        self.requested = []
+        self._runner = None
+        self.base_url = None
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.requested.append(request.path)
+        if request.path not in self.routes:
+            return web.Response(status=404)
+        content_type, body = self.routes[request.path]
+        body = body.replace("{base}", self.base_url).replace("{other}", self.other_url)
+        return web.Response(body=body.encode(), content_type=content_type, charset="utf-8")
+
+    async def __aenter__(self):
+        app = web.Application()
+        app.router.add_get("/{tail:.*}", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        # Same server under another host name: a different site as far as the crawler is concerned
+        self.other_url = f"http://localhost:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._runner.cleanup()
+
+
+SITE = {
+    "/robots.txt": ("text/plain", "User-agent: *\nDisallow: /private\nSitemap: {base}/sitemap.xml\n"),
+    "/sitemap.xml": ("application/xml",
+                     "<urlset><url><loc>{base}/pricing</loc></url><url><loc>{base}/private/plans</loc></url>"
+                     "<url><loc>{other}/elsewhere</loc></url></urlset>"),
+    "/": ("text/html", page("Home", "/about", "/private/team", "{other}/partner", "/about?utm_source=x#top")),
+    "/about": ("text/html", page("About", "/")),
+    "/pricing": ("text/html", page("Pricing")),
+    "/private/team": ("text/html", page("Team")),
+    "/private/plans": ("text/html", page("Plans")),
+    "/elsewhere": ("text/html", page("Elsewhere")),
+    "/partner": ("text/html", page("Partner")),
+}
+
+
+def crawl(routes, **kwargs):
+    async def run():
+        async with StaticSite(routes) as site:
+            crawler = SiteCrawler(**kwargs)
+            try:
+                pages = await crawler.crawl(site.base_url + "/")
+            finally:
+                await crawler.aclose()
+            return site, pages
+
+    return asyncio.run(run())
+
+
+def test_crawl_honors_robots_and_stays_on_host():
+    site, pages = crawl(SITE)
+    titles = sorted(page["title"] for page in pages)
+    assert titles == ["About", "Home", "Pricing"]
+    # Disallowed and off-host pages were never requested, and /about only once
+    assert not [path for path in site.requested if path.startswith("/private")]
+    assert "/elsewhere" not in site.requested and "/partner" not in site.requested
+    assert site.requested.count("/about") == 1
+
+
+def test_byte_budgets_count_bytes_and_cover_sitemaps():
+    # 2 bytes per character in UTF-8
+    big_text = "é" * 60_000
+    routes = {
+        "/robots.txt": ("text/plain", ""),
+        "/sitemap.xml": ("application/xml", "<urlset>" + "".join(
+            f"<url><loc>{{base}}/page{n}</loc></url>" for n in range(2000)) + "</urlset>"),
+        "/": ("text/html", page("Home", body=big_text)),
+    }
+    for n in range(2000):
+        routes[f"/page{n}"] = ("text/html", page(f"Page {n}"))
+    site, pages = crawl(routes, max_page_bytes=50_000, max_bytes=200_000, max_pages=3)
+    home = next(page for page in pages if page["title"] == "Home")
+    # Cut at 50 kB of body, which is under 25k of these characters
+    assert home["text"].count("é") < 25_000
+    # The truncated sitemap still seeded pages from the entries that arrived whole
+    assert len(pages) == 3
@@ -0,0 +1,40 @@
+import pytest
+
+from structured_output import AGENT_CONFIG_SCHEMA, StructuredOutputError, check_schema, extract_json_object
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"name": "Gaia"}', {"name": "Gaia"}),
+    ('```json\n{"name": "Gaia"}\n```', {"name": "Gaia"}),
+    ('Here is the config:\n{"name": "Gaia"}\nLet me know if you need changes.', {"name": "Gaia"}),
+    ('{"tone": "warm {not a brace}", "quote": "she said \\"hi\\""}', {"tone": "warm {not a brace}", "quote": 'she said "hi"'}),
+    ('{"a": {"b": [1, {"c": "]"}]}, "d": "e"}', {"a": {"b": [1, {"c": "]"}]}, "d": "e"}),
+    # Repairs
+    ('{"name": "Gaia", "tone": "warm",}', {"name": "Gaia", "tone": "warm"}),
+    ('```json\n{"a": [1, 2,], "b": {"c": "x, }",},}\n```', {"a": [1, 2], "b": {"c": "x, }"}}),
+    ('"name": "Gaia", "tone": "warm"}', {"name": "Gaia", "tone": "warm"}),
+    ('{"name": "Gaia", "tone": "war', {"name": "Gaia", "tone": "war"}),
+    ('{"name": "Gaia", "products": ["voice", "sms",', {"name": "Gaia", "products": ["voice", "sms"]}),
+    ('{"a": {"b": "c\\"', {"a": {"b": 'c"'}}),
+])
+def test_extract_json_object(text, expected):
+    assert extract_json_object(text) == expected
+
+
+@pytest.mark.parametrize("text, error", [
+    ("", "Empty response"),
+    ("I could not find that website.", "No JSON object"),
+    ('{"name": "Gaia", "tone":', "Invalid JSON"),
+    ('["not", "an", "object"]', "Invalid JSON"),
+])
+def test_extract_json_object_errors(text, error):
+    with pytest.raises(StructuredOutputError, match=error):
+        extract_json_object(text)
+
+
+def test_check_schema_reports_every_problem_and_drops_extra_keys():
+    config = {field: "x" for field in AGENT_CONFIG_SCHEMA["required"]}
+    assert check_schema({**config, "extra": "y"}, AGENT_CONFIG_SCHEMA) == config
+    with pytest.raises(StructuredOutputError) as problems:
+        check_schema({**config, "name": None, "tone": " ", "industry": 3}, AGENT_CONFIG_SCHEMA)
+    assert str(problems.value) == "name is missing; industry must be a non-empty string; tone must be a non-empty string"
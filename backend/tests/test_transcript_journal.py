@@ -0,0 +1,125 @@
+import os
+import json
+import asyncio
+
+from transcript_journal import TranscriptJournal
+
+
+LEAD = {"session_id": "a", "name": ""}
+
+
+def journal(tmp_path, **kwargs) -> TranscriptJournal:
+    kwargs.setdefault("flush_interval", 0.01)
+    return TranscriptJournal(journal_dir=str(tmp_path), **kwargs)
+
+
+def records(tmp_path):
+    lines = []
+    for name in sorted(os.listdir(tmp_path)):
+        with open(os.path.join(tmp_path, name)) as f:
+            lines.extend(json.loads(line) for line in f)
+    return lines
+
+
+def write_segment(tmp_path, day: str, *lines):
+    with open(os.path.join(tmp_path, f"local-{day}.jsonl"), "w") as f:
+        f.write("".join(json.dumps(line) + "\n" for line in lines))
+
+
+def test_unfinished_call_is_recovered_once(tmp_path):
+    async def run():
+        crashed = journal(tmp_path)
+        crashed.begin("a", LEAD, {"brandName": "Acme"})
+        crashed.turn("a", "assistant", "Hi, this is Acme.")
+        crashed.turn("a", "user", "I'm Jane, how much is it?")
+        crashed.lead("a", {"name": "Jane"}, turns=2)
+        crashed.turn("a", "assistant", "Plans start at fifty dollars.")
+        crashed.begin("b", LEAD)
+        await crashed.end("b")
+        # Written and fsynced, but the process dies before "a" ends
+        await crashed.sync()
+
+        restarted = journal(tmp_path)
+        calls = await restarted.recover()
+        for call in calls:
+            await restarted.end(call["session_id"], recovered=True)
+        await restarted.aclose()
+
+        again = journal(tmp_path)
+        return calls, await again.recover(), again
+
+    calls, second, again = asyncio.run(run())
+    assert [call["session_id"] for call in calls] == ["a"]
+    call = calls[0]
+    assert call["start"]["agent_config"] == {"brandName": "Acme"}
+    assert call["turns"] == ["AGENT: Hi, this is Acme.", "HUMAN: I'm Jane, how much is it?", "AGENT: Plans start at fifty dollars."]
+    assert (call["lead"], call["lead_turns"]) == ({"name": "Jane"}, 2)
+    assert second == []
+    # Ended calls stay readable after a restart
+    assert again.transcript("a") == call["turns"]
+
+
+def test_end_is_on_disk_when_it_returns(tmp_path):
+    async def run():
+        live = journal(tmp_path, flush_interval=1.0)
+        live.begin("a", LEAD)
+        live.turn("a", "user", "Hello")
+        started = asyncio.get_running_loop().time()
+        await live.end("a")
+        waited = asyncio.get_running_loop().time() - started
+        # Read back before aclose, as a crash right after end() would leave it
+        return waited, records(tmp_path)
+
+    waited, written = asyncio.run(run())
+    assert [record["type"] for record in written] == ["start", "turn", "end"]
+    # The batch waited out the flush interval rather than being lost
+    assert waited >= 0.9
+
+
+def test_torn_last_line_is_skipped(tmp_path):
+    write_segment(tmp_path, "2099-01-01", {"type": "start", "session_id": "a", "lead": LEAD, "ts": 1.0},
+                  {"type": "turn", "session_id": "a", "role": "user", "content": "Hello", "ts": 2.0})
+    with open(os.path.join(tmp_path, "local-2099-01-01.jsonl"), "a") as f:
+        f.write('{"type": "turn", "session_id": "a", "ro')
+
+    calls = asyncio.run(journal(tmp_path).recover())
+    assert [call["turns"] for call in calls] == [["HUMAN: Hello"]]
+
+
+def test_old_segments_are_kept_until_their_calls_end(tmp_path):
+    write_segment(tmp_path, "2000-01-01",
+                  {"type": "start", "session_id": "done", "lead": LEAD, "ts": 1.0},
+                  {"type": "end", "session_id": "done", "ts": 2.0})
+    write_segment(tmp_path, "2000-01-02", {"type": "start", "session_id": "open", "lead": LEAD, "ts": 3.0})
+    # Other processes' segments are never touched
+    with open(os.path.join(tmp_path, "node-2-2000-01-01.jsonl"), "w") as f:
+        f.write(json.dumps({"type": "start", "session_id": "elsewhere", "lead": LEAD, "ts": 1.0}) + "\n")
+
+    calls = asyncio.run(journal(tmp_path, retention_days=7).recover())
+    assert [call["session_id"] for call in calls] == ["open"]
+    assert sorted(os.listdir(tmp_path)) == ["local-2000-01-02.jsonl", "node-2-2000-01-01.jsonl"]
+
+
+def test_index_evicts_ended_calls_beyond_max_sessions(tmp_path):
+    async def run():
+        index = journal(tmp_path, max_sessions=2)
+        index.begin("live", LEAD)
+        for session_id in ("a", "b", "c"):
+            index.begin(session_id, LEAD)
+            index.turn(session_id, "user", f"I am {session_id}")
+            await index.end(session_id)
+        await index.aclose()
+        return index
+
+    index = asyncio.run(run())
+    # The oldest call is still live, so nothing behind it is evicted yet
+    assert index.call("live") is not None and index.call("a") is not None
+
+    async def finish():
+        await index.end("live")
+        await index.aclose()
+
+    asyncio.run(finish())
+    # Ending it made it the newest call; the two oldest ended calls go
+    assert [index.call(session_id) is not None for session_id in ("live", "a", "b", "c")] == [True, False, False, True]
+    assert index.transcript("c") == ["HUMAN: I am c"]
@@ -0,0 +1,48 @@
+import os
+import asyncio
+
+from tts_cache import TTSAudioCache
+
+
+def test_only_seeded_phrases_reach_disk(tmp_path):
+    async def run():
+        cache = TTSAudioCache(disk_dir=str(tmp_path))
+        seeded = cache.key("alloy", "tts-1", 24000, "Thank you for calling.")
+        spoken = cache.key("alloy", "tts-1", 24000, "So your email is jane@example.com?")
+        cache.put(seeded, b"\x01\x02" * 100, persist=True)
+        cache.put(spoken, b"\x03\x04" * 100)
+        # A repeat hit no longer promotes an LLM sentence to disk
+        assert await cache.get(spoken) == b"\x03\x04" * 100
+        await asyncio.sleep(0.1)
+        assert os.listdir(tmp_path) == [seeded + ".pcm"]
+
+        # A fresh process finds the seeded phrase on disk and nothing else
+        restarted = TTSAudioCache(disk_dir=str(tmp_path))
+        assert await restarted.contains(seeded)
+        assert not await restarted.contains(spoken)
+        assert await restarted.get(seeded) == b"\x01\x02" * 100
+        assert await restarted.get(spoken) is None
+        assert restarted.stats()["disk_hits"] == 1
+
+    asyncio.run(run())
+
+
+def test_seed_failure_during_call_prep_is_logged_not_raised(monkeypatch):
+    import server
+    from loguru import logger
+
+    async def greetings(config):
+        return {"default": "Hi, this is Acme."}
+
+    async def failing_seed(phrases, voice, model):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(server, "generate_greetings", greetings)
+    monkeypatch.setattr(server.tts_cache, "seed", failing_seed)
+    warnings = []
+    sink = logger.add(warnings.append, level="WARNING", format="{message}")
+    try:
+        asyncio.run(server.prepare_call_audio("missing-session", {"brandName": "Acme"}))
+    finally:
+        logger.remove(sink)
+    assert any("fixed phrases" in message and "disk full" in message for message in warnings)
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import asyncio
+import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+
+from pipecat.frames.frames import LLMFullResponseEndFrame
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext, OpenAILLMContextFrame
+
+from lead_tracker import conversation_turns
+
+
+class TranscriptJournal:
+    """Append-only journal of every call's transcript, written while the call runs.
+
+    Each call is a ``start`` record (the initial lead data and agent config),
+    one ``turn`` record per finalized user or assistant message, ``lead``
+    records as the in-call tracker updates the lead, and an ``end`` record once
+    the post-call job has been handed off. Records are JSON lines appended to
+    per-day segment files, ``{name}-YYYY-MM-DD.jsonl``. They are written
+    behind the call: appends only buffer the record, and a background task
+    writes whatever has accumulated every ``flush_interval`` seconds with a
+    single fsync, so a crash loses at most that much of a call.
+
+    Calls are indexed in memory by session id, so the post-call path and
+    /get-lead-data read transcripts from here rather than from the live
+    context. ``recover()`` rebuilds the index from this process's segments at
+    startup and returns the calls that never ended.
+    """
+
+    def __init__(
+        self,
+        journal_dir: str = "transcript_journal",
+        name: str = "local",
+        flush_interval: float = 0.2,
+        retention_days: int = 7,
+        max_sessions: int = 1000,
+    ):
+        self.journal_dir = journal_dir
+        self.name = name
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        # Ended calls kept in the index; live calls are always kept
+        self.max_sessions = max_sessions
+        self._calls: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._pending: List[str] = []
+        # Resolved once the batch holding the records appended so far is on disk
+        self._synced: Optional[asyncio.Future] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._file = None
+        self._segment: Optional[str] = None
+        self.records = 0
+        self.batches = 0
+        self.bytes_written = 0
+        self.fsync_seconds = 0.0
+        self.recovered = 0
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._closing = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self):
+        """Write anything still buffered and close the current segment."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        await self._flush()
+        if self._file is not None:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+            self._segment = None
+
+    # Writing
+
+    def begin(self, session_id: str, lead: Dict[str, Any], agent_config: Optional[Dict[str, Any]] = None):
+        self._append({"type": "start", "session_id": session_id, "lead": lead, "agent_config": agent_config})
+
+    def turn(self, session_id: str, role: str, content: str):
+        self._append({"type": "turn", "session_id": session_id, "role": role, "content": content})
+
+    def lead(self, session_id: str, lead: Dict[str, Any], turns: int):
+        """The in-call lead record, covering the first ``turns`` turns of the transcript."""
+        self._append({"type": "lead", "session_id": session_id, "lead": lead, "turns": turns})
+
+    async def end(self, session_id: str, recovered: bool = False):
+        """Mark the call finished and wait until that is on disk, so recovery will not pick it up again."""
+        self._append({"type": "end", "session_id": session_id, "recovered": recovered})
+        await self.sync()
+
+    async def sync(self):
+        """Wait for everything appended so far to be written and fsynced."""
+        if self._synced is None:
+            return
+        if self._task is None:
+            await self._flush()
+        else:
+            await asyncio.shield(self._synced)
+
+    def _append(self, record: Dict[str, Any]):
+        record["ts"] = time.time()
+        self._index(record)
+        self._pending.append(json.dumps(record, default=str))
+        if self._synced is None:
+            self._synced = asyncio.get_running_loop().create_future()
+        if self._task is None:
+            self.start()
+        self._wake.set()
+
+    async def _run(self):
+        while not self._closing:
+            await self._wake.wait()
+            if not self._closing:
+                # Group commit: let the rest of this interval's records join the batch
+                await asyncio.sleep(self.flush_interval)
+            self._wake.clear()
+            await self._flush()
+
+    async def _flush(self):
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        synced, self._synced = self._synced, None
+        try:
+            await asyncio.to_thread(self._write, lines)
+        except Exception as e:
+            logger.error(f"❌ Transcript journal write failed, {len(lines)} record(s) lost: {e}")
+        finally:
+            if synced is not None and not synced.done():
+                synced.set_result(None)
+
+    def _segment_path(self, day: datetime.date) -> str:
+        return os.path.join(self.journal_dir, f"{self.name}-{day.isoformat()}.jsonl")
+
+    def _write(self, lines: List[str]):
+        path = self._segment_path(datetime.date.today())
+        if path != self._segment:
+            if self._file is not None:
+                self._file.close()
+            os.makedirs(self.journal_dir, exist_ok=True)
+            self._file = open(path, 'a')
+            self._segment = path
+        data = "\n".join(lines) + "\n"
+        self._file.write(data)
+        self._file.flush()
+        started = time.perf_counter()
+        os.fsync(self._file.fileno())
+        self.fsync_seconds += time.perf_counter() - started
+        self.records += len(lines)
+        self.batches += 1
+        self.bytes_written += len(data)
+
+    # Index
+
+    def _index(self, record: Dict[str, Any], segment: Optional[str] = None):
+        session_id = record["session_id"]
+        call = self._calls.get(session_id)
+        if call is None:
+            call = self._calls[session_id] = {
+                "session_id": session_id, "start": None, "turns": [], "lead": None,
+                "lead_turns": 0, "ended": False, "updated_at": record["ts"], "segments": set(),
+            }
+        self._calls.move_to_end(session_id)
+        call["updated_at"] = record["ts"]
+        call["segments"].add(segment or self._segment_path(datetime.date.fromtimestamp(record["ts"])))
+        if record["type"] == "start":
+            call["start"] = record
+        elif record["type"] == "turn":
+            call["turns"].extend(conversation_turns([record]))
+        elif record["type"] == "lead":
+            call["lead"], call["lead_turns"] = record["lead"], record["turns"]
+        elif record["type"] == "end":
+            call["ended"] = True
+            while len(self._calls) > self.max_sessions:
+                oldest = next(iter(self._calls.values()))
+                if not oldest["ended"]:
+                    break
+                del self._calls[oldest["session_id"]]
+
+    def call(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._calls.get(session_id)
+
+    def transcript(self, session_id: str) -> Optional[List[str]]:
+        """The call's turns as "AGENT:"/"HUMAN:" lines, or None if it is not in the journal."""
+        call = self._calls.get(session_id)
+        return list(call["turns"]) if call else None
+
+    # Recovery
+
+    async def recover(self) -> List[Dict[str, Any]]:
+        """Index this process's segments and return the calls that started but never ended.
+
+        Segments older than ``retention_days`` are deleted once every call in them has ended.
+        """
+        incomplete = await asyncio.to_thread(self._recover)
+        self.recovered = len(incomplete)
+        if incomplete:
+            logger.info(f"♻️ Found {len(incomplete)} unfinished call(s) in the transcript journal")
+        return incomplete
+
+    def _recover(self) -> List[Dict[str, Any]]:
+        if not os.path.isdir(self.journal_dir):
+            return []
+        prefix = f"{self.name}-"
+        segments = sorted(
+            os.path.join(self.journal_dir, name) for name in os.listdir(self.journal_dir)
+            if name.startswith(prefix) and name.endswith(".jsonl")
+        )
+        for path in segments:
+            with open(path, 'r') as f:
+                for number, line in enumerate(f, 1):
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash mid-write
+                        logger.warning(f"Skipping unreadable transcript journal record {os.path.basename(path)}:{number}")
+                        continue
+                    self._index(record, path)
+
+        incomplete = [call for call in self._calls.values() if not call["ended"] and call["start"]]
+        live_segments = set().union(*(call["segments"] for call in self._calls.values() if not call["ended"]))
+        cutoff = datetime.date.today() - datetime.timedelta(days=self.retention_days)
+        for path in segments:
+            if path not in live_segments and path < self._segment_path(cutoff):
+                os.remove(path)
+        return incomplete
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls_indexed": len(self._calls),
+            "calls_live": sum(1 for call in self._calls.values() if not call["ended"]),
+            "buffered": len(self._pending),
+            "records": self.records,
+            "batches": self.batches,
+            "records_per_fsync": round(self.records / self.batches, 2) if self.batches else 0.0,
+            "fsync_avg_ms": round(self.fsync_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+            "bytes_written": self.bytes_written,
+            "recovered": self.recovered,
+        }
+
+
+class TranscriptRecorder(BaseObserver):
+    """Journals each user and assistant message as soon as it is added to the call context.
+
+    The context aggregators push an ``OpenAILLMContextFrame`` after every
+    message they add, so new messages are picked up on those frames (and at
+    the end of each bot response) and never re-read afterwards.
+    """
+
+    def __init__(self, journal: TranscriptJournal, session_id: str, context: OpenAILLMContext):
+        super().__init__()
+        self._journal = journal
+        self._session_id = session_id
+        self._context = context
+        # Context messages already journaled
+        self._recorded = 0
+
+    async def on_push_frame(self, data: FramePushed):
+        if isinstance(data.frame, (OpenAILLMContextFrame, LLMFullResponseEndFrame)):
+            self.record()
+
+    def record(self):
+        messages = self._context.get_messages()
+        for message in messages[self._recorded:]:
+            if message.get("role") in ("user", "assistant") and message.get("content"):
+                self._journal.turn(self._session_id, message["role"], message["content"])
+        self._recorded = len(messages)
+
+
+def transcript_journal_from_env(name: str = "local") -> TranscriptJournal:
+    return TranscriptJournal(
+        journal_dir=os.getenv("TRANSCRIPT_JOURNAL_DIR", "transcript_journal"),
+        name=name,
+        flush_interval=float(os.getenv("TRANSCRIPT_JOURNAL_FLUSH_INTERVAL", "0.2")),
+        retention_days=int(os.getenv("TRANSCRIPT_JOURNAL_RETENTION_DAYS", "7")),
+    )
@@ -0,0 +1,225 @@
+import os
+import re
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Dict, Iterable, Optional
+
+from loguru import logger
+from prometheus_client import Counter
+
+from pipecat.frames.frames import ErrorFrame, Frame, TTSAudioRawFrame, TTSStartedFrame, TTSStoppedFrame
+from pipecat.services.openai.tts import VALID_VOICES, OpenAITTSService
+
+from openai_clients import openai_registry
+
+
+TTS_CACHE_LOOKUPS = Counter(
+    "voice_tts_cache_lookups_total",
+    "Phrase-level TTS cache lookups",
+    ["result"],
+)
+
+# Spoken by end_conversation_handler at the end of every call
+END_CONVERSATION_PHRASE = "Thank you for calling. Have a wonderful day!"
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so the same phrase from different sources shares an entry.
+
+    Case and punctuation are kept: both change how the phrase is spoken.
+    """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class TTSAudioCache:
+    """Synthesized PCM for short, recurring phrases.
+
+    A byte-bounded in-memory LRU sits in front of an optional on-disk store of one
+    raw PCM file per phrase. Only seeded phrases (greetings and fixed lines such
+    as the goodbye) are written to disk: LLM sentences can quote what the caller
+    said, so they stay in this process's memory and are gone on restart. Disk
+    reads and writes run in a thread, off the event loop.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_chars: int = 300, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._persisted = set()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.seeded = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def key(self, voice: str, model: str, sample_rate: int, text: str) -> Optional[str]:
+        """Cache key for a phrase, or None when the text is too long to be worth caching."""
+        text = normalize_text(text)
+        if not text or len(text) > self.max_chars:
+            return None
+        return hashlib.sha256(f"{voice}|{model}|{sample_rate}|{text}".encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self._entries.get(key)
+        if audio is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            TTS_CACHE_LOOKUPS.labels("hit").inc()
+            return audio
+
+        audio = await asyncio.to_thread(self._read_disk, key) if self.disk_dir else None
+        if audio is not None:
+            self.disk_hits += 1
+            TTS_CACHE_LOOKUPS.labels("disk_hit").inc()
+            self._persisted.add(key)
+            self._remember(key, audio)
+            return audio
+
+        self.misses += 1
+        TTS_CACHE_LOOKUPS.labels("miss").inc()
+        return None
+
+    def put(self, key: str, audio: bytes, persist: bool = False):
+        """Cache ``audio``; ``persist`` also writes it to disk, and is only for seeded phrases."""
+        self._remember(key, audio)
+        if persist:
+            self._persist(key, audio)
+
+    async def contains(self, key: str) -> bool:
+        if key in self._entries:
+            return True
+        return bool(self.disk_dir) and await asyncio.to_thread(os.path.exists, self._disk_path(key))
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = audio
+        self._bytes += len(audio)
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+
+    def _persist(self, key: str, audio: bytes):
+        if not self.disk_dir or key in self._persisted:
+            return
+        self._persisted.add(key)
+        asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, audio)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".pcm")
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._disk_path(key), "rb") as f:
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable TTS cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, audio: bytes):
+        path = self._disk_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            self._persisted.discard(key)
+            logger.warning(f"Could not persist TTS cache entry {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else None,
+            "seeded": self.seeded,
+        }
+
+    async def seed(self, phrases: Iterable[str], voice: str, model: str, sample_rate: int = OpenAITTSService.OPENAI_SAMPLE_RATE):
+        """Synthesize any of ``phrases`` not cached yet so the first call that says them is a hit."""
+        for phrase in phrases:
+            key = self.key(voice, model, sample_rate, phrase)
+            if key is None or await self.contains(key):
+                continue
+            try:
+                audio = await synthesize(phrase, voice, model)
+            except Exception as e:
+                logger.warning(f"Could not pre-seed TTS cache with {phrase!r}: {e}")
+                continue
+            self.put(key, audio, persist=True)
+            self.seeded += 1
+
+
+async def synthesize(text: str, voice: str, model: str) -> bytes:
+    """Synthesize ``text`` to 24 kHz PCM through the shared OpenAI client."""
+    async with openai_registry.request("tts") as client:
+        async with client.audio.speech.with_streaming_response.create(
+            input=text,
+            model=model,
+            voice=VALID_VOICES[voice],
+            response_format="pcm",
+        ) as response:
+            return await response.read()
+
+
+def seed_phrases(agent_config: Optional[Dict[str, Any]] = None) -> list:
+    """Fixed phrases every call for ``agent_config`` may speak."""
+    return [END_CONVERSATION_PHRASE]
+
+
+class CachedOpenAITTSService(OpenAITTSService):
+    """OpenAI TTS that replays cached audio for phrases it has synthesized before."""
+
+    def __init__(self, *, cache: TTSAudioCache, **kwargs):
+        super().__init__(**kwargs)
+        self._cache = cache
+
+    async def run_tts(self, text: str) -> AsyncGenerator[Frame, None]:
+        key = self._cache.key(self._voice_id, self.model_name, self.sample_rate, text)
+        audio = await self._cache.get(key) if key else None
+        if audio is not None:
+            logger.debug(f"{self}: Replaying cached TTS [{text}]")
+            yield TTSStartedFrame()
+            for i in range(0, len(audio), self.chunk_size):
+                yield TTSAudioRawFrame(audio[i:i + self.chunk_size], self.sample_rate, 1)
+            yield TTSStoppedFrame()
+            return
+
+        chunks = []
+        failed = False
+        async for frame in super().run_tts(text):
+            if isinstance(frame, TTSAudioRawFrame):
+                chunks.append(frame.audio)
+            elif isinstance(frame, ErrorFrame):
+                failed = True
+            yield frame
+        # Only complete syntheses are cached; an interrupted one never reaches this point
+        if key and chunks and not failed:
+            self._cache.put(key, b"".join(chunks))
+
+
+def tts_cache_from_env() -> TTSAudioCache:
+    return TTSAudioCache(
+        max_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+        max_chars=int(os.getenv("TTS_CACHE_MAX_CHARS", "300")),
+        disk_dir=os.getenv("TTS_CACHE_DIR") or None,
+    )
+
+
+# Shared by every call in this process
+tts_cache = tts_cache_from_env()
@@ -0,0 +1,122 @@
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from loguru import logger
+
+from pipecat.audio.vad.silero import SileroVADAnalyzer
+from pipecat.audio.vad.vad_analyzer import VADState
+
+
+def _warm_up(analyzer: SileroVADAnalyzer, sample_rate: int = 16000):
+    """Run one inference so the ONNX session allocates its buffers before the first call."""
+    analyzer.set_sample_rate(sample_rate)
+    silence = np.zeros(analyzer.num_frames_required(), dtype=np.int16).tobytes()
+    analyzer.voice_confidence(silence)
+
+
+def reset_analyzer(analyzer: SileroVADAnalyzer):
+    """Clear per-call state so a pooled analyzer behaves like a freshly constructed one."""
+    analyzer._vad_buffer = b""
+    analyzer._prev_volume = 0
+    analyzer._vad_starting_count = 0
+    analyzer._vad_stopping_count = 0
+    analyzer._vad_state = VADState.QUIET
+    analyzer._last_reset_time = 0
+    analyzer._model.reset_states()
+
+
+class VADPool:
+    """Process-wide pool of pre-loaded, warmed Silero VAD analyzers."""
+
+    def __init__(self, size: int = 4, checkout_timeout: float = 0.5):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._idle: Optional[asyncio.Queue] = None
+        self._checkouts = 0
+        self._overflow = 0
+        self._in_use = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._wait_samples: List[float] = []
+
+    async def start(self):
+        """Load and warm every analyzer off the event loop."""
+        self._idle = asyncio.Queue()
+        started = time.perf_counter()
+        for _ in range(self.size):
+            analyzer = await asyncio.to_thread(self._build)
+            self._idle.put_nowait(analyzer)
+        logger.info(f"🎙️ VAD pool ready: {self.size} analyzers in {time.perf_counter() - started:.2f}s")
+
+    def _build(self) -> SileroVADAnalyzer:
+        analyzer = SileroVADAnalyzer()
+        _warm_up(analyzer)
+        reset_analyzer(analyzer)
+        return analyzer
+
+    async def aclose(self):
+        """Nothing to release; analyzers go with the process."""
+
+    @asynccontextmanager
+    async def checkout(self):
+        """Borrow an analyzer for the lifetime of one call.
+
+        If the pool is exhausted for longer than ``checkout_timeout`` a fresh
+        analyzer is built instead, so a burst of calls degrades to today's
+        per-call construction rather than blocking callers. A pool of size 0
+        builds one for every call straight away.
+        """
+        started = time.perf_counter()
+        pooled = True
+        analyzer = None
+        if self._idle is not None and self.size:
+            try:
+                analyzer = await asyncio.wait_for(self._idle.get(), timeout=self.checkout_timeout)
+            except asyncio.TimeoutError:
+                analyzer = None
+        if analyzer is None:
+            pooled = False
+            self._overflow += 1
+            analyzer = await asyncio.to_thread(self._build)
+        self._record_wait(time.perf_counter() - started)
+        self._in_use += 1
+        try:
+            yield analyzer
+        finally:
+            self._in_use -= 1
+            if pooled:
+                reset_analyzer(analyzer)
+                self._idle.put_nowait(analyzer)
+
+    def _record_wait(self, wait: float):
+        self._checkouts += 1
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+        self._wait_samples.append(wait)
+        if len(self._wait_samples) > 1000:
+            self._wait_samples = self._wait_samples[-1000:]
+
+    def stats(self) -> Dict[str, Any]:
+        samples = sorted(self._wait_samples)
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0
+        return {
+            "size": self.size,
+            "idle": self._idle.qsize() if self._idle is not None else 0,
+            "in_use": self._in_use,
+            "checkouts": self._checkouts,
+            "overflow_builds": self._overflow,
+            "checkout_wait_avg_ms": round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0.0,
+            "checkout_wait_p95_ms": round(p95 * 1000, 3),
+            "checkout_wait_max_ms": round(self._wait_max * 1000, 3),
+        }
+
+
+def vad_pool_from_env() -> VADPool:
+    return VADPool(
+        size=int(os.getenv("VAD_POOL_SIZE", "4")),
+        checkout_timeout=float(os.getenv("VAD_POOL_CHECKOUT_TIMEOUT", "0.5")),
+    )
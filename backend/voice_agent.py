@@ -1,70 +1,39 @@
 import os
-import sys
 import json
 import datetime
 import re
 import asyncio
 import gspread_asyncio as ag_async
 from google.oauth2.service_account import Credentials
-from openai import AsyncOpenAI
 
 from dotenv import load_dotenv
 from loguru import logger
 
-from prompts import build_system_prompt, build_lead_qualification_prompt, PromptTemplates
+from prompts import build_lead_qualification_prompt, PromptTemplates
+from log_config import configure_logging
+from structured_output import LEAD_RECORD_SCHEMA, chat_response_format, parse_or_repair
+from openai_clients import openai_registry
+from sheets_writer import SheetsLeadWriter
+from voice_metrics import TurnLatencyObserver
+from llm_context import PromptCacheLLMService, build_call_context, openai_tools, prefix_messages, KNOWLEDGE_LOOKUP
+from knowledge_index import knowledge_index_for, lookup_company_info_handler
+from rolling_context import rolling_context_from_env
+from lead_tracker import LeadTracker, conversation_turns, update_lead
+from tts_cache import CachedOpenAITTSService, END_CONVERSATION_PHRASE, tts_cache
+from audio_codec import CodecFrameSerializer, frame_serializer_for
+from transcript_journal import TranscriptRecorder
+from site_crawler import canonical_website
 
 # Pipecat imports for end conversation functionality  
 from pipecat.frames.frames import EndTaskFrame, TTSSpeakFrame
 from pipecat.processors.frame_processor import FrameDirection
 from pipecat.services.llm_service import FunctionCallParams
-from pipecat.adapters.schemas.function_schema import FunctionSchema
-from pipecat.adapters.schemas.tools_schema import ToolsSchema
-
-
-def clean_json_response(content: str) -> str:
-    """Clean and extract JSON from LLM response with markdown formatting."""
-    print(f"🔍 CLEAN: Original: {repr(content[:100]) if content else 'None'}")
-    
-    if not content or content.strip() == "":
-        raise ValueError("Empty response from LLM")
-    
-    # Remove markdown code blocks
-    original_content = content
-    content = content.strip()
-    print(f"🔍 CLEAN: After strip: {repr(content[:100])}")
-    
-    content = re.sub(r'^```json\s*', '', content)
-    content = re.sub(r'^```\s*', '', content) 
-    content = re.sub(r'\s*```$', '', content)
-    
-    # Remove any remaining backticks and whitespace
-    cleaned = content.strip().strip('`').strip()
-    print(f"🔍 CLEAN: After markdown removal: {repr(cleaned[:100])}")
-    
-    # Defensive fix: if content doesn't start with { but contains JSON fields, try to fix it
-    if not cleaned.startswith('{') and '"name"' in cleaned:
-        print(f"🔧 FIXING: Missing opening brace, adding it...")
-        # Try to find where the JSON actually starts
-        if cleaned.startswith('"name"'):
-            cleaned = '{' + cleaned
-            print(f"🔧 FIXING: Added opening brace: {repr(cleaned[:50])}")
-        # Check if it ends with }
-        if not cleaned.endswith('}'):
-            cleaned = cleaned + '}'
-            print(f"🔧 FIXING: Added closing brace")
-    
-    print(f"🔍 CLEAN: Final result: {repr(cleaned[:100])}")
-    
-    return cleaned
 
 from pipecat.audio.vad.silero import SileroVADAnalyzer
 from pipecat.pipeline.pipeline import Pipeline
 from pipecat.pipeline.runner import PipelineRunner
 from pipecat.pipeline.task import PipelineParams, PipelineTask
-from pipecat.processors.aggregators.openai_llm_context import OpenAILLMContext
 from pipecat.processors.frameworks.rtvi import RTVIConfig, RTVIObserver, RTVIProcessor
-from pipecat.serializers.protobuf import ProtobufFrameSerializer
-from pipecat.services.openai.llm import OpenAILLMService
 from pipecat.services.openai.stt import OpenAISTTService
 from pipecat.services.openai.tts import OpenAITTSService
 from pipecat.services.deepgram.stt import DeepgramSTTService
@@ -75,8 +44,10 @@ from pipecat.transports.network.fastapi_websocket import (
 
 load_dotenv(override=True)
 
-logger.remove(0)
-logger.add(sys.stderr, level="DEBUG")
+TTS_VOICE = "alloy"
+TTS_MODEL = "gpt-4o-mini-tts"
+
+configure_logging()
 
 # Google Sheets setup
 def google_creds():
@@ -86,58 +57,33 @@ def google_creds():
     scope = ["https://www.googleapis.com/auth/spreadsheets"]
     return Credentials.from_service_account_info(info, scopes=scope)
 
-async def analyze_lead_qualification(transcript, agent_config=None):
-    print(f"\n🚀 DEBUG: Starting lead analysis...")
-    print(f"🚀 DEBUG: Transcript length: {len(transcript) if transcript else 0}")
-    print(f"🚀 DEBUG: Agent config: {agent_config is not None}")
+async def analyze_lead_qualification(transcript, agent_config=None, raise_errors=False):
+    logger.debug(f"🚀 Starting lead analysis: transcript {len(transcript) if transcript else 0} chars, agent config {'set' if agent_config else 'not set'}")
     try:
-        print(f"🚀 DEBUG: Creating OpenAI client...")
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        
         # Use centralized prompt management
         prompt = build_lead_qualification_prompt(transcript, agent_config)
         
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.1
-        )
+        async with openai_registry.request("lead_analysis") as client:
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[{"role": "user", "content": prompt}],
+                response_format=chat_response_format("lead_record", LEAD_RECORD_SCHEMA),
+                max_tokens=500,
+                temperature=0.1
+            )
         
         content = response.choices[0].message.content
-        print(f"\n🔍 DEBUG: Raw LLM response: {repr(content)}")
-        logger.info(f"Raw LLM response: {content}")
+        logger.debug(f"🔍 Raw LLM response: {content!r}")
         
-        # Clean and parse JSON response
-        try:
-            cleaned_content = clean_json_response(content)
-            print(f"🔍 DEBUG: Cleaned JSON: {repr(cleaned_content)}")
-            logger.info(f"Cleaned JSON: {cleaned_content}")
-        except Exception as clean_error:
-            print(f"❌ DEBUG: Error cleaning JSON: {clean_error}")
-            print(f"❌ DEBUG: Raw content that failed: {repr(content)}")
-            logger.error(f"❌ Error cleaning JSON response: {clean_error}")
-            logger.error(f"❌ Raw content that failed cleaning: {repr(content)}")
-            raise
-            
-        try:
-            analysis = json.loads(cleaned_content)
-        except json.JSONDecodeError as json_error:
-            print(f"❌ DEBUG: JSON parsing failed: {json_error}")
-            print(f"❌ DEBUG: Content that failed: {repr(cleaned_content)}")
-            logger.error(f"❌ JSON parsing failed: {json_error}")
-            logger.error(f"❌ Content that failed JSON parsing: {repr(cleaned_content)}")
-            logger.error(f"❌ JSON error position: {json_error.pos if hasattr(json_error, 'pos') else 'N/A'}")
-            raise
+        # Parse against the schema, repairing malformed output instead of repeating the analysis
+        analysis = await parse_or_repair(content, LEAD_RECORD_SCHEMA, "lead_record", "lead_analysis")
         logger.info("✅ Lead qualification analysis completed")
         return analysis
         
     except Exception as e:
-        print(f"❌ DEBUG: Exception in lead analysis: {e}")
-        print(f"❌ DEBUG: Exception type: {type(e)}")
-        import traceback
-        print(f"❌ DEBUG: Traceback: {traceback.format_exc()}")
-        logger.error(f"❌ Error analyzing lead qualification: {e}")
+        logger.exception(f"❌ Error analyzing lead qualification: {e}")
+        if raise_errors:
+            raise
         return {
             "name": None,
             "email": None,
@@ -148,20 +94,51 @@ async def analyze_lead_qualification(transcript, agent_config=None):
             "next_steps": "Manual review required"
         }
 
+# Time-of-day context for the opening line, keyed by greeting variant
+GREETING_CONTEXT = {
+    "after_hours": "Explain that you're available after hours to help with their needs.",
+    "business_hours": "Explain that you're here to help while other team members are with other customers.",
+}
+
+def greeting_variant(now=None):
+    """Pick the greeting variant for the current time of day."""
+    current_hour = (now or datetime.datetime.now()).hour
+    if current_hour < 8 or current_hour > 17:  # Before 8 AM or after 5 PM
+        return "after_hours"
+    return "business_hours"
+
+def greeting_instruction(agent_config, variant):
+    """System instruction asking the agent for its opening line."""
+    company_name = "the company"
+    if agent_config and agent_config.get('brandName'):
+        company_name = agent_config['brandName']
+    return f"Start by warmly introducing yourself as an AI voice assistant from {company_name}. {GREETING_CONTEXT[variant]} Ask who you have the pleasure of speaking with today."
+
+async def generate_greetings(agent_config):
+    """Write the opening line for every greeting variant ahead of the call, as the live LLM would."""
+    # Same prefix and tools as the call itself, which also warms the provider's prompt cache for it
+    messages = prefix_messages(agent_config)
+
+    async def generate(variant):
+        async with openai_registry.request("greeting") as client:
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=messages + [{"role": "system", "content": greeting_instruction(agent_config, variant)}],
+                tools=openai_tools(),
+                tool_choice="none",
+                max_tokens=100,
+            )
+        return response.choices[0].message.content.strip()
+
+    texts = await asyncio.gather(*(generate(variant) for variant in GREETING_CONTEXT))
+    return dict(zip(GREETING_CONTEXT, texts))
+
 def sanitize_url_for_sheet_name(url):
     """Convert URL to a clean sheet name by removing protocols and invalid characters."""
     if not url:
         return "Unknown Website"
     
-    # Remove protocol
-    clean_url = url.replace('https://', '').replace('http://', '')
-    
-    # Remove www.
-    if clean_url.startswith('www.'):
-        clean_url = clean_url[4:]
-    
-    # Remove trailing slash and paths
-    clean_url = clean_url.split('/')[0]
+    clean_url = canonical_website(url)
     
     # Replace invalid characters for Google Sheets (keep only alphanumeric, dots, dashes)
     import re
@@ -173,80 +150,174 @@ def sanitize_url_for_sheet_name(url):
     
     return clean_url
 
-async def save_to_google_sheets(lead):
-    try:
-        agcm = ag_async.AsyncioGspreadClientManager(google_creds)
-        sh = await (await agcm.authorize()).open_by_key(os.getenv("LEADS_SHEET_ID"))
-        
-        # Generate sheet name from website URL
-        website_url = lead.get("website_url")
-        WORKSHEET_NAME = sanitize_url_for_sheet_name(website_url)
-        
-        try:
-            ws = await sh.worksheet(WORKSHEET_NAME)
-        except Exception as worksheet_error:
-            logger.info(f"Worksheet '{WORKSHEET_NAME}' not found, creating it...")
-            ws = await sh.add_worksheet(title=WORKSHEET_NAME, rows=1000, cols=20)
-            # Add headers
-            await ws.append_row([
-                "Session ID", "Start Time", "End Time", "Duration", "Website", "Lead Name", "Phone", "Email",
-                "Qualification Status", "Qualification Reason", "Summary", "Pain Points", "Next Steps", "Conversation"
-            ])
+# Long-lived, batching lead writer; started and flushed by the FastAPI lifespan
+sheets_writer = SheetsLeadWriter(
+    lambda: ag_async.AsyncioGspreadClientManager(google_creds),
+    sheet_id=os.getenv("LEADS_SHEET_ID"),
+    sheet_name_for=sanitize_url_for_sheet_name,
+    batch_size=int(os.getenv("SHEETS_BATCH_SIZE", "20")),
+    flush_interval=float(os.getenv("SHEETS_FLUSH_INTERVAL", "2.0")),
+)
+
+def save_to_google_sheets(lead):
+    """Queue a lead for the next batched Google Sheets write; the returned future resolves once it is written."""
+    return sheets_writer.enqueue(dict(lead))
+
+
+def apply_lead_analysis(lead_data, analysis):
+    """Copy an analysis result onto the flat lead data structure."""
+    # Direct mapping from analysis to flat lead data structure
+    lead_data["lead_name"] = analysis.get("name")
+    lead_data["email"] = analysis.get("email")
+    lead_data["phone"] = analysis.get("phone")
+    # Handle separate qualification status and reason fields
+    lead_data["qualification_status"] = analysis.get("qualification_status", "unknown")
+    lead_data["qualification_reason"] = analysis.get("qualification_reason", "")
+    
+    # Convert arrays to strings if needed (safety net)
+    pain_points = analysis.get("pain_points", "None identified")
+    if isinstance(pain_points, list):
+        pain_points = "; ".join(pain_points)
+    lead_data["pain_points"] = pain_points
+    
+    next_steps = analysis.get("next_steps", "Follow up required")
+    if isinstance(next_steps, list):
+        next_steps = "; ".join(next_steps)
+    lead_data["next_steps"] = next_steps
+    
+    lead_data["summary"] = analysis.get("summary", "No summary available")
+
+def lead_result(lead_data, final=True):
+    """Lead fields the frontend reads from /get-lead-data."""
+    return {
+        "lead_name": lead_data["lead_name"],
+        "email": lead_data["email"],
+        "phone": lead_data["phone"],
+        "qualification_status": lead_data["qualification_status"],
+        "qualification_reason": lead_data["qualification_reason"],
+        "pain_points": lead_data["pain_points"],
+        "summary": lead_data["summary"],
+        "next_steps": lead_data["next_steps"],
+        "duration": lead_data.get("duration", "0:00"),
+        "final": final,
+    }
+
+def finish_lead_data(lead_data, conversation_text, end_time=None):
+    """Record the finished call's transcript, end time and duration on its lead data."""
+    lead_data["conversation_log"] = conversation_text
+    lead_data["end_time"] = (end_time or datetime.datetime.now()).isoformat()
+    
+    # Calculate duration
+    if lead_data["start_time"] and lead_data["end_time"]:
+        start_dt = datetime.datetime.fromisoformat(lead_data["start_time"])
+        end_dt = datetime.datetime.fromisoformat(lead_data["end_time"])
+        duration_seconds = int((end_dt - start_dt).total_seconds())
+        minutes, seconds = divmod(duration_seconds, 60)
+        lead_data["duration"] = f"{minutes}:{seconds:02d}"
+    else:
+        lead_data["duration"] = "0:00"
+
+def recovered_post_call_job(call):
+    """Post-call job for a call the transcript journal saw start but never end, e.g. across a crash."""
+    start = call["start"]
+    lead_data = dict(start["lead"])
+    finish_lead_data(lead_data, "\n".join(call["turns"]), datetime.datetime.fromtimestamp(call["updated_at"]))
+    job = {
+        # Same id as the job the call queues itself, so a job that was journaled just before the crash is not run twice
+        "job_id": call["session_id"],
+        "session_id": call["session_id"],
+        "lead": lead_data,
+        "agent_config": start.get("agent_config"),
+        "recovered": True,
+    }
+    if call["lead"]:
+        # Only the turns the in-call tracker had not folded in yet need reconciling
+        job["lead_state"] = {"lead": call["lead"], "pending_turns": call["turns"][call["lead_turns"]:]}
+    return job
+
+async def reconcile_lead(lead_state, agent_config=None):
+    """Fold the turns the in-call tracker had not processed yet into its lead record."""
+    if not lead_state["pending_turns"]:
+        return lead_state["lead"]
+    return await update_lead(lead_state["lead"], lead_state["pending_turns"], agent_config)
+
+
+async def process_post_call_job(job, final_attempt=True, store_lead_callback=None):
+    """Analyze a finished call's transcript, store the lead for the frontend and queue it for Google Sheets.
+
+    Returns the Sheets write's future, so the post-call queue keeps the job until the lead is written.
+    """
+    lead_data = dict(job["lead"])
+    agent_config = job.get("agent_config")
+    session_id = job.get("session_id")
+    lead_state = job.get("lead_state")
+    conversation_text = lead_data.get("conversation_log")
+
+    # Analyze lead qualification using LLM, unless an earlier attempt did and only the Sheets write failed
+    if job.get("analyzed_lead"):
+        lead_data = dict(job["analyzed_lead"])
+    elif conversation_text:
+        analysis = None
+        if lead_state:
+            # The in-call tracker already did most of the work; only reconcile what it missed
+            logger.info(f"🔍 Reconciling in-call lead record ({len(lead_state['pending_turns'])} pending turns)...")
+            try:
+                analysis = await reconcile_lead(lead_state, agent_config)
+            except Exception as e:
+                logger.error(f"❌ Lead reconciliation failed: {e}")
+                if not final_attempt:
+                    raise
+        if analysis is None:
+            logger.info("🔍 Analyzing lead qualification...")
+            analysis = await analyze_lead_qualification(conversation_text, agent_config, raise_errors=not final_attempt)
         
-        await ws.append_row([
-            lead["session_id"],
-            lead["start_time"],
-            lead.get("end_time", ""),
-            lead.get("duration", "0:00"),
-            lead.get("website_url", ""),
-            lead["lead_name"],
-            lead["phone"],
-            lead["email"],
-            lead["qualification_status"],
-            lead["qualification_reason"],
-            lead["summary"],
-            lead["pain_points"],
-            lead["next_steps"],
-            lead["conversation_log"]
-        ])
-        logger.info("✅ Lead saved to Google Sheets successfully")
-    except Exception as e:
-        logger.error(f"❌ Error saving to Google Sheets: {e}")
-        logger.error(f"Lead data: {lead}")
+        apply_lead_analysis(lead_data, analysis)
+        logger.info(f"📊 Lead qualification: {analysis.get('qualification_status', 'unknown')}")
+        job["analyzed_lead"] = dict(lead_data)
 
+    # Store lead data in session for frontend retrieval (now simplified)
+    if store_lead_callback and session_id:
+        await store_lead_callback(session_id, lead_result(lead_data))
 
+    # Save lead data to Google Sheets
+    return save_to_google_sheets(lead_data)
 
 
-async def run_voice_agent(websocket_client, agent_config=None, session_id=None, store_lead_callback=None):
-    print(f"🤖 Voice Agent: Received config: {agent_config}")
-    print(f"🤖 Voice Agent: Config keys: {list(agent_config.keys()) if agent_config else 'None'}")
-    print(f"🤖 Voice Agent: brandName: {agent_config.get('brandName') if agent_config else 'Not found'}")
+async def run_voice_agent(websocket_client, agent_config=None, session_id=None, store_lead_callback=None, vad_analyzer=None, post_call_callback=None, greetings=None, audio=None, transcript_journal=None):
+    logger.debug(f"🤖 Voice Agent: config keys {list(agent_config.keys()) if agent_config else 'None'}, brandName {agent_config.get('brandName') if agent_config else 'not found'}")
+    # Codec and sample rate negotiated at /connect; raw PCM at the pipeline's rates by default
+    serializer = frame_serializer_for(audio)
     ws_transport = FastAPIWebsocketTransport(
         websocket=websocket_client,
         params=FastAPIWebsocketParams(
             audio_in_enabled=True,
             audio_out_enabled=True,
             add_wav_header=False,
-            vad_analyzer=SileroVADAnalyzer(),
-            serializer=ProtobufFrameSerializer(),
+            vad_analyzer=vad_analyzer or SileroVADAnalyzer(),
+            serializer=serializer,
         ),
     )
 
     # Deepgram STT
     stt = DeepgramSTTService(
-        api_key=os.getenv("DEEPGRAM_API_KEY")
+        api_key=os.getenv("DEEPGRAM_API_KEY"),
+        base_url=os.getenv("DEEPGRAM_BASE_URL", "")
     )
 
     # OpenAI LLM
-    llm = OpenAILLMService(
+    llm = PromptCacheLLMService(
+        brand=agent_config.get('brandName') if agent_config else None,
         api_key=os.getenv("OPENAI_API_KEY"),
-        model="gpt-4o"
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        model="gpt-4o",
+        # Keep every prompt within budget, summarizing older turns
+        rolling_context=rolling_context_from_env(),
     )
 
     # End conversation function handler
     async def end_conversation_handler(params: FunctionCallParams):
         """Handle graceful conversation ending"""
-        await params.llm.push_frame(TTSSpeakFrame("Thank you for calling. Have a wonderful day!"))
+        await params.llm.push_frame(TTSSpeakFrame(END_CONVERSATION_PHRASE))
         await params.result_callback("Conversation ended successfully")
         # End the pipeline gracefully - WebSocket errors during closure are normal
         await params.llm.push_frame(EndTaskFrame(), FrameDirection.UPSTREAM)
@@ -254,42 +325,35 @@ async def run_voice_agent(websocket_client, agent_config=None, session_id=None,
     # Register the end conversation function
     llm.register_function("end_conversation", end_conversation_handler)
 
-    # OpenAI TTS
-    tts = OpenAITTSService(
+    if KNOWLEDGE_LOOKUP:
+        # Built when the agent was configured; the system prompt only carries a brand summary
+        knowledge_index = await asyncio.to_thread(knowledge_index_for, agent_config)
+        llm.register_function("lookup_company_info", lookup_company_info_handler(knowledge_index))
+
+    # OpenAI TTS, replaying cached audio for phrases already synthesized
+    tts = CachedOpenAITTSService(
+        cache=tts_cache,
         api_key=os.getenv("OPENAI_API_KEY"),
-        voice="alloy"
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        voice=TTS_VOICE,
+        model=TTS_MODEL,
     )
 
-    # Generate dynamic system instruction from research config
-    dynamic_instruction = build_system_prompt(agent_config)
+    # Static brand prefix and tools first, per-call messages after, so the provider can reuse its prompt cache
+    context = build_call_context(agent_config)
     logger.info(f"🤖 Generated dynamic system instruction for: {agent_config.get('brandName', 'Unknown Company') if agent_config else 'Generic Agent'}")
-    
-    # Define function schema for end conversation
-    end_conversation_function = FunctionSchema(
-        name="end_conversation",
-        description="End the conversation gracefully when the caller indicates they want to finish talking or when the conversation has reached its natural conclusion",
-        properties={},
-        required=[]
-    )
-    
-    # Create tools schema
-    tools = ToolsSchema(standard_tools=[end_conversation_function])
-    
-    context = OpenAILLMContext(
-        [
-            {
-                "role": "system",
-                "content": dynamic_instruction,
-            },
-            {
-                "role": "system", 
-                "content": "Start the conversation by greeting the caller professionally."
-            }
-        ],
-        tools=tools
-    )
     context_aggregator = llm.create_context_aggregator(context)
 
+    # Turns are journaled as they happen, so a crash mid-call loses neither the transcript nor the lead
+    journaling = transcript_journal is not None and session_id is not None
+    transcript_recorder = TranscriptRecorder(transcript_journal, session_id, context) if journaling else None
+
+    # Lead record kept current during the call so results are ready at hang-up
+    lead_tracker = LeadTracker(
+        context, agent_config, debounce=float(os.getenv("LEAD_UPDATE_DEBOUNCE", "2.0")),
+        on_update=(lambda lead, turns: transcript_journal.lead(session_id, lead, turns)) if journaling else None,
+    )
+
     # Simplified flat lead data structure
     lead_data = {
         "session_id": None,
@@ -330,15 +394,26 @@ async def run_voice_agent(websocket_client, agent_config=None, session_id=None,
             enable_metrics=True,
             enable_usage_metrics=True,
         ),
-        observers=[RTVIObserver(rtvi)],
+        observers=[
+            RTVIObserver(rtvi),
+            TurnLatencyObserver(agent_config.get('brandName') if agent_config else None),
+            lead_tracker,
+            *([transcript_recorder] if transcript_recorder else []),
+        ],
     )
 
+    # Opening line for this call, when one was pre-generated at configure time
+    pregenerated_greeting = None
+
     @rtvi.event_handler("on_client_ready")
     async def on_client_ready(rtvi):
         logger.info("Pipecat client ready.")
         await rtvi.set_bot_ready()
         # Kick off the conversation.
-        await task.queue_frames([context_aggregator.user().get_context_frame()])
+        if pregenerated_greeting:
+            await task.queue_frames([TTSSpeakFrame(pregenerated_greeting)])
+        else:
+            await task.queue_frames([context_aggregator.user().get_context_frame()])
 
     @ws_transport.event_handler("on_client_connected")
     async def on_client_connected(transport, client):
@@ -348,25 +423,26 @@ async def run_voice_agent(websocket_client, agent_config=None, session_id=None,
         lead_data["session_id"] = f"lead_{datetime.datetime.now().isoformat()}"
         lead_data["start_time"] = datetime.datetime.now().isoformat()
         
-        # Generate dynamic greeting based on company config
-        company_name = "the company"
-        if agent_config and agent_config.get('brandName'):
-            company_name = agent_config['brandName']
-        
         # Determine context based on time of day
-        current_hour = datetime.datetime.now().hour
+        variant = greeting_variant()
+        logger.info(f"💬 Context message: {GREETING_CONTEXT[variant]}")
         
-        if current_hour < 8 or current_hour > 17:  # Before 8 AM or after 5 PM
-            context_message = "Explain that you're available after hours to help with their needs."
+        nonlocal pregenerated_greeting
+        pregenerated_greeting = (greetings or {}).get(variant)
+        if pregenerated_greeting:
+            # Spoken as soon as the client is ready; recorded as the agent's first turn
+            logger.info(f"👋 Using pre-generated {variant} greeting")
+            context.get_messages().append({"role": "assistant", "content": pregenerated_greeting})
         else:
-            context_message = "Explain that you're here to help while other team members are with other customers."
-            
-        logger.info(f"💬 Context message: {context_message}")
-        
-        context.get_messages().append({
-            "role": "system", 
-            "content": f"Start by warmly introducing yourself as an AI voice assistant from {company_name}. {context_message} Ask who you have the pleasure of speaking with today."
-        })
+            # Generate dynamic greeting based on company config
+            context.get_messages().append({
+                "role": "system", 
+                "content": greeting_instruction(agent_config, variant)
+            })
+
+        if journaling:
+            transcript_journal.begin(session_id, dict(lead_data), agent_config)
+            transcript_recorder.record()
 
         logger.info(f"Lead capture session started: {lead_data['session_id']}")
         logger.info("Pipecat Client connected")
@@ -375,85 +451,56 @@ async def run_voice_agent(websocket_client, agent_config=None, session_id=None,
     async def on_client_disconnected(transport, client):
         logger.info(f"🔴 CLIENT DISCONNECTED - Client ID: {client}")
 
-        # Get conversation messages for storage
-        messages = context.get_messages_for_persistent_storage()
-        
-        # Format conversation for Google Sheets
-        conversation_transcript = []
-        logger.info(f"Full conversation messages: {len(messages)} total")
-        for msg in messages:
-            if msg.get('role') in ['user', 'assistant']:
-                role = "AGENT" if msg['role'] == 'assistant' else "HUMAN"
-                content = msg.get('content', '')
-                conversation_transcript.append(f"{role}: {content}")
+        # Conversation for Google Sheets, already formatted turn by turn in the journal
+        if journaling:
+            transcript_recorder.record()
+            conversation_transcript = transcript_journal.transcript(session_id) or []
+        else:
+            conversation_transcript = conversation_turns(context.get_messages_for_persistent_storage())
         
         # Store conversation in lead data
         conversation_text = "\n".join(conversation_transcript)
-        lead_data["conversation_log"] = conversation_text
-        lead_data["end_time"] = datetime.datetime.now().isoformat()
-        
-        # Calculate duration
-        if lead_data["start_time"] and lead_data["end_time"]:
-            start_dt = datetime.datetime.fromisoformat(lead_data["start_time"])
-            end_dt = datetime.datetime.fromisoformat(lead_data["end_time"])
-            duration_seconds = int((end_dt - start_dt).total_seconds())
-            minutes, seconds = divmod(duration_seconds, 60)
-            lead_data["duration"] = f"{minutes}:{seconds:02d}"
-        else:
-            lead_data["duration"] = "0:00"
+        finish_lead_data(lead_data, conversation_text)
         
         logger.info(f"📝 Captured {len(conversation_transcript)} conversation messages")
 
-        # Analyze lead qualification using LLM
-        if conversation_text:
-            logger.info("🔍 Analyzing lead qualification...")
-            analysis = await analyze_lead_qualification(conversation_text, agent_config)
-            
-            # Direct mapping from analysis to flat lead data structure
-            lead_data["lead_name"] = analysis.get("name")
-            lead_data["email"] = analysis.get("email")
-            lead_data["phone"] = analysis.get("phone")
-            # Handle separate qualification status and reason fields
-            lead_data["qualification_status"] = analysis.get("qualification_status", "unknown")
-            lead_data["qualification_reason"] = analysis.get("qualification_reason", "")
-            
-            # Convert arrays to strings if needed (safety net)
-            pain_points = analysis.get("pain_points", "None identified")
-            if isinstance(pain_points, list):
-                pain_points = "; ".join(pain_points)
-            lead_data["pain_points"] = pain_points
-            
-            next_steps = analysis.get("next_steps", "Follow up required")
-            if isinstance(next_steps, list):
-                next_steps = "; ".join(next_steps)
-            lead_data["next_steps"] = next_steps
-            
-            lead_data["summary"] = analysis.get("summary", "No summary available")
-            
-            logger.info(f"📊 Lead qualification: {analysis.get('qualification_status', 'unknown')}")
-
-        await task.cancel()
-
-        # Store lead data in session for frontend retrieval (now simplified)
-        if store_lead_callback and session_id:
-            store_lead_callback(session_id, {
-                "lead_name": lead_data["lead_name"],
-                "email": lead_data["email"],
-                "phone": lead_data["phone"],
-                "qualification_status": lead_data["qualification_status"],
-                "qualification_reason": lead_data["qualification_reason"],
-                "pain_points": lead_data["pain_points"],
-                "summary": lead_data["summary"],
-                "next_steps": lead_data["next_steps"],
-                "duration": lead_data.get("duration", "0:00")
-            })
-
-        # Save lead data to Google Sheets
-        await save_to_google_sheets(lead_data)
+        # Publish what the tracker already knows; the post-call job only reconciles the last turns
+        lead_state = await lead_tracker.stop()
+        if store_lead_callback and session_id and conversation_text:
+            provisional = dict(lead_data)
+            apply_lead_analysis(provisional, lead_state["lead"])
+            await store_lead_callback(session_id, lead_result(provisional, final=False))
+
+        # Hand analysis and persistence to the post-call workers so this call's
+        # pipeline, context and transport can be released straight away
+        job = {
+            "job_id": session_id,
+            "session_id": session_id,
+            "lead": dict(lead_data),
+            "agent_config": agent_config,
+            "lead_state": lead_state,
+        }
+        if post_call_callback:
+            await post_call_callback(job)
+            await task.cancel()
+        else:
+            await task.cancel()
+            written = await process_post_call_job(job, store_lead_callback=store_lead_callback)
+            try:
+                await written
+            except Exception:
+                logger.exception("❌ Lead could not be saved to Google Sheets")
+        if journaling:
+            # The post-call job is durable now; recovery must not run it again
+            await transcript_journal.end(session_id)
         
         logger.info(f"Lead capture session ended: {lead_data['session_id']}")
         logger.info("Pipecat Client disconnected")
 
     runner = PipelineRunner(handle_sigint=False)
 
-    await runner.run(task)
+    try:
+        await runner.run(task)
+    finally:
+        if isinstance(serializer, CodecFrameSerializer):
+            serializer.close()
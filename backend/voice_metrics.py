@@ -0,0 +1,138 @@
+from collections import deque
+from typing import Dict, Optional
+
+from prometheus_client import Histogram
+
+from pipecat.frames.frames import (
+    BotStartedSpeakingFrame,
+    LLMTextFrame,
+    MetricsFrame,
+    TranscriptionFrame,
+    TTSAudioRawFrame,
+    VADUserStartedSpeakingFrame,
+    VADUserStoppedSpeakingFrame,
+)
+from pipecat.metrics.metrics import TTFBMetricsData
+from pipecat.observers.base_observer import BaseObserver, FramePushed
+
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 8.0, 13.0)
+
+# Time from VAD user-stopped-speaking to each milestone of the bot's reply, cumulative
+TURN_STAGE_SECONDS = Histogram(
+    "voice_turn_stage_seconds",
+    "Seconds from VAD user-stopped-speaking to each stage of the bot's reply",
+    ["brand", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+SERVICE_TTFB_SECONDS = Histogram(
+    "voice_service_ttfb_seconds",
+    "Time to first byte reported by pipeline services, by service stage (stt, llm, tts)",
+    ["brand", "stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+TOKEN_BUCKETS = (0, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Prompt tokens per LLM turn, split by whether the provider served them from its prompt cache
+LLM_PROMPT_TOKENS = Histogram(
+    "voice_llm_prompt_tokens",
+    "Prompt tokens per LLM turn, by cached or uncached",
+    ["brand", "kind"],
+    buckets=TOKEN_BUCKETS,
+)
+
+LLM_TTFT_SECONDS = Histogram(
+    "voice_llm_ttft_seconds",
+    "LLM time to first streamed chunk, by whether any of the prompt was a cache hit",
+    ["brand", "prompt_cache"],
+    buckets=LATENCY_BUCKETS,
+)
+
+# Stage name -> frame type that marks it, in pipeline order
+TURN_STAGES = (
+    ("stt_final", TranscriptionFrame),
+    ("llm_first_token", LLMTextFrame),
+    ("tts_first_audio", TTSAudioRawFrame),
+    ("first_audio_out", BotStartedSpeakingFrame),
+)
+
+
+# MetricsFrame ids remembered so a frame is counted once while it passes through every processor
+SEEN_METRICS_WINDOW = 64
+
+
+def service_stage(processor: str) -> str:
+    """Bounded label for a processor name such as ``DeepgramSTTService#0``."""
+    name = processor.split("#", 1)[0].upper()
+    for stage in ("STT", "LLM", "TTS"):
+        if stage in name:
+            return stage.lower()
+    return "other"
+
+
+class TurnLatencyObserver(BaseObserver):
+    """Records per-turn mouth-to-ear latency breakdown as Prometheus histograms.
+
+    A turn starts at ``VADUserStoppedSpeakingFrame``. Each stage is recorded the
+    first time its frame is seen afterwards. A final transcript that arrived
+    before VAD fired counts as zero STT latency. Timestamps come from the
+    pipeline clock on each push, so the observer's own queueing delay does not
+    skew the numbers.
+    """
+
+    def __init__(self, brand: Optional[str] = None):
+        super().__init__()
+        self._brand = brand or "unknown"
+        self._turn_start: Optional[int] = None
+        self._last_transcript_at: Optional[int] = None
+        self._recorded: Dict[str, float] = {}
+        self._seen_metrics = deque(maxlen=SEEN_METRICS_WINDOW)
+
+    async def on_push_frame(self, data: FramePushed):
+        frame = data.frame
+
+        if isinstance(frame, MetricsFrame):
+            if frame.id in self._seen_metrics:
+                return
+            self._seen_metrics.append(frame.id)
+            for metric in frame.data:
+                if isinstance(metric, TTFBMetricsData) and metric.value:
+                    SERVICE_TTFB_SECONDS.labels(self._brand, service_stage(metric.processor)).observe(metric.value)
+            return
+
+        if isinstance(frame, VADUserStartedSpeakingFrame):
+            self._turn_start = None
+            self._last_transcript_at = None
+            return
+
+        if isinstance(frame, VADUserStoppedSpeakingFrame):
+            if self._turn_start is None:
+                self._turn_start = data.timestamp
+                self._recorded = {}
+                if self._last_transcript_at is not None:
+                    self._record("stt_final", data.timestamp)
+            return
+
+        if isinstance(frame, TranscriptionFrame):
+            self._last_transcript_at = data.timestamp
+
+        if self._turn_start is None:
+            return
+
+        for stage, frame_type in TURN_STAGES:
+            if isinstance(frame, frame_type):
+                self._record(stage, data.timestamp)
+                break
+
+        if "first_audio_out" in self._recorded:
+            self._turn_start = None
+            self._last_transcript_at = None
+
+    def _record(self, stage: str, timestamp: int):
+        if stage in self._recorded:
+            return
+        seconds = max(timestamp - self._turn_start, 0) / 1e9
+        self._recorded[stage] = seconds
+        TURN_STAGE_SECONDS.labels(self._brand, stage).observe(seconds)
@@ -6,8 +6,18 @@ import NewAgentModal from './components/NewAgentModal';
 import LeadResultsModal from './components/LeadResultsModal';
 import { useRTVIClient } from './hooks/useRTVIClient';
 import { LEAD_QUALIFICATION_TEMPLATE } from './constants/prompts';
+import { streamCompanyResearch } from './researchStream';
 import type { AgentConfig, LogEntry, WebsiteResearchState } from './types';
 
+// Render research results field by field as they stream in, instead of waiting for the full config
+const STREAM_RESEARCH = true;
+
+const RESEARCH_STAGES: Record<string, string> = {
+  searching: 'Searching the web...',
+  search_completed: 'Reading search results...',
+  writing: 'Writing agent profile...'
+};
+
 function App() {
   const [sessionId, setSessionId] = useState<string | null>(null);
   const [config, setConfig] = useState<AgentConfig>({
@@ -26,7 +36,8 @@ function App() {
     url: '',
     isProcessing: false,
     processingStep: '',
-    generatedConfig: null
+    generatedConfig: null,
+    partialConfig: {}
   });
 
   const [logs, setLogs] = useState<LogEntry[]>([]);
@@ -91,23 +102,37 @@ function App() {
 
     try {
       // Step 1: Analyze website
-      setResearch(prev => ({ ...prev, isProcessing: true, processingStep: 'Analyzing website...' }));
+      setResearch(prev => ({ ...prev, isProcessing: true, processingStep: 'Analyzing website...', partialConfig: {} }));
       addLog(`Analyzing company: ${research.url}`);
       
       const BACKEND_URL = 'https://representatives-ld-variable-tom.trycloudflare.com';
       // const BACKEND_URL = 'http://localhost:7860';
       
-      const analysisResponse = await fetch(`${BACKEND_URL}/analyze-company`, {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ url: research.url })
-      });
-      
-      if (!analysisResponse.ok) {
-        throw new Error('Failed to analyze company');
-      }
+      let generatedConfig: AgentConfig;
+      if (STREAM_RESEARCH) {
+        generatedConfig = await streamCompanyResearch(BACKEND_URL, research.url, (event) => {
+          if (event.event === 'status' && RESEARCH_STAGES[event.data.stage]) {
+            setResearch(prev => ({ ...prev, processingStep: RESEARCH_STAGES[event.data.stage] }));
+          } else if (event.event === 'field') {
+            setResearch(prev => ({
+              ...prev,
+              partialConfig: { ...prev.partialConfig, [event.data.field]: event.data.value } as Partial<AgentConfig>
+            }));
+          }
+        });
+      } else {
+        const analysisResponse = await fetch(`${BACKEND_URL}/analyze-company`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ url: research.url })
+        });
+        
+        if (!analysisResponse.ok) {
+          throw new Error('Failed to analyze company');
+        }
 
-      const generatedConfig = await analysisResponse.json();
+        generatedConfig = await analysisResponse.json();
+      }
       console.log('🔍 Frontend: Raw backend response:', generatedConfig);
       
       console.log('🔄 Frontend: Final config being set:', generatedConfig);
@@ -298,6 +323,7 @@ function App() {
         url={research.url}
         isProcessing={research.isProcessing}
         processingStep={research.processingStep}
+        partialConfig={research.partialConfig}
         onUrlChange={(url) => setResearch(prev => ({ ...prev, url }))}
         onGenerateAgent={handleGenerateAgent}
       />
@@ -0,0 +1,85 @@
+import { ProtobufFrameSerializer, WebSocketTransport } from '@pipecat-ai/websocket-transport';
+
+// WebSocket audio formats the backend negotiates at /connect (see backend/audio_codec.py)
+export type AudioCodec = 'pcm' | 'ulaw';
+
+const MULAW_BIAS = 0x84;
+// Segment end points of the 14-bit G.711 encoder, as in the ITU reference and Python's audioop
+const MULAW_SEGMENT_ENDS = [0x3f, 0x7f, 0xff, 0x1ff, 0x3ff, 0x7ff, 0xfff, 0x1fff];
+
+// G.711 µ-law, one byte per 16-bit sample; bit-exact with the backend's encoder
+export function mulawEncode(pcm: Int16Array): Uint8Array {
+  const out = new Uint8Array(pcm.length);
+  for (let i = 0; i < pcm.length; i++) {
+    let value = pcm[i] >> 2;
+    let mask = 0xff;
+    if (value < 0) {
+      value = -value;
+      mask = 0x7f;
+    }
+    value = Math.min(value, 8159) + (MULAW_BIAS >> 2);
+    let segment = 0;
+    while (segment < 8 && value > MULAW_SEGMENT_ENDS[segment]) segment++;
+    out[i] = segment >= 8 ? 0x7f ^ mask : ((segment << 4) | ((value >> (segment + 1)) & 0x0f)) ^ mask;
+  }
+  return out;
+}
+
+export function mulawDecode(ulaw: Uint8Array): Int16Array {
+  const out = new Int16Array(ulaw.length);
+  for (let i = 0; i < ulaw.length; i++) {
+    const byte = ~ulaw[i] & 0xff;
+    const exponent = (byte >> 4) & 0x07;
+    const magnitude = ((((byte & 0x0f) << 3) + MULAW_BIAS) << exponent) - MULAW_BIAS;
+    out[i] = byte & 0x80 ? -magnitude : magnitude;
+  }
+  return out;
+}
+
+// Protobuf frames whose audio bytes are µ-law instead of 16-bit PCM.
+// The backend sends µ-law frames with an even byte count, so the Int16Array
+// the protobuf serializer builds can be read back as the original bytes.
+export class MuLawFrameSerializer extends ProtobufFrameSerializer {
+  serializeAudio(data: ArrayBuffer, sampleRate: number, numChannels: number) {
+    const ulaw = mulawEncode(new Int16Array(data));
+    return super.serializeAudio(ulaw.buffer as ArrayBuffer, sampleRate, numChannels);
+  }
+
+  async deserialize(data: any) {
+    const result = await super.deserialize(data);
+    if (result && result.type === 'audio' && result.audio instanceof Int16Array) {
+      const bytes = new Uint8Array(result.audio.buffer, result.audio.byteOffset, result.audio.byteLength);
+      return { ...result, audio: mulawDecode(bytes) };
+    }
+    return result;
+  }
+}
+
+export interface WireAudio {
+  codec: AudioCodec;
+  sample_rate: number | null;
+}
+
+// WebSocket transport that checks the audio format /connect actually granted.
+// The serializer and sample rates are fixed when the transport is built, so a
+// server that picked another codec or rate (e.g. µ-law disabled there) would
+// otherwise get audio it decodes as noise; refuse to connect instead.
+export class NegotiatedWebSocketTransport extends WebSocketTransport {
+  private readonly requested: WireAudio;
+
+  constructor(requested: WireAudio, options: ConstructorParameters<typeof WebSocketTransport>[0] = {}) {
+    super(options);
+    this.requested = requested;
+  }
+
+  async connect(authBundle: any, abortController: AbortController) {
+    const granted: WireAudio = authBundle?.audio ?? { codec: 'pcm', sample_rate: null };
+    if (granted.codec !== this.requested.codec || (granted.sample_rate ?? null) !== this.requested.sample_rate) {
+      throw new Error(
+        `Backend negotiated ${granted.codec}@${granted.sample_rate ?? 'default'} audio but the client is set up for ` +
+        `${this.requested.codec}@${this.requested.sample_rate ?? 'default'}`
+      );
+    }
+    return super.connect(authBundle, abortController);
+  }
+}
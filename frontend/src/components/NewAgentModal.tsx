@@ -1,5 +1,6 @@
 import React, { useEffect } from 'react';
 import WebsiteResearch from './WebsiteResearch';
+import type { AgentConfig } from '../types';
 
 interface NewAgentModalProps {
   isOpen: boolean;
@@ -7,6 +8,7 @@ interface NewAgentModalProps {
   url: string;
   isProcessing: boolean;
   processingStep: string;
+  partialConfig?: Partial<AgentConfig>;
   onUrlChange: (url: string) => void;
   onGenerateAgent: () => void;
 }
@@ -17,6 +19,7 @@ export default function NewAgentModal({
   url,
   isProcessing,
   processingStep,
+  partialConfig,
   onUrlChange,
   onGenerateAgent
 }: NewAgentModalProps) {
@@ -67,6 +70,7 @@ export default function NewAgentModal({
               url={url}
               isProcessing={isProcessing}
               processingStep={processingStep}
+              partialConfig={partialConfig}
               companyName={null}
               isConnected={false}
               onUrlChange={onUrlChange}
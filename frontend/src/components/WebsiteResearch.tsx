@@ -1,9 +1,11 @@
 import React from 'react';
+import type { AgentConfig } from '../types';
 
 interface WebsiteResearchProps {
   url: string;
   isProcessing: boolean;
   processingStep: string;
+  partialConfig?: Partial<AgentConfig>;
   companyName: string | null;
   isConnected: boolean;
   onUrlChange: (url: string) => void;
@@ -18,10 +20,22 @@ const quickOptions = [
   { name: 'Renewal by Andersen', url: 'https://renewalbyandersenusa.com/', type: 'Window Replacement' }
 ];
 
+// Fields shown while research streams in, in the order the backend writes them
+const previewFields: { key: keyof AgentConfig; label: string }[] = [
+  { key: 'brandName', label: 'Brand' },
+  { key: 'name', label: 'Agent' },
+  { key: 'industry', label: 'Industry' },
+  { key: 'brandVision', label: 'Mission' },
+  { key: 'products', label: 'Products' },
+  { key: 'targetCustomers', label: 'Customers' },
+  { key: 'tone', label: 'Tone' }
+];
+
 export default function WebsiteResearch({
   url,
   isProcessing,
   processingStep,
+  partialConfig = {},
   companyName,
   isConnected,
   onUrlChange,
@@ -67,6 +81,18 @@ export default function WebsiteResearch({
         </button>
       </div>
 
+      {/* Research streaming in */}
+      {isProcessing && previewFields.some(({ key }) => partialConfig[key]) && (
+        <div className="space-y-2 p-3 sm:p-4 border-2 border-[#00B388]/20 rounded-xl sm:rounded-2xl bg-white/70">
+          {previewFields.filter(({ key }) => partialConfig[key]).map(({ key, label }) => (
+            <div key={key} className="text-sm">
+              <span className="font-semibold text-[#1F2121] tracking-wide">{label}: </span>
+              <span className="text-gray-600 line-clamp-2">{partialConfig[key]}</span>
+            </div>
+          ))}
+        </div>
+      )}
+
 
       {/* Quick Options */}
       <div className="space-y-3 sm:space-y-4">
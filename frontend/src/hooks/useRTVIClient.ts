@@ -1,6 +1,6 @@
 import { useEffect, useRef, useState } from 'react';
 import { RTVIClient } from '@pipecat-ai/client-js';
-import { WebSocketTransport } from '@pipecat-ai/websocket-transport';
+import { MuLawFrameSerializer, NegotiatedWebSocketTransport, type AudioCodec } from '../audioCodec';
 
 const BACKEND_URL = 'https://representatives-ld-variable-tom.trycloudflare.com';
 // const BACKEND_URL = 'http://localhost:7860';
@@ -9,9 +9,13 @@ interface UseRTVIClientProps {
   sessionId: string | null;
   onLog: (message: string, type?: 'user' | 'agent' | 'system' | 'error') => void;
   onDisconnected?: (leadData: any) => void;
+  // WebSocket audio format requested at /connect. 'ulaw' is G.711 µ-law (8 kHz unless
+  // sampleRate is set); 'pcm' without a sampleRate keeps 16 kHz in / 24 kHz out.
+  audioCodec?: AudioCodec;
+  sampleRate?: number;
 }
 
-export function useRTVIClient({ sessionId, onLog, onDisconnected }: UseRTVIClientProps) {
+export function useRTVIClient({ sessionId, onLog, onDisconnected, audioCodec = 'pcm', sampleRate }: UseRTVIClientProps) {
   const [client, setClient] = useState<RTVIClient | null>(null);
   const [isConnected, setIsConnected] = useState(false);
   const [isConnecting, setIsConnecting] = useState(false);
@@ -29,14 +33,19 @@ export function useRTVIClient({ sessionId, onLog, onDisconnected }: UseRTVIClien
       document.body.appendChild(audioRef.current);
     }
 
-    // Create RTVI client
-    const transport = new WebSocketTransport();
+    // Create RTVI client, recording and playing audio at the rate requested from /connect;
+    // the transport refuses to connect if the backend granted a different format
+    const wireSampleRate = sampleRate ?? (audioCodec === 'ulaw' ? 8000 : undefined);
+    const transport = new NegotiatedWebSocketTransport({ codec: audioCodec, sample_rate: wireSampleRate ?? null }, {
+      ...(audioCodec === 'ulaw' ? { serializer: new MuLawFrameSerializer() } : {}),
+      ...(wireSampleRate ? { recorderSampleRate: wireSampleRate, playerSampleRate: wireSampleRate } : {}),
+    });
     const rtviConfig = {
       transport,
       params: {
         baseUrl: BACKEND_URL,
         endpoints: { connect: '/connect' },
-        requestData: { session_id: sessionId },
+        requestData: { session_id: sessionId, audio_codec: audioCodec, sample_rate: wireSampleRate },
         config: [
           {
             service: "llm",
@@ -121,7 +130,7 @@ export function useRTVIClient({ sessionId, onLog, onDisconnected }: UseRTVIClien
         audioRef.current = null;
       }
     };
-  }, [sessionId, onLog, onDisconnected]);
+  }, [sessionId, onLog, onDisconnected, audioCodec, sampleRate]);
 
   const connect = async () => {
     if (!client || !sessionId) {
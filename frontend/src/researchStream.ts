@@ -0,0 +1,61 @@
+import type { AgentConfig } from './types';
+
+export type ResearchStreamEvent =
+  | { event: 'status'; data: { stage: string; cache?: string; error?: string } }
+  | { event: 'field'; data: { field: string; value: string } }
+  | { event: 'config'; data: AgentConfig }
+  | { event: 'error'; data: { error: string } };
+
+// Stream /analyze-company/stream, calling onEvent for each server-sent event.
+// Resolves with the final validated config.
+export async function streamCompanyResearch(
+  backendUrl: string,
+  url: string,
+  onEvent: (event: ResearchStreamEvent) => void
+): Promise<AgentConfig> {
+  const response = await fetch(`${backendUrl}/analyze-company/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ url })
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error('Failed to analyze company');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let config: AgentConfig | null = null;
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let eventName = 'message';
+      let data = '';
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) eventName = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (!data) continue;
+
+      const event = { event: eventName, data: JSON.parse(data) } as ResearchStreamEvent;
+      onEvent(event);
+      if (event.event === 'config') config = event.data;
+      if (event.event === 'error') throw new Error(event.data.error);
+    }
+  }
+
+  if (!config) {
+    throw new Error('Research stream ended without a config');
+  }
+  return config;
+}
@@ -21,4 +21,5 @@ export interface WebsiteResearchState {
   isProcessing: boolean;
   processingStep: string;
   generatedConfig: AgentConfig | null;
+  partialConfig: Partial<AgentConfig>;
 }
\ No newline at end of file